@@ -1,14 +1,6 @@
 # Cosmic Financial Analysis - Source Module
 
-# Import all modules to make them available when importing from src
-from . import data_fetcher
-from . import equity_analysis
-from . import technical_analysis
-from . import derivatives
-from . import news_feed
-from . import reports
-from . import portfolio_analysis
-from . import risk_analysis
+import importlib
 
 # Make modules available at package level
 __all__ = [
@@ -21,3 +13,14 @@ __all__ = [
     'portfolio_analysis',
     'risk_analysis'
 ]
+
+def __getattr__(name):
+    """Import submodules on first access (PEP 562) so importing src stays cheap"""
+    if name in __all__:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
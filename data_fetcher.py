@@ -1,43 +1,193 @@
+import asyncio
+import functools
+import io
+import re
+import time
 import streamlit as st
 import pandas as pd
+import numpy as np
 import yfinance as yf
+from yfinance.exceptions import YFException
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from src.data_fetcher_cache import FileCache, HistoryStore, STATEMENT_TTL, ttl_for_interval
+
+# Yahoo Finance accepts up to ~20 tickers per download request
+YF_BATCH_SIZE = 20
+
+# OHLC columns quoted in currency (as opposed to Volume)
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close']
+
+# Used when the live USD-INR quote is unavailable
+USD_INR_FALLBACK = 83.0
+
+COMMODITY_SYMBOLS = {
+    'GOLD': 'GC=F',
+    'SILVER': 'SI=F',
+    'OIL': 'CL=F',
+    'COPPER': 'HG=F',
+    'NATURAL_GAS': 'NG=F',
+    'CORN': 'ZC=F',
+    'SOYBEANS': 'ZS=F',
+    'WHEAT': 'ZW=F'
+}
+
+BOND_SYMBOLS = {
+    'US10Y': '^TNX',
+    'US30Y': '^TYX',
+    'US5Y': 'FV=F',
+    'US2Y': 'TU=F',
+    'US3M': '^IRX'
+}
+
+# Display name -> Yahoo Finance row label for each financial statement
+INCOME_STATEMENT_ROWS = {
+    'Revenue': 'Total Revenue',
+    'Operating Expenses': 'Operating Expenses',
+    'EBITDA': 'EBITDA',
+    'Net Profit': 'Net Income'
+}
+
+BALANCE_SHEET_ROWS = {
+    'Total Assets': 'Total Assets',
+    'Current Assets': 'Current Assets',
+    'Non-Current Assets': 'Total Non Current Assets',
+    'Total Liabilities': 'Total Liabilities Net Minority Interest',
+    'Current Liabilities': 'Current Liabilities',
+    'Equity': 'Total Equity Gross Minority Interest'
+}
+
+CASH_FLOW_ROWS = {
+    'Operating Cash Flow': 'Operating Cash Flow',
+    'Investing Cash Flow': 'Investing Cash Flow',
+    'Financing Cash Flow': 'Financing Cash Flow',
+    'Net Cash Flow': 'End Cash Position'
+}
+
+# Substring markers used by detect_asset_class, compiled once into single-pass patterns
+CRYPTO_TOKENS = frozenset({'BTC', 'ETH', 'BNB', 'ADA', 'SOL', 'DOT', 'DOGE', 'AVAX'})
+FOREX_TOKENS = frozenset({'USD', 'EUR', 'GBP', 'JPY', 'INR'})
+BOND_TOKENS = frozenset({'^TNX', '^TYX', '^IRX'})
+ETF_TOKENS = frozenset({'SPY', 'QQQ', 'IWM', 'EFA', 'VWO', 'BND', 'AGG', 'VEA', 'VIG'})
+
+def _compile_tokens(tokens):
+    """Compile a set of substrings into one alternation regex"""
+    return re.compile('|'.join(re.escape(token) for token in sorted(tokens)))
+
+_CRYPTO_PATTERN = _compile_tokens(CRYPTO_TOKENS)
+_FOREX_PATTERN = _compile_tokens(FOREX_TOKENS)
+_BOND_PATTERN = _compile_tokens(BOND_TOKENS)
+_ETF_PATTERN = _compile_tokens(ETF_TOKENS)
+
+# Shared pool for blocking Yahoo Finance calls that can run side by side
+_EXECUTOR = ThreadPoolExecutor(max_workers=8)
+
+# On-disk cache of Yahoo Finance responses under .cache/yf
+_CACHE = FileCache()
+_HISTORY = HistoryStore()
+
+def _create_session():
+    """Create the keep-alive HTTP session shared by every Yahoo Finance call"""
+    try:
+        # Recent yfinance releases only accept curl_cffi sessions
+        from curl_cffi import requests as curl_requests
+        return curl_requests.Session(impersonate="chrome")
+    except ImportError:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32,
+                              max_retries=Retry(total=3, backoff_factor=0.3))
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+_SESSION = _create_session()
+
+# yf.Ticker memoises info and statements on the instance, so shared instances are renewed hourly
+TICKER_TTL = 3600
+
+@functools.lru_cache(maxsize=256)
+def _ticker(symbol, ttl_bucket):
+    """Build the Ticker shared for symbol during one TICKER_TTL bucket"""
+    return yf.Ticker(symbol, session=_SESSION)
+
+class NoDataError(ValueError):
+    """Raised inside a cached fetcher when Yahoo Finance returned nothing usable, so the result is not memoised"""
+
+def _require_data(data, symbol):
+    """Return data, or raise NoDataError when it is empty or entirely NaN"""
+    # yf.download only logs bad symbols, rate limits and network errors and returns an empty or all-NaN frame
+    if data is None or data.empty or not data.notna().to_numpy().any():
+        raise NoDataError(f"No data returned for {symbol}")
+    return data
 
-def fetch_historical_data(symbol, years=5):
-    """Fetch historical data for given symbol and convert to INR"""
+def get_ticker(symbol):
+    """Return the yf.Ticker shared by every module for symbol, on the keep-alive session"""
+    return _ticker(symbol, int(time.time() // TICKER_TTL))
+
+def _yf_download(symbol, **kwargs):
+    """Call yf.download with the options shared by every single-symbol fetch"""
+    # multi_level_index=False returns flat OHLCV columns, so callers never need droplevel
+    return yf.download(symbol, auto_adjust=False, progress=False, multi_level_index=False,
+                       session=_SESSION, **kwargs)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _download(fn, symbol, period, interval):
+    """Download price history for symbol, served from the on-disk cache when fresh"""
+    # Empty and all-NaN downloads raise here, so neither cache layer stores them and the calling fetcher reports them
+    return _CACHE.get_or_set(
+        (fn, symbol, period, interval),
+        ttl_for_interval(interval),
+        lambda: _require_data(_yf_download(symbol, period=period, interval=interval), symbol)
+    )
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _fetch_historical_data(symbol, years):
+    """Fetch daily history for symbol in INR; raises NoDataError on an empty download so it is not cached"""
     end_date = datetime.now()
     start_date = end_date - timedelta(days=years*365)
 
     # Fetch data from Yahoo Finance
-    data = yf.download(symbol, start=start_date, end=end_date, auto_adjust=False)
-
-    # Flatten multi-index columns if present
-    if isinstance(data.columns, pd.MultiIndex):
-        data.columns = data.columns.droplevel(1)
+    # Daily bars are append-only, so only bars newer than the stored history are downloaded
+    data = _HISTORY.update(symbol, '1d', start_date, end_date,
+                           lambda start, end: _yf_download(symbol, start=start, end=end))
+    _require_data(data, symbol)
 
-    # Convert to INR (assuming USD base, use current USD-INR rate)
+    # Convert price columns to INR (assuming USD base, use current USD-INR rate); Volume stays a share count
     usd_inr_rate = get_usd_inr_rate()
-    data = data * usd_inr_rate
+    price_cols = data.columns.intersection(PRICE_COLUMNS)
+    data.loc[:, price_cols] = data[price_cols].to_numpy(copy=False) * usd_inr_rate
 
     return data
 
+def fetch_historical_data(symbol, years=5):
+    """Fetch historical data for given symbol and convert to INR"""
+    try:
+        return _fetch_historical_data(symbol, years)
+    except Exception as e:
+        st.error(f"Error fetching historical data: {e}")
+        return None
+
+@st.cache_data(ttl=900, show_spinner=False)
 def get_usd_inr_rate():
     """Get current USD to INR exchange rate from Yahoo Finance"""
     try:
         # Use Yahoo Finance for USD-INR rate
-        data = yf.download('USDINR=X', period='1d', auto_adjust=False)
-        if not data.empty:
-            rate = float(data['Close'].iloc[-1])
-            return rate
-    except:
-        return 83.0  # fallback rate
+        data = _yf_download('USDINR=X', period='1d')
+        if data.empty:
+            return USD_INR_FALLBACK
+        return float(data['Close'].iloc[-1])
+    except (OSError, ValueError, KeyError, YFException):
+        # requests and curl_cffi RequestException both subclass OSError; yfinance's own errors,
+        # such as YFRateLimitError, only subclass Exception through YFException
+        return USD_INR_FALLBACK
 
 def fetch_stock_data(symbol, period="1y", interval="1d"):
     """Fetch stock data from Yahoo Finance"""
     try:
-        data = yf.download(symbol, period=period, interval=interval, auto_adjust=False)
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.droplevel(1)
+        data = _download('fetch_stock_data', symbol, period, interval)
         return data
     except Exception as e:
         st.error(f"Error fetching stock data: {e}")
@@ -47,12 +197,9 @@ def fetch_crypto_data(symbol, period="1y", interval="1d"):
     """Fetch cryptocurrency data from Yahoo Finance"""
     try:
         # Add -USD suffix if not present for crypto symbols
-        if not symbol.endswith('-USD'):
-            symbol = f"{symbol}-USD"
+        symbol = to_yahoo_symbol(symbol, 'Cryptocurrency')
 
-        data = yf.download(symbol, period=period, interval=interval, auto_adjust=False)
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.droplevel(1)
+        data = _download('fetch_crypto_data', symbol, period, interval)
         return data
     except Exception as e:
         st.error(f"Error fetching crypto data: {e}")
@@ -62,26 +209,9 @@ def fetch_commodities_data(symbol, period="1y", interval="1d"):
     """Fetch commodities data from Yahoo Finance"""
     try:
         # Common commodity symbols: GC=F (Gold), SI=F (Silver), CL=F (Crude Oil), HG=F (Copper)
-        commodity_symbols = {
-            'GOLD': 'GC=F',
-            'SILVER': 'SI=F',
-            'OIL': 'CL=F',
-            'COPPER': 'HG=F',
-            'NATURAL_GAS': 'NG=F',
-            'CORN': 'ZC=F',
-            'SOYBEANS': 'ZS=F',
-            'WHEAT': 'ZW=F'
-        }
-
-        # If symbol is a common name, convert to Yahoo symbol
-        if symbol.upper() in commodity_symbols:
-            symbol = f"{commodity_symbols[symbol.upper()]}"
-        elif not symbol.endswith('=F'):  # Add futures suffix if not present
-            symbol = f"{symbol}=F"
-
-        data = yf.download(symbol, period=period, interval=interval, auto_adjust=False)
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.droplevel(1)
+        symbol = to_yahoo_symbol(symbol, 'Commodities')
+
+        data = _download('fetch_commodities_data', symbol, period, interval)
         return data
     except Exception as e:
         st.error(f"Error fetching commodities data: {e}")
@@ -91,24 +221,9 @@ def fetch_bonds_data(symbol, period="1y", interval="1d"):
     """Fetch bonds/treasury data from Yahoo Finance"""
     try:
         # Common bond symbols: ^TNX (10Y Treasury), ^IRX (13W Treasury), ^TYX (30Y Treasury)
-        bond_symbols = {
-            'US10Y': '^TNX',
-            'US30Y': '^TYX',
-            'US5Y': 'FV=F',
-            'US2Y': 'TU=F',
-            'US3M': '^IRX'
-        }
-
-        # If symbol is a common name, convert to Yahoo symbol
-        if symbol.upper() in bond_symbols:
-            symbol = bond_symbols[symbol.upper()]
-        elif not symbol.startswith('^') and not symbol.endswith('=F'):
-            # Assume it's a treasury symbol
-            symbol = f"^{symbol}"
-
-        data = yf.download(symbol, period=period, interval=interval, auto_adjust=False)
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.droplevel(1)
+        symbol = to_yahoo_symbol(symbol, 'Bonds')
+
+        data = _download('fetch_bonds_data', symbol, period, interval)
         return data
     except Exception as e:
         st.error(f"Error fetching bonds data: {e}")
@@ -118,9 +233,7 @@ def fetch_etf_data(symbol, period="1y", interval="1d"):
     """Fetch ETF data from Yahoo Finance"""
     try:
         # Common ETF symbols - just ensure they're treated as regular symbols
-        data = yf.download(symbol, period=period, interval=interval, auto_adjust=False)
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.droplevel(1)
+        data = _download('fetch_etf_data', symbol, period, interval)
         return data
     except Exception as e:
         st.error(f"Error fetching ETF data: {e}")
@@ -130,196 +243,316 @@ def fetch_forex_data(symbol, period="1y", interval="1d"):
     """Fetch forex data from Yahoo Finance"""
     try:
         # Forex symbols typically end with =X
-        if not symbol.endswith('=X'):
-            symbol = f"{symbol}=X"
+        symbol = to_yahoo_symbol(symbol, 'Forex')
 
-        data = yf.download(symbol, period=period, interval=interval, auto_adjust=False)
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.droplevel(1)
+        data = _download('fetch_forex_data', symbol, period, interval)
         return data
     except Exception as e:
         st.error(f"Error fetching forex data: {e}")
         return None
 
+def to_yahoo_symbol(symbol, asset_class):
+    """Convert a user-facing symbol to the Yahoo Finance ticker for its asset class"""
+    if asset_class == 'Cryptocurrency':
+        return symbol if symbol.endswith('-USD') else f"{symbol}-USD"
+    if asset_class == 'Commodities':
+        # If symbol is a common name, convert to Yahoo symbol; otherwise add futures suffix if not present
+        symbol_u = symbol.upper()
+        return COMMODITY_SYMBOLS.get(symbol_u, symbol_u if symbol_u.endswith('=F') else f"{symbol_u}=F")
+    if asset_class == 'Bonds':
+        # Anything that is not already an index or future is assumed to be a treasury symbol
+        symbol_u = symbol.upper()
+        return BOND_SYMBOLS.get(symbol_u, symbol_u if symbol_u.startswith('^') or symbol_u.endswith('=F') else f"^{symbol_u}")
+    if asset_class == 'Forex':
+        return symbol if symbol.endswith('=X') else f"{symbol}=X"
+    return symbol
+
+# Pure symbol -> class mapping, asked for on every Search and Favorites rerun
+@functools.lru_cache(maxsize=1024)
 def detect_asset_class(symbol):
     """Detect asset class based on symbol pattern"""
     symbol = symbol.upper()
 
     # Crypto detection
-    if any(crypto in symbol for crypto in ['BTC', 'ETH', 'BNB', 'ADA', 'SOL', 'DOT', 'DOGE', 'AVAX']):
-        return 'Cryptocurrency'
-    if symbol.endswith('-USD') or symbol in ['BTC-USD', 'ETH-USD', 'USDT-USD', 'BNB-USD']:
+    if _CRYPTO_PATTERN.search(symbol) or symbol.endswith('-USD'):
         return 'Cryptocurrency'
 
     # Forex detection
-    if symbol.endswith('=X') or any(forex in symbol for forex in ['USD', 'EUR', 'GBP', 'JPY', 'INR']):
+    if symbol.endswith('=X') or _FOREX_PATTERN.search(symbol):
         return 'Forex'
 
-    # Commodity detection
-    commodity_indicators = ['=F', 'GC=F', 'SI=F', 'CL=F', 'HG=F', 'NG=F', 'ZC=F', 'ZS=F', 'ZW=F']
-    if any(indicator in symbol for indicator in commodity_indicators):
+    # Commodity detection (every futures ticker carries '=F')
+    if '=F' in symbol:
         return 'Commodities'
 
     # Bond/Treasury detection
-    bond_indicators = ['^TNX', '^TYX', '^IRX', 'FV=F', 'TU=F']
-    if any(indicator in symbol for indicator in bond_indicators):
+    if _BOND_PATTERN.search(symbol):
         return 'Bonds'
 
     # ETF detection (common ETF patterns)
-    etf_indicators = ['SPY', 'QQQ', 'IWM', 'EFA', 'VWO', 'BND', 'AGG', 'VEA', 'VWO', 'VIG']
-    if any(etf in symbol for etf in etf_indicators) or symbol.startswith('V') or len(symbol) <= 4:
+    if _ETF_PATTERN.search(symbol) or symbol.startswith('V') or len(symbol) <= 4:
         # This is a heuristic - many ETFs are short codes
         return 'ETF'
 
     # Default to Equity
     return 'Equity'
 
+# Asset class -> fetcher used by fetch_asset_data
+_FETCHERS = {
+    'Cryptocurrency': fetch_crypto_data,
+    'Commodities': fetch_commodities_data,
+    'Bonds': fetch_bonds_data,
+    'ETF': fetch_etf_data,
+    'Forex': fetch_forex_data,
+    'Equity': fetch_stock_data
+}
+
 def fetch_asset_data(symbol, asset_class=None, period="1y", interval="1d"):
     """Unified function to fetch data based on asset class"""
-    if asset_class is None:
-        asset_class = detect_asset_class(symbol)
+    # Default to stocks/equity for unknown classes
+    fetcher = _FETCHERS.get(asset_class or detect_asset_class(symbol), fetch_stock_data)
+    return fetcher(symbol, period, interval)
+
+def _download_each(tickers, period, interval):
+    """Download tickers with one request each on the shared pool, leaving out those that fail"""
+    futures = {ticker: _EXECUTOR.submit(_yf_download, ticker, period=period, interval=interval) for ticker in tickers}
+    frames = {}
+    for ticker, future in futures.items():
+        try:
+            frames[ticker] = _require_data(future.result(), ticker)
+        except Exception as e:
+            st.error(f"Error fetching data for {ticker}: {e}")
+    return frames
+
+def fetch_asset_data_many(symbols, asset_class=None, period="1y", interval="1d"):
+    """Fetch data for several symbols using batched Yahoo Finance requests"""
+    tickers = {}
+    for symbol in symbols:
+        tickers[symbol] = to_yahoo_symbol(symbol, asset_class or detect_asset_class(symbol))
+
+    # Serve fresh per-symbol slices from the on-disk cache
+    frames = {}
+    for ticker in dict.fromkeys(tickers.values()):
+        cached = _CACHE.get(('fetch_asset_data_many', ticker, period, interval))
+        if cached is not None:
+            frames[ticker] = cached
+
+    # One request per YF_BATCH_SIZE tickers instead of one per symbol
+    missing = [ticker for ticker in dict.fromkeys(tickers.values()) if ticker not in frames]
+    for start in range(0, len(missing), YF_BATCH_SIZE):
+        chunk = missing[start:start + YF_BATCH_SIZE]
+        try:
+            data = yf.download(" ".join(chunk), period=period, interval=interval,
+                               group_by='ticker', threads=True, auto_adjust=False, progress=False,
+                               session=_SESSION)
+        except Exception as e:
+            st.error(f"Error fetching data for {', '.join(chunk)}: {e}")
+            continue
 
-    if asset_class == 'Cryptocurrency':
-        return fetch_crypto_data(symbol, period, interval)
-    elif asset_class == 'Commodities':
-        return fetch_commodities_data(symbol, period, interval)
-    elif asset_class == 'Bonds':
-        return fetch_bonds_data(symbol, period, interval)
-    elif asset_class == 'ETF':
-        return fetch_etf_data(symbol, period, interval)
-    elif asset_class == 'Forex':
-        return fetch_forex_data(symbol, period, interval)
-    else:  # Default to stocks/equity
-        return fetch_stock_data(symbol, period, interval)
+        if isinstance(data.columns, pd.MultiIndex):
+            # Keep the ticker level and split it into one frame per symbol
+            resolved = {ticker: data.xs(ticker, axis=1, level=0).dropna(how='all')
+                        for ticker in chunk if ticker in data.columns.get_level_values(0)}
+        elif len(chunk) == 1:
+            resolved = {chunk[0]: data}
+        else:
+            # Flat columns name no ticker (yfinance drops the level when only one symbol resolved),
+            # so the chunk is fetched one ticker at a time to learn which frame belongs to which
+            resolved = _download_each(chunk, period, interval)
+
+        # Tickers left out or empty come back as None, like a failed download
+        for ticker, frame in resolved.items():
+            if not frame.empty:
+                frames[ticker] = frame
+                _CACHE.set(('fetch_asset_data_many', ticker, period, interval), frame, ttl_for_interval(interval))
+
+    return {symbol: frames.get(ticker) for symbol, ticker in tickers.items()}
+
+async def _afetch_one(symbol, asset_class, period, interval):
+    """Fetch one symbol on a worker thread, leaving Streamlit calls to the caller"""
+    fetcher = _FETCHERS.get(asset_class, fetch_stock_data)
+    return await asyncio.to_thread(_download, fetcher.__name__, to_yahoo_symbol(symbol, asset_class), period, interval)
+
+async def _afetch_many(symbols, asset_classes, period, interval):
+    """Run every symbol fetch concurrently"""
+    return await asyncio.gather(
+        *[_afetch_one(symbol, asset_class, period, interval) for symbol, asset_class in zip(symbols, asset_classes)],
+        return_exceptions=True
+    )
+
+def fetch_many(symbols, asset_class=None, period="1y", interval="1d"):
+    """Fetch several symbols concurrently so total time tracks the slowest request"""
+    asset_classes = [asset_class or detect_asset_class(symbol) for symbol in symbols]
+    results = asyncio.run(_afetch_many(symbols, asset_classes, period, interval))
+
+    fetched = {}
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, Exception):
+            st.error(f"Error fetching data for {symbol}: {result}")
+            fetched[symbol] = None
+        else:
+            fetched[symbol] = result
+    return fetched
+
+# FY label lists keyed by (year, month, years); the labels only change when the month does
+_FY_CACHE = {}
 
 def get_financial_years(years=5):
     """Generate list of financial years in FY format (April-March)"""
-    current_year = datetime.now().year
-    current_month = datetime.now().month
-
-    # If current month is April or later, current FY is current year - next year
-    # If before April, current FY is previous year - current year
-    if current_month >= 4:
-        current_fy_start = current_year
-        current_fy_end = current_year + 1
-    else:
-        current_fy_start = current_year - 1
-        current_fy_end = current_year
-
-    fy_list = []
-    for i in range(years):
-        start_year = current_fy_start - i
-        end_year = current_fy_end - i
-        fy_list.append(f"FY {start_year}-{str(end_year)[-2:]}")
-
-    return fy_list
+    now = datetime.now()
+    key = (now.year, now.month, years)
+    fy_list = _FY_CACHE.get(key)
+
+    if fy_list is None:
+        # If current month is April or later, current FY is current year - next year
+        # If before April, current FY is previous year - current year
+        current_fy_start = now.year if now.month >= 4 else now.year - 1
+        current_fy_end = current_fy_start + 1
+
+        fy_list = [f"FY {start}-{end % 100:02d}"
+                   for start, end in zip(range(current_fy_start, current_fy_start - years, -1),
+                                         range(current_fy_end, current_fy_end - years, -1))]
+        _FY_CACHE[key] = fy_list
+
+    # Copy so callers cannot mutate the cached list
+    return list(fy_list)
+
+def _submit_statement_requests(symbol):
+    """Start the income statement, balance sheet and cash flow requests in parallel"""
+    # Use Yahoo Finance ticker object for fundamentals
+    ticker = get_ticker(symbol)
+    return [_EXECUTOR.submit(_load_statement, ticker, attr) for attr in ('financials', 'balance_sheet', 'cashflow')]
+
+def _load_statement(ticker, attr):
+    """Load one statement frame from the ticker, served from the on-disk cache when fresh"""
+    # Parquet needs string column names, so statements are stored with periods as rows
+    statement = _CACHE.get_or_set(
+        ('fetch_financial_statements', ticker.ticker, attr, 'annual'),
+        STATEMENT_TTL,
+        lambda: getattr(ticker, attr).T
+    )
+    return statement.T
+
+def _map_statement(statement, rows, fy_years):
+    """Pick the wanted rows of a raw statement and key each column by financial year"""
+    if statement.empty:
+        return {}
+
+    # One reindex pulls every wanted row at once; missing rows come back as NaN and become 0
+    values = np.nan_to_num(statement.reindex(list(rows.values())).to_numpy(dtype=float), nan=0.0)
+    names = list(rows)
+    return {fy: dict(zip(names, values[:, i])) for i, fy in enumerate(fy_years[:statement.shape[1]])}
+
+def _build_financial_statements(income_stmt, balance_sheet, cash_flow):
+    """Map raw Yahoo Finance statements onto financial years"""
+    fy_years = get_financial_years(5)
+
+    return {
+        'income_statement': _map_statement(income_stmt, INCOME_STATEMENT_ROWS, fy_years),
+        'balance_sheet': _map_statement(balance_sheet, BALANCE_SHEET_ROWS, fy_years),
+        'cash_flow': _map_statement(cash_flow, CASH_FLOW_ROWS, fy_years)
+    }
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _fetch_financial_statements(symbol):
+    """Fetch and map financial statements; errors propagate so they are never cached"""
+    futures = _submit_statement_requests(symbol)
+    statements = [future.result() for future in futures]
+    # Ticker returns empty frames instead of raising for unknown symbols and failed requests
+    if all(statement.empty for statement in statements):
+        raise NoDataError(f"No financial statements returned for {symbol}")
+    return _build_financial_statements(*statements)
 
 def fetch_financial_statements(symbol):
     """Fetch financial statements using Yahoo Finance fundamentals"""
     try:
-        # Use Yahoo Finance ticker object for fundamentals
-        ticker = yf.Ticker(symbol)
-
-        # Get financial data
-        income_stmt = ticker.financials
-        balance_sheet = ticker.balance_sheet
-        cash_flow = ticker.cashflow
-
-        financials = {
-            'income_statement': {},
-            'balance_sheet': {},
-            'cash_flow': {}
-        }
-
-        fy_years = get_financial_years(5)
-
-        # Process Income Statement
-        if not income_stmt.empty:
-            for i, fy in enumerate(fy_years[:len(income_stmt.columns)]):
-                col = income_stmt.columns[i]
-                financials['income_statement'][fy] = {
-                    'Revenue': income_stmt.loc['Total Revenue', col] if 'Total Revenue' in income_stmt.index else 0,
-                    'Operating Expenses': income_stmt.loc['Operating Expenses', col] if 'Operating Expenses' in income_stmt.index else 0,
-                    'EBITDA': income_stmt.loc['EBITDA', col] if 'EBITDA' in income_stmt.index else 0,
-                    'Net Profit': income_stmt.loc['Net Income', col] if 'Net Income' in income_stmt.index else 0
-                }
-
-        # Process Balance Sheet
-        if not balance_sheet.empty:
-            for i, fy in enumerate(fy_years[:len(balance_sheet.columns)]):
-                col = balance_sheet.columns[i]
-                financials['balance_sheet'][fy] = {
-                    'Total Assets': balance_sheet.loc['Total Assets', col] if 'Total Assets' in balance_sheet.index else 0,
-                    'Current Assets': balance_sheet.loc['Current Assets', col] if 'Current Assets' in balance_sheet.index else 0,
-                    'Non-Current Assets': balance_sheet.loc['Total Non Current Assets', col] if 'Total Non Current Assets' in balance_sheet.index else 0,
-                    'Total Liabilities': balance_sheet.loc['Total Liabilities Net Minority Interest', col] if 'Total Liabilities Net Minority Interest' in balance_sheet.index else 0,
-                    'Current Liabilities': balance_sheet.loc['Current Liabilities', col] if 'Current Liabilities' in balance_sheet.index else 0,
-                    'Equity': balance_sheet.loc['Total Equity Gross Minority Interest', col] if 'Total Equity Gross Minority Interest' in balance_sheet.index else 0
-                }
-
-        # Process Cash Flow
-        if not cash_flow.empty:
-            for i, fy in enumerate(fy_years[:len(cash_flow.columns)]):
-                col = cash_flow.columns[i]
-                financials['cash_flow'][fy] = {
-                    'Operating Cash Flow': cash_flow.loc['Operating Cash Flow', col] if 'Operating Cash Flow' in cash_flow.index else 0,
-                    'Investing Cash Flow': cash_flow.loc['Investing Cash Flow', col] if 'Investing Cash Flow' in cash_flow.index else 0,
-                    'Financing Cash Flow': cash_flow.loc['Financing Cash Flow', col] if 'Financing Cash Flow' in cash_flow.index else 0,
-                    'Net Cash Flow': cash_flow.loc['End Cash Position', col] if 'End Cash Position' in cash_flow.index else 0
-                }
-
-        return financials
+        return _fetch_financial_statements(symbol)
 
     except Exception as e:
         st.error(f"Error fetching financial statements: {e}")
         return get_sample_financial_statements()
 
+def fetch_financial_statements_many(symbols):
+    """Fetch financial statements for several symbols concurrently"""
+    # Submit every request up front so all symbols share the pool
+    pending = {symbol: _submit_statement_requests(symbol) for symbol in symbols}
+
+    statements = {}
+    for symbol, futures in pending.items():
+        try:
+            statements[symbol] = _build_financial_statements(*[future.result() for future in futures])
+        except Exception as e:
+            st.error(f"Error fetching financial statements for {symbol}: {e}")
+            statements[symbol] = get_sample_financial_statements()
+    return statements
+
+def _sample_statement(fy_years, growth, rows):
+    """Build one sample statement from (base value, ratio) pairs scaled by yearly growth"""
+    names = list(rows)
+    bases = np.array([base for base, _ in rows.values()], dtype=float)
+    ratios = np.array([ratio for _, ratio in rows.values()])
+    values = (np.outer(growth, bases) * ratios).astype(np.int64)
+    return {fy: dict(zip(names, row)) for fy, row in zip(fy_years, values.tolist())}
+
 def get_sample_financial_statements():
     """Return sample financial statements for demonstration"""
     fy_years = get_financial_years(5)
 
-    financials = {
-        'income_statement': {},
-        'balance_sheet': {},
-        'cash_flow': {}
-    }
-
     # Sample data for Reliance Industries (approximate values in crores)
     base_revenue = 900000  # 9 lakh crores
     base_profit = 78000    # 78k crores
     base_assets = 2100000  # 21 lakh crores
     base_equity = 950000   # 9.5 lakh crores
 
-    for i, fy in enumerate(fy_years):
-        growth_factor = 1 + (i * 0.08)  # 8% annual growth
-
-        # Income Statement
-        financials['income_statement'][fy] = {
-            'Revenue': int(base_revenue * growth_factor),
-            'Operating Expenses': int(base_revenue * growth_factor * 0.85),
-            'EBITDA': int(base_revenue * growth_factor * 0.15),
-            'Net Profit': int(base_profit * growth_factor)
-        }
-
-        # Balance Sheet
-        financials['balance_sheet'][fy] = {
-            'Total Assets': int(base_assets * growth_factor),
-            'Current Assets': int(base_assets * growth_factor * 0.4),
-            'Non-Current Assets': int(base_assets * growth_factor * 0.6),
-            'Total Liabilities': int(base_assets * growth_factor * 0.55),
-            'Current Liabilities': int(base_assets * growth_factor * 0.25),
-            'Equity': int(base_equity * growth_factor)
-        }
-
-        # Cash Flow
-        financials['cash_flow'][fy] = {
-            'Operating Cash Flow': int(base_profit * growth_factor * 1.2),
-            'Investing Cash Flow': int(base_profit * growth_factor * -0.8),
-            'Financing Cash Flow': int(base_profit * growth_factor * -0.3),
-            'Net Cash Flow': int(base_profit * growth_factor * 0.1)
-        }
-
-    return financials
+    growth = 1 + 0.08 * np.arange(len(fy_years))  # 8% annual growth
+
+    return {
+        'income_statement': _sample_statement(fy_years, growth, {
+            'Revenue': (base_revenue, 1),
+            'Operating Expenses': (base_revenue, 0.85),
+            'EBITDA': (base_revenue, 0.15),
+            'Net Profit': (base_profit, 1)
+        }),
+        'balance_sheet': _sample_statement(fy_years, growth, {
+            'Total Assets': (base_assets, 1),
+            'Current Assets': (base_assets, 0.4),
+            'Non-Current Assets': (base_assets, 0.6),
+            'Total Liabilities': (base_assets, 0.55),
+            'Current Liabilities': (base_assets, 0.25),
+            'Equity': (base_equity, 1)
+        }),
+        'cash_flow': _sample_statement(fy_years, growth, {
+            'Operating Cash Flow': (base_profit, 1.2),
+            'Investing Cash Flow': (base_profit, -0.8),
+            'Financing Cash Flow': (base_profit, -0.3),
+            'Net Cash Flow': (base_profit, 0.1)
+        })
+    }
+
+@st.cache_data(show_spinner=False)
+def format_statement(statement):
+    """Return a statement as a years-by-rows table of preformatted strings"""
+    # orient='index' builds the years-by-rows frame directly, with no transpose copy;
+    # formatting once up front is cheaper than a Styler, which formats each cell on every render
+    return pd.DataFrame.from_dict(statement, orient='index').map("{:,.0f}".format)
+
+def display_watchlist(watchlist):
+    """Display a summary table and a combined price chart for several symbols"""
+    closes = {symbol: data['Close'] for symbol, data in watchlist.items()
+              if data is not None and not data.empty and 'Close' in data.columns}
+    if not closes:
+        st.error("Failed to fetch data. Please check the symbols and try again.")
+        return
+
+    st.success(f"Data fetched successfully for {', '.join(closes)}")
+    summary = pd.DataFrame({
+        'Current Price': [close.iloc[-1] for close in closes.values()],
+        'Change %': [(close.iloc[-1] / close.iloc[-2] - 1) * 100 if len(close) > 1 else 0.0 for close in closes.values()]
+    }, index=list(closes))
+    st.dataframe(summary.style.format({'Current Price': '₹{:.2f}', 'Change %': '{:.2f}%'}))
+
+    st.subheader("Price Chart")
+    st.line_chart(pd.DataFrame(closes))
 
 def display():
     """Main display function for data fetching module"""
@@ -331,7 +564,7 @@ def display():
 
     # Symbol input based on asset class
     if selected_asset_class == "Equity":
-        symbol = st.text_input("Enter Stock Symbol (e.g., RELIANCE.NS, AAPL)", "RELIANCE.NS")
+        symbol = st.text_input("Enter Stock Symbol(s), comma-separated (e.g., RELIANCE.NS, AAPL)", "RELIANCE.NS")
     elif selected_asset_class == "Cryptocurrency":
         symbol = st.selectbox("Select Cryptocurrency", ["BTC", "ETH", "BNB", "ADA", "SOL"])
     elif selected_asset_class == "Commodities":
@@ -339,7 +572,7 @@ def display():
     elif selected_asset_class == "Bonds":
         symbol = st.selectbox("Select Bond/Treasury", ["US10Y", "US30Y", "US5Y", "US2Y", "US3M"])
     elif selected_asset_class == "ETF":
-        symbol = st.text_input("Enter ETF Symbol (e.g., SPY, QQQ)", "SPY")
+        symbol = st.text_input("Enter ETF Symbol(s), comma-separated (e.g., SPY, QQQ)", "SPY")
     elif selected_asset_class == "Forex":
         symbol = st.selectbox("Select Forex Pair", ["USDINR", "EURUSD", "GBPUSD", "USDJPY"])
 
@@ -347,8 +580,17 @@ def display():
     periods = ["1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "max"]
     selected_period = st.selectbox("Select Time Period", periods, index=3)
 
+    # Comma-separated input fetches a whole watchlist at once
+    symbols = [s.strip() for s in symbol.split(',') if s.strip()] or [symbol]
+    symbol = symbols[0]
+
     # Fetch data button
-    if st.button("Fetch Data"):
+    fetch_clicked = st.button("Fetch Data")
+    if fetch_clicked and len(symbols) > 1:
+        with st.spinner("Fetching watchlist..."):
+            watchlist = fetch_many(symbols, selected_asset_class, period=selected_period)
+        display_watchlist(watchlist)
+    elif fetch_clicked:
         with st.spinner("Fetching data..."):
             data = fetch_asset_data(symbol, selected_asset_class, period=selected_period)
 
@@ -358,20 +600,24 @@ def display():
 
                 # Current price and basic metrics
                 if 'Close' in data.columns:
-                    current_price = data['Close'].iloc[-1]
-                    prev_price = data['Close'].iloc[-2] if len(data) > 1 else current_price
+                    # Pull the price columns out once and reduce them on the NumPy array
+                    prices = data[['Close', 'High', 'Low']].to_numpy()
+                    current_price = prices[-1, 0]
+                    prev_price = prices[-2, 0] if len(prices) > 1 else current_price
+                    change = current_price - prev_price
+                    change_pct = (change / prev_price) * 100
+                    high_price = np.nanmax(prices[:, 1])
+                    low_price = np.nanmin(prices[:, 2])
 
                     col1, col2, col3, col4 = st.columns(4)
                     with col1:
                         st.metric("Current Price", f"₹{current_price:.2f}")
                     with col2:
-                        change = current_price - prev_price
-                        change_pct = (change / prev_price) * 100
                         st.metric("Change", f"₹{change:.2f}", f"{change_pct:.2f}%")
                     with col3:
-                        st.metric("High", f"₹{data['High'].max():.2f}")
+                        st.metric("High", f"₹{high_price:.2f}")
                     with col4:
-                        st.metric("Low", f"₹{data['Low'].min():.2f}")
+                        st.metric("Low", f"₹{low_price:.2f}")
 
                 # Price chart
                 st.subheader("Price Chart")
@@ -386,14 +632,27 @@ def display():
                 with st.expander("View Raw Data"):
                     st.dataframe(data)
 
-                # Download options
-                csv = data.to_csv().encode('utf-8')
-                st.download_button(
-                    label="Download CSV",
-                    data=csv,
-                    file_name=f'{symbol}_{selected_period}.csv',
-                    mime='text/csv'
-                )
+                # Download options, written straight into byte buffers
+                csv_buf = io.BytesIO()
+                data.to_csv(path_or_buf=csv_buf, encoding='utf-8')
+                parquet_buf = io.BytesIO()
+                data.to_parquet(parquet_buf, engine='pyarrow', compression='zstd')
+
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.download_button(
+                        label="Download CSV",
+                        data=csv_buf.getvalue(),
+                        file_name=f'{symbol}_{selected_period}.csv',
+                        mime='text/csv'
+                    )
+                with col2:
+                    st.download_button(
+                        label="Download Parquet",
+                        data=parquet_buf.getvalue(),
+                        file_name=f'{symbol}_{selected_period}.parquet',
+                        mime='application/octet-stream'
+                    )
             else:
                 st.error("Failed to fetch data. Please check the symbol and try again.")
 
@@ -413,54 +672,36 @@ def display():
                     # Display Income Statement
                     st.subheader("💰 Income Statement (₹ in Crores)")
                     if financials['income_statement']:
-                        is_df = pd.DataFrame(financials['income_statement']).T
-                        st.dataframe(is_df.style.format("{:,.0f}"))
+                        st.dataframe(format_statement(financials['income_statement']))
 
                     # Display Balance Sheet
                     st.subheader("🏦 Balance Sheet (₹ in Crores)")
                     if financials['balance_sheet']:
-                        bs_df = pd.DataFrame(financials['balance_sheet']).T
-                        st.dataframe(bs_df.style.format("{:,.0f}"))
+                        st.dataframe(format_statement(financials['balance_sheet']))
 
                     # Display Cash Flow Statement
                     st.subheader("💵 Cash Flow Statement (₹ in Crores)")
                     if financials['cash_flow']:
-                        cf_df = pd.DataFrame(financials['cash_flow']).T
-                        st.dataframe(cf_df.style.format("{:,.0f}"))
+                        st.dataframe(format_statement(financials['cash_flow']))
 
                     # Key Financial Ratios
                     st.subheader("📊 Key Financial Ratios")
                     if len(fy_years) >= 2:
-                        latest_fy = fy_years[0]
-                        prev_fy = fy_years[1]
-
-                        # Calculate growth rates
-                        try:
-                            revenue_latest = financials['income_statement'][latest_fy].get('Revenue', 0)
-                            revenue_prev = financials['income_statement'][prev_fy].get('Revenue', 0)
-                            profit_latest = financials['income_statement'][latest_fy].get('Net Profit', 0)
-                            profit_prev = financials['income_statement'][prev_fy].get('Net Profit', 0)
-
-                            if revenue_prev > 0:
-                                revenue_growth = ((revenue_latest - revenue_prev) / revenue_prev) * 100
-                            else:
-                                revenue_growth = 0
-
-                            if profit_prev > 0:
-                                profit_growth = ((profit_latest - profit_prev) / profit_prev) * 100
-                            else:
-                                profit_growth = 0
-
-                            col1, col2, col3 = st.columns(3)
-                            with col1:
-                                st.metric("Revenue Growth", f"{revenue_growth:.1f}%")
-                            with col2:
-                                st.metric("Profit Growth", f"{profit_growth:.1f}%")
-                            with col3:
-                                profit_margin = (profit_latest / revenue_latest * 100) if revenue_latest > 0 else 0
-                                st.metric("Net Profit Margin", f"{profit_margin:.1f}%")
-                        except:
-                            st.info("Unable to calculate growth rates with available data.")
+                        # Years run newest first, so pct_change(-1) compares each year with the one after it
+                        is_df = pd.DataFrame.from_dict(financials['income_statement'], orient='index').sort_index(ascending=False)
+                        is_df = is_df.reindex(columns=['Revenue', 'Net Profit']).fillna(0)
+                        latest, prev = is_df.iloc[0], is_df.iloc[1]
+                        yoy = (is_df.pct_change(-1).iloc[0] * 100).where(prev > 0, 0)
+                        revenue_latest = latest['Revenue']
+                        profit_margin = (latest['Net Profit'] / revenue_latest * 100) if revenue_latest > 0 else 0
+
+                        col1, col2, col3 = st.columns(3)
+                        with col1:
+                            st.metric("Revenue Growth", f"{yoy['Revenue']:.1f}%")
+                        with col2:
+                            st.metric("Profit Growth", f"{yoy['Net Profit']:.1f}%")
+                        with col3:
+                            st.metric("Net Profit Margin", f"{profit_margin:.1f}%")
 
                 else:
                     st.error("Unable to fetch financial statements. Please try again later.")
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import re
+import time
+import pandas as pd
+from datetime import timedelta
+
+# Cache lifetimes in seconds
+INTRADAY_TTL = 3600      # 1 hour for minute/hour bars
+DAILY_TTL = 86400        # 24 hours for daily and longer bars
+STATEMENT_TTL = 604800   # 7 days for financial statements, which change quarterly
+INFO_TTL = 86400         # 24 hours for ticker.info fundamentals
+
+def ttl_for_interval(interval):
+    """Return the cache lifetime for a Yahoo Finance bar interval"""
+    # Intraday intervals look like 1m, 5m, 90m, 1h; daily and longer end in d, wk or mo
+    return INTRADAY_TTL if interval.endswith(('m', 'h')) else DAILY_TTL
+
+class FileCache:
+    """On-disk TTL cache storing DataFrames as Parquet with a JSON sidecar"""
+
+    def __init__(self, root=os.path.join('.cache', 'yf')):
+        self.root = root
+
+    def _paths(self, key):
+        """Return the Parquet and sidecar paths for a (fn, symbol, period, interval) key"""
+        fn = key[0]
+        digest = hashlib.md5(':'.join(str(part) for part in key).encode('utf-8')).hexdigest()
+        directory = os.path.join(self.root, fn)
+        return os.path.join(directory, f"{digest}.parquet"), os.path.join(directory, f"{digest}.json")
+
+    def get(self, key, columns=None):
+        """Return the cached DataFrame for key, or None if missing or expired
+
+        columns limits the read to those Parquet columns, so the others are never decompressed.
+        """
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if time.time() - meta['timestamp'] > meta['ttl']:
+                return None
+            return pd.read_parquet(data_path, columns=columns)
+        except (OSError, ValueError, TypeError, KeyError, ImportError):
+            return None
+
+    def set(self, key, data, ttl):
+        """Store a DataFrame under key for ttl seconds"""
+        data_path, meta_path = self._paths(key)
+        try:
+            os.makedirs(os.path.dirname(data_path), exist_ok=True)
+            data.to_parquet(data_path)
+            with open(meta_path, 'w') as f:
+                json.dump({'timestamp': time.time(), 'ttl': ttl}, f)
+        except (OSError, ValueError, TypeError, ImportError):
+            # Caching is best-effort: a failed write only means the next call refetches
+            pass
+
+    def get_or_set(self, key, ttl, loader):
+        """Return the cached DataFrame for key, calling loader and storing its result on a miss"""
+        data = self.get(key)
+        if data is None:
+            data = loader()
+            if data is not None and not data.empty:
+                self.set(key, data, ttl)
+        return data
+
+    def get_json(self, key):
+        """Return the JSON payload cached under key, or None if missing or expired"""
+        _, meta_path = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if time.time() - meta['timestamp'] > meta['ttl']:
+                return None
+            return meta['payload']
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+    def set_json(self, key, payload, ttl):
+        """Store a JSON-serialisable payload under key for ttl seconds, in the sidecar file alone"""
+        _, meta_path = self._paths(key)
+        try:
+            os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+            with open(meta_path, 'w') as f:
+                json.dump({'timestamp': time.time(), 'ttl': ttl, 'payload': payload}, f)
+        except (OSError, ValueError, TypeError):
+            pass
+
+    def get_or_set_json(self, key, ttl, loader):
+        """JSON counterpart of get_or_set; empty payloads are returned but not stored"""
+        payload = self.get_json(key)
+        if payload is None:
+            payload = loader()
+            if payload:
+                self.set_json(key, payload, ttl)
+        return payload
+
+class HistoryStore:
+    """Append-only Parquet store of price history, one file per (symbol, interval)"""
+
+    # First bar of a window can trail its start date by weekends and holidays
+    START_GRACE = timedelta(days=7)
+
+    def __init__(self, root=os.path.join('.cache', 'yf')):
+        self.root = root
+
+    def _path(self, symbol, interval):
+        """Return the Parquet path for symbol, with characters like ^ and = made filename-safe"""
+        safe_symbol = re.sub(r'[^A-Za-z0-9._-]', '_', symbol)
+        return os.path.join(self.root, f"{safe_symbol}_{interval}.parquet")
+
+    def load(self, symbol, interval):
+        """Return the stored history, or None if nothing is stored"""
+        try:
+            return pd.read_parquet(self._path(symbol, interval))
+        except (OSError, ValueError, TypeError, ImportError):
+            return None
+
+    def save(self, symbol, interval, data):
+        """Replace the stored history with data"""
+        path = self._path(symbol, interval)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            data.to_parquet(path)
+        except (OSError, ValueError, TypeError, ImportError):
+            # Best-effort like FileCache: the next call simply downloads the full window again
+            pass
+
+    def update(self, symbol, interval, start_date, end_date, loader):
+        """Return history from start_date to end_date, downloading only bars missing from the store
+
+        loader(start, end) must return the bars for that range.
+        """
+        stored = self.load(symbol, interval)
+
+        if stored is None or stored.empty or stored.index.min() > self._align(start_date, stored.index) + self.START_GRACE:
+            history = loader(start_date, end_date)
+        else:
+            # Refetch from the last stored bar so a partial latest bar gets replaced
+            recent = loader(stored.index.max().to_pydatetime(), end_date)
+            history = pd.concat([stored, recent])
+            history = history[~history.index.duplicated(keep='last')].sort_index()
+
+        if history is not None and not history.empty:
+            self.save(symbol, interval, history)
+            return history.loc[self._align(start_date, history.index):].copy()
+        return history
+
+    @staticmethod
+    def _align(moment, index):
+        """Convert a naive datetime to a Timestamp comparable with index"""
+        stamp = pd.Timestamp(moment)
+        return stamp.tz_localize(index.tz) if index.tz is not None else stamp
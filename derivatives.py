@@ -1,60 +1,102 @@
+import asyncio
+import functools
+import threading
 import streamlit as st
 import pandas as pd
 import numpy as np
 import requests
-import ccxt
+import ccxt.async_support as ccxt_async
 from forex_python.converter import CurrencyRates
-from src.technical_analysis import display_technical_analysis
-import yfinance as yf
+from src.technical_analysis import display_technical_analysis, calculate_rsi, calculate_macd, compute_indicators
+from src.data_fetcher import _download, fetch_asset_data_many, get_ticker
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from scipy.special import ndtr
+
+try:
+    # Optional JIT kernel for whole chains; numba is not a hard dependency
+    from src.greeks_nb import greeks_chain
+except ImportError:
+    greeks_chain = None
+
+GREEK_NAMES = ('delta', 'gamma', 'theta', 'vega', 'rho')
+GREEKS_CACHE_DECIMALS = 8  # rounding applied to scalar Greeks inputs before the memo lookup
+
+NSE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'application/json',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Referer': 'https://www.nseindia.com/option-chain'
+}
+
+# Module-level sessions keep connections (and NSE's cookies) alive across Analyze clicks
+_NSE_SESSION = requests.Session()
+_NSE_SESSION.headers.update(NSE_HEADERS)
+_NSE_LOCK = threading.Lock()
+NSE_TIMEOUT = 10  # seconds; bounds how long a stalled NSE request can hold _NSE_LOCK or a caller
+_AV_SESSION = requests.Session()
+
+def _nse_session():
+    """Return the shared NSE session, visiting the home page first if it holds no cookies yet"""
+    with _NSE_LOCK:
+        if not _NSE_SESSION.cookies:
+            # The option-chain API rejects requests without the cookies set by the main page
+            _NSE_SESSION.get('https://www.nseindia.com', timeout=NSE_TIMEOUT)
+    return _NSE_SESSION
+
+def _prime_nse_session():
+    """Visit the NSE main page in the background so the first Analyze click finds cookies ready"""
+    try:
+        _nse_session()
+    except requests.RequestException:
+        # Best-effort: fetch_option_chain_nse repeats the visit while the jar is empty
+        pass
+
+# fetch_option_chain_nse waits on _NSE_LOCK, so a click during the warm-up reuses its cookies
+threading.Thread(target=_prime_nse_session, daemon=True).start()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_option_chain_nse(symbol):
+    """Fetch the NSE option chain as (calls, puts); every failure raises, so only real chains are cached"""
+    # NSE option chain API
+    symbol_clean = symbol.replace('.NS', '').replace('NSE:', '')
+    url = f"https://www.nseindia.com/api/option-chain-indices?symbol={symbol_clean}"
+
+    response = _nse_session().get(url, timeout=NSE_TIMEOUT)
+    if response.status_code in (401, 403):
+        # Cookies expired: clear them so the next call repeats the main-page visit, then retry once
+        _NSE_SESSION.cookies.clear()
+        response = _nse_session().get(url, timeout=NSE_TIMEOUT)
+
+    if response.status_code != 200:
+        raise ValueError(f"NSE API returned status code: {response.status_code}")
+    data = response.json()
+    if 'records' not in data or 'data' not in data['records']:
+        raise ValueError("Option chain data structure changed")
+
+    # Split call and put legs in a single pass over the strikes
+    calls_data, puts_data = [], []
+    for item in data['records']['data']:
+        if item.get('CE'):
+            calls_data.append(item['CE'])
+        if item.get('PE'):
+            puts_data.append(item['PE'])
+    if not calls_data and not puts_data:
+        raise ValueError(f"NSE returned no options for {symbol_clean}")
+
+    return pd.DataFrame.from_records(calls_data), pd.DataFrame.from_records(puts_data)
 
 def fetch_option_chain_nse(symbol):
     """Fetch option chain data from NSE with improved error handling"""
     try:
-        # NSE option chain API
-        symbol_clean = symbol.replace('.NS', '').replace('NSE:', '')
-        url = f"https://www.nseindia.com/api/option-chain-indices?symbol={symbol_clean}"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'application/json',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Referer': 'https://www.nseindia.com/option-chain'
-        }
-
-        # First make a request to the main page to set cookies
-        session = requests.Session()
-        session.get('https://www.nseindia.com', headers=headers)
-        response = session.get(url, headers=headers)
-
-        if response.status_code == 200:
-            data = response.json()
-            if 'records' in data and 'data' in data['records']:
-                # Parse the data properly
-                calls_data = [item for item in data['records']['data'] if item.get('CE')]
-                puts_data = [item for item in data['records']['data'] if item.get('PE')]
-
-                if calls_data:
-                    calls = pd.DataFrame([item['CE'] for item in calls_data])
-                else:
-                    calls = pd.DataFrame()
-
-                if puts_data:
-                    puts = pd.DataFrame([item['PE'] for item in puts_data])
-                else:
-                    puts = pd.DataFrame()
-
-                return calls, puts
-            else:
-                st.warning("Option chain data structure changed. Using fallback method.")
-                return None, None
-        else:
-            st.error(f"NSE API returned status code: {response.status_code}")
-            return None, None
+        return _fetch_option_chain_nse(symbol)
     except Exception as e:
+        # Reported here rather than inside the cached fetch, so the message is not replayed from the cache
         st.error(f"Error fetching NSE option chain: {e}")
         # Fallback to Yahoo Finance options
         try:
             st.info("Trying Yahoo Finance as fallback...")
-            ticker = yf.Ticker(symbol)
+            ticker = get_ticker(symbol)
             options = ticker.options
             if options:
                 option_chain = ticker.option_chain(options[0])
@@ -63,30 +105,87 @@ def fetch_option_chain_nse(symbol):
             pass
         return None, None
 
-def calculate_greeks(option_price, stock_price, strike, time_to_expiry, volatility, risk_free_rate=0.06):
-    """Calculate option Greeks using Black-Scholes model"""
-    try:
-        from scipy.stats import norm
-        import math
-
-        d1 = (math.log(stock_price / strike) + (risk_free_rate + volatility**2 / 2) * time_to_expiry) / (volatility * math.sqrt(time_to_expiry))
-        d2 = d1 - volatility * math.sqrt(time_to_expiry)
-
-        delta = norm.cdf(d1)
-        gamma = norm.pdf(d1) / (stock_price * volatility * math.sqrt(time_to_expiry))
-        theta = -stock_price * norm.pdf(d1) * volatility / (2 * math.sqrt(time_to_expiry)) - risk_free_rate * strike * math.exp(-risk_free_rate * time_to_expiry) * norm.cdf(d2)
-        vega = stock_price * math.sqrt(time_to_expiry) * norm.pdf(d1) * 0.01
-        rho = strike * time_to_expiry * math.exp(-risk_free_rate * time_to_expiry) * norm.cdf(d2) * 0.01
-
-        return {
-            'delta': delta,
-            'gamma': gamma,
-            'theta': theta,
-            'vega': vega,
-            'rho': rho
+def _greeks_arrays(S, K, T, sigma, r):
+    """Vectorised Black-Scholes Greeks over broadcastable float arrays
+
+    A zero strike gives its limit (delta 1, the rest 0). A non-positive price, expiry or
+    volatility, a negative or nan strike, and any non-finite result give zeros.
+    """
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        sqrt_T = np.sqrt(T)
+        sigma_sqrt_T = sigma * sqrt_T
+        d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / sigma_sqrt_T
+        d2 = d1 - sigma_sqrt_T
+
+        # Shared terms: N(d1), N(d2), the standard normal pdf at d1 and the discount factor
+        Nd1 = ndtr(d1)
+        Nd2 = ndtr(d2)
+        nd1 = np.exp(-0.5 * d1 * d1) * 0.3989422804014327
+        discount = np.exp(-r * T)
+
+        greeks = {
+            'delta': Nd1,
+            'gamma': nd1 / (S * sigma_sqrt_T),
+            'theta': -S * nd1 * sigma / (2 * sqrt_T) - r * K * discount * Nd2,
+            'vega': S * sqrt_T * nd1 * 0.01,
+            'rho': K * T * discount * Nd2 * 0.01
         }
-    except:
-        return {'delta': 0, 'gamma': 0, 'theta': 0, 'vega': 0, 'rho': 0}
+
+    # Invalid inputs report zero Greeks rather than nan/inf; K = 0 is valid and already at its limit.
+    # The numba kernel applies the same rules, and _chain_kernel_ok checks that it does
+    valid = (S > 0) & (K >= 0) & (T > 0) & (sigma > 0)
+    return {name: np.where(valid & np.isfinite(value), value, 0.0) for name, value in greeks.items()}
+
+# Edge cases the numba kernel must reproduce before it replaces _greeks_arrays: (S, T, sigma) per
+# chain of zero, negative, nan and ordinary strikes, including expired and zero- or negative-volatility options
+_PARITY_STRIKES = np.array([0.0, -50.0, np.nan, 50.0, 100.0, 150.0])
+_PARITY_CASES = ((100.0, 0.5, 0.2), (100.0, 0.0, 0.2), (100.0, 0.5, 0.0), (100.0, 0.5, -0.2), (0.0, 0.5, 0.2))
+
+@functools.lru_cache(maxsize=1)
+def _chain_kernel_ok():
+    """Check once that greeks_chain matches _greeks_arrays on the edge cases, so a drift falls back to NumPy"""
+    for S, T, sigma in _PARITY_CASES:
+        expected = _greeks_arrays(S, _PARITY_STRIKES, T, sigma, 0.06)
+        values = greeks_chain(S, _PARITY_STRIKES, T, sigma, 0.06)
+        if not all(np.allclose(values[i], expected[name]) for i, name in enumerate(GREEK_NAMES)):
+            return False
+    return True
+
+@functools.lru_cache(maxsize=4096)
+def _greeks_scalar(S, K, T, sigma, r):
+    """Greeks for one option as a tuple of floats, memoised for strikes seen again on reruns"""
+    # Inputs the Black-Scholes formulas cannot take report zero Greeks, as in _greeks_arrays;
+    # K = 0 is left to it, so a zero strike gets the same delta-1 limit as a chain does
+    if S <= 0 or K < 0 or T <= 0 or sigma <= 0:
+        return (0.0,) * len(GREEK_NAMES)
+    # NumPy scalars, so anything left over goes through errstate and the finite cleanup
+    # instead of raising in plain float arithmetic
+    greeks = _greeks_arrays(*map(np.float64, (S, K, T, sigma, r)))
+    return tuple(float(greeks[name]) for name in GREEK_NAMES)
+
+def calculate_greeks(option_price, stock_price, strike, time_to_expiry, volatility, risk_free_rate=0.06):
+    """Calculate option Greeks using Black-Scholes model
+
+    Inputs may be scalars or NumPy arrays (e.g. every strike of a chain); the returned
+    dict holds floats for scalar inputs and arrays otherwise.
+    """
+    S = np.asarray(stock_price, dtype=float)
+    K = np.asarray(strike, dtype=float)
+    T = np.asarray(time_to_expiry, dtype=float)
+    sigma = np.asarray(volatility, dtype=float)
+    r = float(risk_free_rate)
+
+    if S.ndim == K.ndim == T.ndim == sigma.ndim == 0:
+        # Bin inputs so float noise in otherwise identical calls still hits the cache
+        key = tuple(round(float(value), GREEKS_CACHE_DECIMALS) for value in (S, K, T, sigma, r))
+        return dict(zip(GREEK_NAMES, _greeks_scalar(*key)))
+
+    # One underlying, expiry and volatility across a 1-D chain of strikes fits the numba kernel
+    if greeks_chain is not None and K.ndim == 1 and S.ndim == T.ndim == sigma.ndim == 0 and _chain_kernel_ok():
+        values = greeks_chain(float(S), np.ascontiguousarray(K), float(T), float(sigma), r)
+        return dict(zip(GREEK_NAMES, values))
+
+    return _greeks_arrays(S, K, T, sigma, r)
 
 def fetch_forex_data(pair):
     """Fetch forex data with proper error handling and multiple sources"""
@@ -95,9 +194,9 @@ def fetch_forex_data(pair):
         if not pair.endswith('=X'):
             pair = f"{pair}=X"
 
-        data = yf.download(pair, period="1y", auto_adjust=False)
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.droplevel(1)
+        # Memoised in-process and on disk; failed, empty and all-NaN downloads raise and are never cached.
+        # _download requests flat single-ticker columns, so no MultiIndex needs collapsing
+        data = _download('derivatives.fetch_forex_data', pair, '1y', '1d')
         return data
     except Exception as e:
         st.warning(f"Yahoo Finance failed for {pair}: {e}")
@@ -115,7 +214,7 @@ def fetch_forex_data(pair):
                     'apikey': api_key,
                     'outputsize': 'compact'
                 }
-                response = requests.get(base_url, params=params)
+                response = _AV_SESSION.get(base_url, params=params)
                 if response.status_code == 200:
                     data = response.json()
                     if 'Time Series FX (Daily)' in data:
@@ -137,37 +236,77 @@ def fetch_crypto_data(symbol):
         if not symbol.endswith('-USD'):
             symbol = f"{symbol}-USD"
 
-        data = yf.download(symbol, period="1y", auto_adjust=False)
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.droplevel(1)
+        # Memoised in-process and on disk; failed, empty and all-NaN downloads raise and are never cached.
+        # _download requests flat single-ticker columns, so no MultiIndex needs collapsing
+        data = _download('derivatives.fetch_crypto_data', symbol, '1y', '1d')
         return data
     except Exception as e:
         st.warning(f"Yahoo Finance failed for {symbol}: {e}")
         # Fallback to CCXT for crypto data
         try:
-            exchange = ccxt.binance()
-            symbol_ccxt = symbol.replace('-USD', '/USDT')  # Convert to Binance format
-            ohlcv = exchange.fetch_ohlcv(symbol_ccxt, timeframe='1d', limit=365)
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'Open', 'High', 'Low', 'Close', 'Volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
+            df = fetch_crypto_ohlcv_many([symbol])[symbol]
+            if isinstance(df, Exception):
+                raise df
             return df
         except Exception as ccxt_e:
             st.error(f"CCXT fallback also failed: {ccxt_e}")
             return pd.DataFrame()
 
+async def _fetch_ohlcv_async(symbols):
+    """Fetch a year of daily Binance bars for several ccxt symbols concurrently"""
+    exchange = ccxt_async.binance()
+    try:
+        return await asyncio.gather(
+            *[exchange.fetch_ohlcv(symbol, timeframe='1d', limit=365) for symbol in symbols],
+            return_exceptions=True
+        )
+    finally:
+        await exchange.close()
+
+def fetch_crypto_ohlcv_many(symbols):
+    """Fetch Binance daily bars for Yahoo-style crypto symbols, mapping each to a DataFrame or its exception"""
+    results = asyncio.run(_fetch_ohlcv_async([symbol.replace('-USD', '/USDT') for symbol in symbols]))  # Convert to Binance format
+
+    frames = {}
+    for symbol, ohlcv in zip(symbols, results):
+        if isinstance(ohlcv, Exception):
+            frames[symbol] = ohlcv
+            continue
+        df = pd.DataFrame(ohlcv, columns=['timestamp', 'Open', 'High', 'Low', 'Close', 'Volume'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df.set_index('timestamp', inplace=True)
+        frames[symbol] = df
+    return frames
+
 def analyze_forex_correlation(pairs):
-    """Analyze correlation between forex pairs"""
+    """Analyze correlation between forex pairs' daily returns"""
+    # One batched Yahoo request for every pair; only pairs it misses go through the per-pair fallbacks
+    batch = fetch_asset_data_many(pairs, asset_class='Forex', period='1y')
+    missing = [pair for pair in pairs if batch.get(pair) is None or batch[pair].empty]
+
+    if missing:
+        # Fallback fetches are network-bound, so overlap them; the script context lets their warnings render
+        ctx = get_script_run_ctx()
+
+        def fetch_with_ctx(pair):
+            add_script_run_ctx(threading.current_thread(), ctx)
+            return fetch_forex_data(pair)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            batch.update(zip(missing, executor.map(fetch_with_ctx, missing)))
+
     correlation_data = {}
     for pair in pairs:
-        data = fetch_forex_data(pair)
+        data = batch[pair]
         if not data.empty:
             correlation_data[pair] = data['Close']
 
     if correlation_data:
-        df = pd.DataFrame(correlation_data)
-        correlation_matrix = df.corr()
-        return correlation_matrix
+        # Correlate daily log returns; price levels of trending pairs correlate spuriously
+        closes = pd.concat(correlation_data, axis=1).dropna()
+        returns = np.diff(np.log(closes.to_numpy(dtype=np.float64)), axis=0)
+        correlation_matrix = np.atleast_2d(np.corrcoef(returns, rowvar=False))
+        return pd.DataFrame(correlation_matrix, index=closes.columns, columns=closes.columns)
     return None
 
 def display():
@@ -194,23 +333,35 @@ def display():
                         st.subheader("Put Options")
                         st.dataframe(puts[['strikePrice', 'openInterest', 'changeinOpenInterest', 'totalTradedVolume', 'impliedVolatility', 'lastPrice']].head(10))
 
-                    # Greeks calculation for ATM option
+                    # Snapshot the columns used below as NumPy arrays once
+                    strikes = calls['strikePrice'].to_numpy(dtype=float)
+                    call_prices = calls['lastPrice'].to_numpy(dtype=float)
+                    put_strikes = puts['strikePrice'].to_numpy(dtype=float)
+                    put_prices = puts['lastPrice'].to_numpy(dtype=float)
+                    underlying = calls['underlyingValue'].iat[0] if 'underlyingValue' in calls.columns else 0
+
+                    # Greeks for the whole chain in one vectorised pass; the ATM row is shown first
                     st.subheader("Option Greeks (At-The-Money)")
-                    atm_strike = calls['strikePrice'].iloc[len(calls)//2] if not calls.empty else 0
-                    greeks = calculate_greeks(
-                        option_price=calls['lastPrice'].iloc[len(calls)//2] if not calls.empty else 0,
-                        stock_price=calls['underlyingValue'].iloc[0] if 'underlyingValue' in calls.columns else 0,
-                        strike=atm_strike,
+                    atm_index = len(calls) // 2
+                    atm_strike = strikes[atm_index]
+                    chain_greeks = calculate_greeks(
+                        option_price=call_prices,
+                        stock_price=underlying,
+                        strike=strikes,
                         time_to_expiry=30/365,  # Assuming 30 days
                         volatility=0.2  # Assumed volatility
                     )
-                    st.json(greeks)
+                    st.json({name: float(values[atm_index]) for name, values in chain_greeks.items()})
+
+                    with st.expander("Greeks for all strikes"):
+                        st.dataframe(pd.DataFrame(chain_greeks, index=calls['strikePrice']))
 
                     # Recommendations
                     st.subheader("Trading Recommendations")
-                    current_price = calls['underlyingValue'].iloc[0] if 'underlyingValue' in calls.columns else 0
-                    atm_call = calls[calls['strikePrice'] == atm_strike]['lastPrice'].iloc[0] if not calls.empty else 0
-                    atm_put = puts[puts['strikePrice'] == atm_strike]['lastPrice'].iloc[0] if not puts.empty else 0
+                    # First row at the ATM strike on each leg (the chain can list several expiries)
+                    atm_call = call_prices[np.argmax(strikes == atm_strike)]
+                    put_matches = np.flatnonzero(put_strikes == atm_strike)
+                    atm_put = put_prices[put_matches[0]] if put_matches.size else 0
 
                     if atm_call > atm_put:
                         st.success("📈 Bullish sentiment - Consider buying calls or selling puts")
@@ -219,12 +370,11 @@ def display():
 
                     # Open Interest Analysis
                     st.subheader("Open Interest Analysis")
-                    max_call_oi = calls.loc[calls['openInterest'].idxmax()] if not calls.empty else None
-                    max_put_oi = puts.loc[puts['openInterest'].idxmax()] if not puts.empty else None
-
-                    if max_call_oi is not None and max_put_oi is not None:
-                        st.write(f"Max Call OI at Strike: {max_call_oi['strikePrice']}")
-                        st.write(f"Max Put OI at Strike: {max_put_oi['strikePrice']}")
+                    # Positional argmax over the OI column; only the strike is read back
+                    max_call_oi_strike = strikes[int(np.nanargmax(calls['openInterest'].to_numpy(dtype=float)))]
+                    max_put_oi_strike = put_strikes[int(np.nanargmax(puts['openInterest'].to_numpy(dtype=float)))]
+                    st.write(f"Max Call OI at Strike: {max_call_oi_strike}")
+                    st.write(f"Max Put OI at Strike: {max_put_oi_strike}")
 
                 else:
                     st.error("Unable to fetch option chain data. Please check the symbol.")
@@ -242,20 +392,23 @@ def display():
                 st.line_chart(data['Close'])
 
                 # Technical indicators
-                from src.technical_analysis import calculate_rsi, calculate_macd
                 rsi = calculate_rsi(data)
                 macd, signal = calculate_macd(data)
+                # Latest readings pulled once from the NumPy arrays
+                latest_close = data['Close'].to_numpy()[-1]
+                latest_rsi = rsi.to_numpy()[-1]
+                latest_macd = macd.to_numpy()[-1]
 
                 col1, col2, col3 = st.columns(3)
                 with col1:
-                    st.metric("Current Price", f"₹{float(data['Close'].iloc[-1]):.2f}")
+                    st.metric("Current Price", f"₹{float(latest_close):.2f}")
                 with col2:
-                    st.metric("RSI", f"{rsi.iloc[-1]:.2f}")
+                    st.metric("RSI", f"{latest_rsi:.2f}")
                 with col3:
-                    st.metric("MACD", f"{macd.iloc[-1]:.4f}")
+                    st.metric("MACD", f"{latest_macd:.4f}")
 
                 # Recommendations
-                recommendation = "BUY" if rsi.iloc[-1] < 30 else "SELL" if rsi.iloc[-1] > 70 else "HOLD"
+                recommendation = "BUY" if latest_rsi < 30 else "SELL" if latest_rsi > 70 else "HOLD"
                 st.metric("Recommendation", recommendation, delta=recommendation)
 
                 # Correlation Analysis
@@ -276,28 +429,31 @@ def display():
             if not data.empty:
                 st.line_chart(data['Close'])
 
-                # Market metrics
+                # Market metrics from one float64 view of the closes
+                close = data['Close'].to_numpy(dtype=np.float64)
+                returns = close[1:] / close[:-1] - 1
+                change_pct = returns[-1] * 100
+                volatility = np.nanstd(returns, ddof=1) * np.sqrt(365) * 100
+
                 col1, col2, col3, col4 = st.columns(4)
                 with col1:
-                    st.metric("Current Price", f"₹{data['Close'].iloc[-1]:.2f}")
+                    st.metric("Current Price", f"₹{close[-1]:.2f}")
                 with col2:
-                    change_pct = ((data['Close'].iloc[-1] - data['Close'].iloc[-2]) / data['Close'].iloc[-2] * 100)
                     st.metric("24h Change", f"{change_pct:.2f}%", delta=f"{change_pct:.2f}%")
                 with col3:
                     st.metric("Volume", f"{data['Volume'].iloc[-1]:,.0f}")
                 with col4:
-                    volatility = data['Close'].pct_change().std() * np.sqrt(365) * 100
                     st.metric("Volatility (Annual)", f"{volatility:.2f}%")
 
-                # Technical analysis
-                display_technical_analysis(selected_crypto)
+                # Technical analysis on the same frame, with indicators computed once for both blocks
+                indicators = compute_indicators(data)
+                display_technical_analysis(selected_crypto, data=data, indicators=indicators)
 
                 # Recommendations
                 st.subheader("Trading Recommendations")
-                rsi = calculate_rsi(data).iloc[-1]
-                macd, signal = calculate_macd(data)
-                macd_current = macd.iloc[-1]
-                signal_current = signal.iloc[-1]
+                rsi = indicators['rsi'].iloc[-1]
+                macd_current = indicators['macd'].iloc[-1]
+                signal_current = indicators['signal'].iloc[-1]
 
                 if rsi < 30 and macd_current > signal_current:
                     st.success("🚀 Strong Buy Signal - RSI oversold and MACD bullish crossover")
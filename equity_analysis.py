@@ -1,84 +1,216 @@
+import asyncio
+import functools
+import hashlib
+import threading
+import time
 import streamlit as st
 import pandas as pd
 import numpy as np
-from prophet import Prophet
-import matplotlib.pyplot as plt
-from src.data_fetcher import fetch_historical_data, fetch_financial_statements
+from src.data_fetcher import fetch_historical_data, fetch_financial_statements, format_statement, get_ticker
+from src.data_fetcher_cache import FileCache, INFO_TTL
 import requests
-import yfinance as yf
-import os
-
-def calculate_ratios(balance_sheet, income_statement, cash_flow):
-    """Calculate financial ratios"""
-    ratios = {}
-
-    # Profitability Ratios
-    try:
-        ratios['ROE'] = income_statement.get('Net Income', 0) / balance_sheet.get('Equity', 1)
-        ratios['ROA'] = income_statement.get('Net Income', 0) / balance_sheet.get('Total Assets', 1)
-        ratios['Gross Margin'] = (income_statement.get('Revenue', 0) - income_statement.get('COGS', 0)) / income_statement.get('Revenue', 1)
-    except:
-        ratios['ROE'] = ratios['ROA'] = ratios['Gross Margin'] = 0
-
-    # Liquidity Ratios
-    try:
-        ratios['Current Ratio'] = balance_sheet.get('Current Assets', 0) / balance_sheet.get('Current Liabilities', 1)
-        ratios['Quick Ratio'] = (balance_sheet.get('Current Assets', 0) - balance_sheet.get('Inventory', 0)) / balance_sheet.get('Current Liabilities', 1)
-    except:
-        ratios['Current Ratio'] = ratios['Quick Ratio'] = 0
+from yfinance.exceptions import YFException
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+try:
+    # Optional JIT kernel for batch ratio screens; numba is not a hard dependency
+    from src.ratios_nb import ratios_batch as _ratios_batch_nb
+except ImportError:
+    _ratios_batch_nb = None
+
+try:
+    # Optional: evaluates the screen expressions in cache-sized chunks without temporaries
+    import numexpr as ne
+except ImportError:
+    ne = None
+
+RATIO_NAMES = ('ROE', 'ROA', 'Gross Margin', 'Current Ratio', 'Quick Ratio', 'Debt to Equity', 'Debt to Assets')
+
+# Statement fields in the kernel's argument order
+RATIO_FIELDS = (
+    ('income_statement', 'Net Income'),
+    ('balance_sheet', 'Equity'),
+    ('balance_sheet', 'Total Assets'),
+    ('income_statement', 'Revenue'),
+    ('income_statement', 'COGS'),
+    ('balance_sheet', 'Current Assets'),
+    ('balance_sheet', 'Current Liabilities'),
+    ('balance_sheet', 'Inventory'),
+    ('balance_sheet', 'Total Debt')
+)
+
+def _ratios_batch_numpy(ni, eq, ta, rev, cogs, ca, cl, inv, td):
+    """NumPy version of the ratios kernel, used when numba is unavailable"""
+    num = lambda x: np.where(np.isnan(x), 0.0, x)
+    den = lambda x: np.where(np.isnan(x), 1.0, x)
+    eq_d, ta_d, rev_d, cl_d = den(eq), den(ta), den(rev), den(cl)
+
+    # A zero denominator zeroes its whole ratio group, as the original try/except blocks did
+    profit_ok = (eq_d != 0) & (ta_d != 0) & (rev_d != 0)
+    liquid_ok = cl_d != 0
+    solvent_ok = (eq_d != 0) & (ta_d != 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rows = (
+            (profit_ok, num(ni) / eq_d),
+            (profit_ok, num(ni) / ta_d),
+            (profit_ok, (num(rev) - num(cogs)) / rev_d),
+            (liquid_ok, num(ca) / cl_d),
+            (liquid_ok, (num(ca) - num(inv)) / cl_d),
+            (solvent_ok, num(td) / eq_d),
+            (solvent_ok, num(td) / ta_d)
+        )
+        return np.array([np.where(ok, value, 0.0) for ok, value in rows])
+
+def calculate_ratios_batch(fields):
+    """Calculate ratios for many companies at once
+
+    fields maps each RATIO_FIELDS name (e.g. 'Net Income') to an array with one value per
+    company, nan where unknown; returns a dict of ratio name -> array.
+    """
+    size = len(next(iter(fields.values()))) if fields else 0
+    arrays = [np.ascontiguousarray(fields.get(name, np.full(size, np.nan)), dtype=np.float64) for _, name in RATIO_FIELDS]
+    kernel = _ratios_batch_nb or _ratios_batch_numpy
+    return dict(zip(RATIO_NAMES, kernel(*arrays)))
+
+_PCT_EXPR = "where(base > 0, (top - offset) / base * 100, nan)"
+
+def _pct_of(top, offset, base):
+    """(top - offset) / base as a percentage, nan where base is not positive"""
+    if ne is not None:
+        return ne.evaluate(_PCT_EXPR, local_dict={'top': top, 'offset': offset, 'base': base, 'nan': np.nan})
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(base > 0, (top - offset) / base * 100, np.nan)
+
+def statement_metrics_batch(revenue_latest, revenue_prev, profit_latest, profit_prev, equity_latest):
+    """Revenue/profit growth, net margin and ROE in percent for many companies at once"""
+    rev_latest, rev_prev, prof_latest, prof_prev, eq_latest = (
+        np.asarray(values, dtype=np.float64)
+        for values in (revenue_latest, revenue_prev, profit_latest, profit_prev, equity_latest)
+    )
+    return {
+        'Revenue Growth': _pct_of(rev_latest, rev_prev, rev_prev),
+        'Profit Growth': _pct_of(prof_latest, prof_prev, prof_prev),
+        'Net Profit Margin': _pct_of(prof_latest, 0.0, rev_latest),
+        'ROE': _pct_of(prof_latest, 0.0, eq_latest)
+    }
 
-    # Solvency Ratios
+def _statement_value(statement, key):
+    """Return statement[key] as a float, nan when missing or not numeric"""
     try:
-        ratios['Debt to Equity'] = balance_sheet.get('Total Debt', 0) / balance_sheet.get('Equity', 1)
-        ratios['Debt to Assets'] = balance_sheet.get('Total Debt', 0) / balance_sheet.get('Total Assets', 1)
-    except:
-        ratios['Debt to Equity'] = ratios['Debt to Assets'] = 0
+        return float(statement[key])
+    except (KeyError, TypeError, ValueError):
+        return np.nan
 
+def calculate_ratios(balance_sheet, income_statement, cash_flow):
+    """Calculate financial ratios"""
+    statements = {'balance_sheet': balance_sheet, 'income_statement': income_statement}
+    fields = {name: [_statement_value(statements[statement], name)] for statement, name in RATIO_FIELDS}
+    return {name: float(values[0]) for name, values in calculate_ratios_batch(fields).items()}
+
+# Prophet fits and forecasts on month-end bars
+FORECAST_FREQ = 'ME'
+
+@st.cache_resource(ttl=3600, show_spinner=False)
+def _fit_prophet(data_hash, _df):
+    """Fit Prophet once per distinct price history; data_hash keys the cache in place of _df"""
+    # Imported on first fit: Prophet pulls in cmdstanpy and holidays, which slows every page load
+    from prophet import Prophet
+    model = Prophet()
+    model.fit(_df)
+    return model
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _prophet_forecast(data_hash, _df, periods):
+    """Return the monthly Prophet forecast for periods years, reusing the cached fit"""
+    model = _fit_prophet(data_hash, _df)
+    future = model.make_future_dataframe(periods=periods*12, freq=FORECAST_FREQ)
+    return model.predict(future)
+
+# Illustrative statements behind the Ratio Analysis section
+SAMPLE_BALANCE_SHEET = {'Total Assets': 100000, 'Current Assets': 50000, 'Current Liabilities': 30000, 'Equity': 70000, 'Total Debt': 20000, 'Inventory': 10000}
+SAMPLE_INCOME_STATEMENT = {'Revenue': 80000, 'COGS': 50000, 'Net Income': 15000}
+
+@functools.lru_cache(maxsize=None)
+def _sample_ratios_cached():
+    """Every displayed ratio for the sample statements; the inputs are constants"""
+    ratios = calculate_ratios(SAMPLE_BALANCE_SHEET, SAMPLE_INCOME_STATEMENT, {})
+    ratios['Net Margin'] = SAMPLE_INCOME_STATEMENT.get('Net Income', 0) / SAMPLE_INCOME_STATEMENT.get('Revenue', 1)
+    ratios['Cash Ratio'] = SAMPLE_BALANCE_SHEET.get('Cash', 0) / SAMPLE_BALANCE_SHEET.get('Current Liabilities', 1)
+    ratios['Equity Ratio'] = SAMPLE_BALANCE_SHEET.get('Equity', 0) / SAMPLE_BALANCE_SHEET.get('Total Assets', 1)
     return ratios
 
+def _sample_ratios():
+    """Return a copy of the sample ratios, so callers cannot change the memoised dict"""
+    return dict(_sample_ratios_cached())
+
 def forecast_financials(historical_data, periods=10):
     """Forecast financial metrics using Prophet"""
     try:
-        df = historical_data.reset_index()
-        df = df[['Date', 'Close']].rename(columns={'Date': 'ds', 'Close': 'y'})
+        # Month-end closes: a multi-year chart shows no daily detail, and Stan fits ~20x fewer rows
+        monthly = historical_data['Close'].resample(FORECAST_FREQ).last().dropna()
+        df = monthly.rename_axis('ds').reset_index(name='y')
 
-        model = Prophet()
-        model.fit(df)
-
-        future = model.make_future_dataframe(periods=periods*365)
-        forecast = model.predict(future)
-
-        return forecast
+        # Hash dates and closes so reruns on unchanged data skip the Stan fit
+        data_hash = hashlib.md5(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()
+        return _prophet_forecast(data_hash, df, periods)
     except Exception as e:
         st.error(f"Forecasting error: {e}")
         return None
 
+@functools.lru_cache(maxsize=64)
+def _discount_factors(discount_rate, years):
+    """Return the read-only 1/(1+r)^t vector for t = 1..years, shared by every call at the same rate"""
+    factors = (1.0 + discount_rate) ** -np.arange(1, years + 1, dtype=np.float64)
+    factors.flags.writeable = False
+    return factors
+
 def dcf_valuation(free_cash_flow, discount_rate=0.1, growth_rate=0.03):
     """Discounted Cash Flow valuation"""
+    if isinstance(free_cash_flow, (int, float)):
+        free_cash_flow = [free_cash_flow] * 5  # Assume 5 years of FCF
+
     try:
-        if isinstance(free_cash_flow, (int, float)):
-            free_cash_flow = [free_cash_flow] * 5  # Assume 5 years of FCF
+        fcf = np.asarray(free_cash_flow, dtype=np.float64)
+    except (TypeError, ValueError):
+        return 0
 
-        terminal_value = free_cash_flow[-1] * (1 + growth_rate) / (discount_rate - growth_rate)
-        intrinsic_value = sum([fcf / (1 + discount_rate)**i for i, fcf in enumerate(free_cash_flow)]) + terminal_value / (1 + discount_rate)**len(free_cash_flow)
-        return intrinsic_value
-    except:
+    # No cash-flow series, or a Gordon terminal value with a zero spread, has no valuation
+    spread = discount_rate - growth_rate
+    if fcf.ndim != 1 or fcf.size == 0 or spread == 0:
         return 0
 
+    # Year t cash flow is discounted t periods, t = 1..n; the terminal value sits at year n
+    discount_factors = _discount_factors(float(discount_rate), fcf.size)
+    terminal_value = fcf[-1] * (1 + growth_rate) / spread
+    intrinsic_value = np.dot(fcf, discount_factors) + terminal_value * discount_factors[-1]
+    return float(intrinsic_value)
+
 def ddm_valuation(dividend, discount_rate=0.1, growth_rate=0.03):
     """Dividend Discount Model valuation"""
+    spread = discount_rate - growth_rate
     try:
-        if dividend > 0:
-            return dividend * (1 + growth_rate) / (discount_rate - growth_rate)
-        return 0
-    except:
-        return 0
+        if dividend > 0 and spread != 0:
+            return dividend * (1 + growth_rate) / spread
+    except TypeError:
+        # Yahoo reports a missing dividend as None
+        pass
+    return 0
+
+_INFO_CACHE = FileCache()
+
+@functools.lru_cache(maxsize=128)
+def _fetch_info(symbol, ttl_bucket):
+    """Return ticker.info, served from disk when fresh; ttl_bucket rolls over every INFO_TTL
+
+    Failures raise, so lru_cache never memoises them.
+    """
+    return _INFO_CACHE.get_or_set_json(('fetch_fundamentals_yahoo', symbol), INFO_TTL, lambda: get_ticker(symbol).info)
 
 def fetch_fundamentals_yahoo(symbol):
     """Fetch fundamental data from Yahoo Finance"""
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
+        info = _fetch_info(symbol, int(time.time() // INFO_TTL))
         return {
             'market_cap': info.get('marketCap', 0),
             'pe_ratio': info.get('trailingPE', 0),
@@ -89,15 +221,46 @@ def fetch_fundamentals_yahoo(symbol):
             'revenue': info.get('totalRevenue', 0),
             'net_income': info.get('netIncomeToCommon', 0)
         }
-    except:
+    except (OSError, YFException, ValueError, KeyError, TypeError, AttributeError):
+        # Network failures (requests and curl_cffi errors are OSErrors) and malformed payloads
         return {}
 
+async def _afetch_fundamentals(peers):
+    """Fetch every peer's fundamentals concurrently on one event loop"""
+    return await asyncio.gather(*[asyncio.to_thread(fetch_fundamentals_yahoo, peer) for peer in peers])
+
 def peer_comparison(symbol, peers):
     """Compare with peer companies"""
-    comparison = {}
-    for peer in peers:
-        comparison[peer] = fetch_fundamentals_yahoo(peer)
-    return comparison
+    # Duplicates share one fetch; gather keeps the peer order
+    peers = list(dict.fromkeys(peers))
+    if not peers:
+        return {}
+    return dict(zip(peers, asyncio.run(_afetch_fundamentals(peers))))
+
+# Column types for the peer table, in fetch_fundamentals_yahoo key order
+PEER_DTYPE = np.dtype([
+    ('market_cap', 'f8'), ('pe_ratio', 'f8'), ('pb_ratio', 'f8'), ('dividend_yield', 'f4'),
+    ('beta', 'f4'), ('eps', 'f4'), ('revenue', 'f8'), ('net_income', 'f8')
+])
+
+def _peer_frame(peer_data):
+    """Build the peer table from a pre-typed structured array, so pandas skips per-column inference"""
+    # Peers whose fetch failed return {} and are left out, as DataFrame.from_dict did
+    fetched = {peer: fundamentals for peer, fundamentals in peer_data.items() if fundamentals}
+    rows = np.empty(len(fetched), dtype=PEER_DTYPE)
+    for i, fundamentals in enumerate(fetched.values()):
+        rows[i] = tuple(fundamentals.get(name, np.nan) for name in PEER_DTYPE.names)
+    return pd.DataFrame(rows, index=list(fetched))
+
+def _float32(df, keep=()):
+    """Return df with float columns downcast to float32 for a smaller Arrow payload, except those in keep"""
+    columns = df.select_dtypes('float').columns.difference(keep)
+    return df.astype(dict.fromkeys(columns, np.float32))
+
+def _run_with_ctx(ctx, fn, *args):
+    """Run fn on a worker thread attached to the script context, so its st.* messages still render"""
+    add_script_run_ctx(threading.current_thread(), ctx)
+    return fn(*args)
 
 def display():
     st.header("📈 Equity Share Market Analysis")
@@ -157,15 +320,20 @@ def display():
 
     if st.button("Analyze"):
         with st.spinner("Analyzing..."):
-            # Fetch data
-            data = fetch_historical_data(company)
+            # Fetch prices, fundamentals and statements concurrently instead of one after another
+            ctx = get_script_run_ctx()
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                data_future = executor.submit(_run_with_ctx, ctx, fetch_historical_data, company)
+                fundamentals_future = executor.submit(fetch_fundamentals_yahoo, company)
+                financials_future = executor.submit(_run_with_ctx, ctx, fetch_financial_statements, company)
+            data = data_future.result()
 
             if data is not None and not data.empty:
                 # Fundamental Analysis
                 st.subheader("📊 Fundamental Analysis")
 
                 # Fetch from Yahoo Finance
-                fundamentals = fetch_fundamentals_yahoo(company)
+                fundamentals = fundamentals_future.result()
                 if fundamentals:
                     col1, col2, col3, col4 = st.columns(4)
                     with col1:
@@ -179,7 +347,7 @@ def display():
 
                 # Fetch and display Financial Statements
                 st.subheader("📊 Financial Statements")
-                financials = fetch_financial_statements(company)
+                financials = financials_future.result()
 
                 if financials:
                     # Create tabs for different statements
@@ -188,24 +356,21 @@ def display():
                     with tab1:
                         st.subheader("Income Statement (₹ in Crores)")
                         if financials['income_statement']:
-                            is_df = pd.DataFrame(financials['income_statement']).T
-                            st.dataframe(is_df.style.format("{:,.0f}"))
+                            st.dataframe(format_statement(financials['income_statement']))
                         else:
                             st.info("Income statement data not available")
 
                     with tab2:
                         st.subheader("Balance Sheet (₹ in Crores)")
                         if financials['balance_sheet']:
-                            bs_df = pd.DataFrame(financials['balance_sheet']).T
-                            st.dataframe(bs_df.style.format("{:,.0f}"))
+                            st.dataframe(format_statement(financials['balance_sheet']))
                         else:
                             st.info("Balance sheet data not available")
 
                     with tab3:
                         st.subheader("Cash Flow Statement (₹ in Crores)")
                         if financials['cash_flow']:
-                            cf_df = pd.DataFrame(financials['cash_flow']).T
-                            st.dataframe(cf_df.style.format("{:,.0f}"))
+                            st.dataframe(format_statement(financials['cash_flow']))
                         else:
                             st.info("Cash flow data not available")
 
@@ -213,47 +378,27 @@ def display():
                     st.subheader("📈 Key Financial Ratios")
                     fy_years = list(financials['income_statement'].keys())
                     if len(fy_years) >= 2:
-                        latest_fy = fy_years[0]
-                        prev_fy = fy_years[1]
-
                         try:
-                            # Revenue and Profit growth
-                            revenue_latest = financials['income_statement'][latest_fy].get('Revenue', 0)
-                            revenue_prev = financials['income_statement'][prev_fy].get('Revenue', 0)
-                            profit_latest = financials['income_statement'][latest_fy].get('Net Profit', 0)
-                            profit_prev = financials['income_statement'][prev_fy].get('Net Profit', 0)
-
-                            col1, col2, col3, col4 = st.columns(4)
-
-                            with col1:
-                                if revenue_prev > 0:
-                                    revenue_growth = ((revenue_latest - revenue_prev) / revenue_prev) * 100
-                                    st.metric("Revenue Growth", f"{revenue_growth:.1f}%")
-                                else:
-                                    st.metric("Revenue Growth", "N/A")
-
-                            with col2:
-                                if profit_prev > 0:
-                                    profit_growth = ((profit_latest - profit_prev) / profit_prev) * 100
-                                    st.metric("Profit Growth", f"{profit_growth:.1f}%")
-                                else:
-                                    st.metric("Profit Growth", "N/A")
-
-                            with col3:
-                                if revenue_latest > 0:
-                                    profit_margin = (profit_latest / revenue_latest) * 100
-                                    st.metric("Net Profit Margin", f"{profit_margin:.1f}%")
-                                else:
-                                    st.metric("Net Profit Margin", "N/A")
-
-                            with col4:
-                                # ROE calculation
-                                equity_latest = financials['balance_sheet'][latest_fy].get('Equity', 1)
-                                if equity_latest > 0:
-                                    roe = (profit_latest / equity_latest) * 100
-                                    st.metric("ROE", f"{roe:.1f}%")
-                                else:
-                                    st.metric("ROE", "N/A")
+                            # One years-by-rows frame per statement (newest year first); missing
+                            # cells take the defaults the per-year .get calls used
+                            is_df = pd.DataFrame.from_dict(financials['income_statement'], orient='index')
+                            bs_df = pd.DataFrame.from_dict(financials['balance_sheet'], orient='index').reindex(is_df.index)
+                            revenue = is_df.get('Revenue', pd.Series(0.0, index=is_df.index)).fillna(0).to_numpy(dtype=float)
+                            profit = is_df.get('Net Profit', pd.Series(0.0, index=is_df.index)).fillna(0).to_numpy(dtype=float)
+                            equity = bs_df.get('Equity', pd.Series(1.0, index=bs_df.index)).fillna(1).to_numpy(dtype=float)
+
+                            # Each year against the one before it, all years in a single vectorised pass
+                            trends = pd.DataFrame(
+                                statement_metrics_batch(revenue[:-1], revenue[1:], profit[:-1], profit[1:], equity[:-1]),
+                                index=is_df.index[:-1]
+                            )
+
+                            for col, (name, value) in zip(st.columns(4), trends.iloc[0].items()):
+                                with col:
+                                    st.metric(name, "N/A" if np.isnan(value) else f"{value:.1f}%")
+
+                            if len(trends) > 1:
+                                st.line_chart(trends.iloc[::-1])
 
                         except Exception as e:
                             st.warning(f"Unable to calculate some ratios: {str(e)}")
@@ -265,14 +410,9 @@ def display():
 
                 # Calculate basic ratios from available data
                 current_price = data['Close'].iloc[-1]
-                avg_volume = data['Volume'].mean()
-
-                # Enhanced ratios calculation
-                balance_sheet = {'Total Assets': 100000, 'Current Assets': 50000, 'Current Liabilities': 30000, 'Equity': 70000, 'Total Debt': 20000, 'Inventory': 10000}
-                income_statement = {'Revenue': 80000, 'COGS': 50000, 'Net Income': 15000}
-                cash_flow = {}
 
-                ratios = calculate_ratios(balance_sheet, income_statement, cash_flow)
+                # Enhanced ratios calculation (illustrative statements, so computed once per process)
+                ratios = _sample_ratios()
 
                 # Display ratios in organized format
                 col1, col2, col3 = st.columns(3)
@@ -282,41 +422,37 @@ def display():
                     st.metric("ROE", f"{ratios['ROE']:.1%}")
                     st.metric("ROA", f"{ratios['ROA']:.1%}")
                     st.metric("Gross Margin", f"{ratios['Gross Margin']:.1%}")
-                    st.metric("Net Margin", f"{(income_statement.get('Net Income', 0) / income_statement.get('Revenue', 1)):.1%}")
+                    st.metric("Net Margin", f"{ratios['Net Margin']:.1%}")
 
                 with col2:
                     st.subheader("Liquidity Ratios")
                     st.metric("Current Ratio", f"{ratios['Current Ratio']:.1f}")
                     st.metric("Quick Ratio", f"{ratios['Quick Ratio']:.1f}")
-                    st.metric("Cash Ratio", f"{(balance_sheet.get('Cash', 0) / balance_sheet.get('Current Liabilities', 1)):.1f}")
+                    st.metric("Cash Ratio", f"{ratios['Cash Ratio']:.1f}")
 
                 with col3:
                     st.subheader("Solvency Ratios")
                     st.metric("Debt to Equity", f"{ratios['Debt to Equity']:.2f}")
                     st.metric("Debt to Assets", f"{ratios['Debt to Assets']:.2f}")
-                    st.metric("Equity Ratio", f"{(balance_sheet.get('Equity', 0) / balance_sheet.get('Total Assets', 1)):.1%}")
+                    st.metric("Equity Ratio", f"{ratios['Equity Ratio']:.1%}")
 
                 # Forecasting
                 st.subheader("🔮 Financial Forecasting")
                 forecast = forecast_financials(data, forecast_years)
                 if forecast is not None:
-                    st.line_chart(forecast[['ds', 'yhat']].set_index('ds'))
+                    st.line_chart(_float32(forecast[['ds', 'yhat']]).set_index('ds'))
 
                     # Scenario Analysis
                     st.subheader("Scenario Analysis")
-                    scenarios = {
-                        'Base Case': growth_rate,
-                        'Optimistic': growth_rate * 1.5,
-                        'Conservative': growth_rate * 0.7
-                    }
-
-                    scenario_data = []
-                    for scenario, rate in scenarios.items():
-                        future_value = current_price * (1 + rate) ** forecast_years
-                        scenario_data.append({'Scenario': scenario, 'Projected Value': future_value, 'Growth Rate': rate})
-
-                    scenario_df = pd.DataFrame(scenario_data)
-                    st.dataframe(scenario_df.style.format({
+                    # Compound every scenario in one vectorised expression
+                    rates = growth_rate * np.array([1.0, 1.5, 0.7])
+                    scenario_df = pd.DataFrame({
+                        'Scenario': ['Base Case', 'Optimistic', 'Conservative'],
+                        'Projected Value': current_price * (1 + rates) ** forecast_years,
+                        'Growth Rate': rates
+                    })
+                    # Projected values run to tens of thousands of rupees, past float32's cent precision
+                    st.dataframe(_float32(scenario_df, keep=['Projected Value']).style.format({
                         'Projected Value': '₹{:.2f}',
                         'Growth Rate': '{:.1%}'
                     }))
@@ -326,7 +462,8 @@ def display():
 
                 # DCF Valuation
                 free_cash_flow = fundamentals.get('net_income', 10000) * 0.8  # Simplified FCF assumption
-                dcf_value = dcf_valuation([free_cash_flow * (1 + growth_rate) ** i for i in range(forecast_years)], discount_rate)
+                projected_fcf = free_cash_flow * (1 + growth_rate) ** np.arange(forecast_years)
+                dcf_value = dcf_valuation(projected_fcf, discount_rate)
 
                 # DDM Valuation
                 dividend = fundamentals.get('dividend_yield', 0) * current_price
@@ -362,9 +499,12 @@ def display():
                 peers = ["TCS.NS", "INFY.NS", "HCLTECH.NS"]  # Example peers for IT sector
                 peer_data = peer_comparison(company, peers)
                 if peer_data:
-                    peer_df = pd.DataFrame.from_dict(peer_data, orient='index')
-                    peer_df['vs_Current'] = ((peer_df['market_cap'] - fundamentals.get('market_cap', 0)) / fundamentals.get('market_cap', 1) * 100)
-                    st.dataframe(peer_df.style.format({
+                    peer_df = _peer_frame(peer_data)
+                    # One pass over the raw column; a missing or zero current market cap divides by 1
+                    current_cap = fundamentals.get('market_cap') or 0
+                    peer_df['vs_Current'] = (peer_df['market_cap'].to_numpy() - current_cap) * (100.0 / (current_cap or 1))
+                    # Market caps run to 1e13, beyond float32's 7 significant digits
+                    st.dataframe(_float32(peer_df, keep=['market_cap', 'revenue', 'net_income']).style.format({
                         'market_cap': '₹{:.0f}',
                         'pe_ratio': '{:.2f}',
                         'vs_Current': '{:.1f}%'
@@ -389,7 +529,8 @@ def display():
                     insights.append("⚠️ Potentially overvalued - exercise caution")
 
                 # Risk insights
-                volatility = data['Close'].pct_change().std() * np.sqrt(252)
+                closes = data['Close'].to_numpy(dtype=np.float64)
+                volatility = np.nanstd(np.log(closes[1:] / closes[:-1]), ddof=1) * np.sqrt(252)
                 if volatility > 0.3:
                     insights.append("⚠️ High volatility detected - consider risk management")
                 else:
@@ -414,29 +555,29 @@ def display():
                             news_data = [{"title": "Company shows strong Q4 results", "date": "2024-01-15"}]
 
                             from src.reports import generate_comprehensive_report
-                            filename = generate_comprehensive_report(
+                            filename, pdf_bytes = generate_comprehensive_report(
                                 {'symbol': company, 'name': company.replace('.NS', ''), 'sector': 'Unknown'},
                                 technical_data, fundamental_data, news_data
                             )
 
-                            # Check if file was created successfully
-                            if os.path.exists(filename):
+                            # Check if the report was built successfully
+                            if pdf_bytes:
                                 st.success(f"Equity analysis report generated: {filename}")
-                                st.session_state['pdf_filename'] = filename
+                                st.session_state['pdf_report'] = (filename, pdf_bytes)
                             else:
                                 st.error("Failed to generate PDF report. Please try again.")
                         except Exception as e:
                             st.error(f"Error generating PDF report: {str(e)}")
 
                 # Display download button if PDF was generated
-                if 'pdf_filename' in st.session_state and os.path.exists(st.session_state['pdf_filename']):
-                    with open(st.session_state['pdf_filename'], "rb") as f:
-                        st.download_button(
-                            label="📥 Download Equity Analysis Report",
-                            data=f,
-                            file_name=st.session_state['pdf_filename'],
-                            mime="application/pdf"
-                        )
+                if 'pdf_report' in st.session_state:
+                    filename, pdf_bytes = st.session_state['pdf_report']
+                    st.download_button(
+                        label="📥 Download Equity Analysis Report",
+                        data=pdf_bytes,
+                        file_name=filename,
+                        mime="application/pdf"
+                    )
 
             else:
                 st.error("Unable to fetch data for the selected company. Please check the symbol and try again.")
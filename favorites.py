@@ -0,0 +1,89 @@
+import json
+import os
+import threading
+
+# Favorites survive page reloads and restarts alongside the Yahoo Finance cache
+FAVORITES_PATH = os.path.join('.cache', 'favorites.json')
+
+# Every Streamlit session shares the file, so each change is a read-modify-write under this lock
+_FILE_LOCK = threading.Lock()
+
+class FavoritesStore:
+    """Set of favorite symbols that keeps its sorted view until the next change
+
+    With a path, the favorites are loaded from that JSON file, and each change is applied to the
+    file's current contents, so changes made by other sessions since this one loaded are kept.
+    """
+
+    def __init__(self, symbols=(), path=None):
+        self._path = path
+        self._set = set(symbols) | set(self._load())
+        self._sorted_cache = ()
+        self._dirty = True
+
+    def _load(self):
+        """Return the symbols saved at path, or nothing if there is no readable file"""
+        if self._path is None:
+            return ()
+        try:
+            with open(self._path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return ()
+
+    def _change(self, added=(), removed=()):
+        """Add and remove symbols in the saved favorites, then take the result as this store's set"""
+        with _FILE_LOCK:
+            if self._path is not None:
+                # Start from the file, not this session's copy, so other sessions' edits survive
+                self._set = set(self._load())
+            self._set.update(added)
+            self._set.difference_update(removed)
+            self._dirty = True
+            self._save()
+
+    def _save(self):
+        """Write the favorites to path; best-effort, like the data cache"""
+        if self._path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            # Write a temporary file and swap it in, so readers never see a half-written list
+            tmp_path = f"{self._path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(list(self.sorted_list), f)
+            os.replace(tmp_path, self._path)
+        except OSError:
+            pass
+
+    def add(self, symbol):
+        """Add symbol to the favorites"""
+        if symbol not in self._set:
+            self._change(added={symbol})
+
+    def remove(self, symbol):
+        """Remove symbol, raising KeyError if it is not a favorite"""
+        if symbol not in self._set:
+            raise KeyError(symbol)
+        self._change(removed={symbol})
+
+    def clear(self):
+        """Remove every favorite this store holds"""
+        self._change(removed=set(self._set))
+
+    @property
+    def sorted_list(self):
+        """Return the favorites as a sorted tuple, rebuilt only after a change"""
+        if self._dirty:
+            self._sorted_cache = tuple(sorted(self._set))
+            self._dirty = False
+        return self._sorted_cache
+
+    def __contains__(self, symbol):
+        return symbol in self._set
+
+    def __iter__(self):
+        return iter(self.sorted_list)
+
+    def __len__(self):
+        return len(self._set)
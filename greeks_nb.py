@@ -0,0 +1,51 @@
+import math
+import numpy as np
+from numba import njit, prange
+
+# fastmath without the no-nan/no-inf flags, so the validity checks below are not optimised away
+_FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+_SQRT_2 = math.sqrt(2.0)
+_INV_SQRT_2PI = 0.3989422804014327
+
+@njit(cache=True, fastmath=_FASTMATH, parallel=True)
+def greeks_chain(stock_price, strikes, time_to_expiry, volatility, risk_free_rate):
+    """Return a 5xN array of delta, gamma, theta, vega and rho for every strike
+
+    Same formulas, term ordering and edge-case convention as derivatives._greeks_arrays:
+    a zero strike gives its limit (delta 1, the rest 0); a non-positive price, expiry or
+    volatility, a negative or nan strike, and any non-finite result give zeros.
+    """
+    n = strikes.size
+    out = np.zeros((5, n))
+    if not (stock_price > 0 and time_to_expiry > 0 and volatility > 0):
+        return out
+
+    sqrt_t = math.sqrt(time_to_expiry)
+    sigma_sqrt_t = volatility * sqrt_t
+    discount = math.exp(-risk_free_rate * time_to_expiry)
+    drift = (risk_free_rate + 0.5 * volatility**2) * time_to_expiry
+
+    for i in prange(n):
+        strike = strikes[i]
+        if strike == 0:
+            # Limit as the strike goes to zero: the call is the stock itself
+            out[0, i] = 1.0
+            continue
+        if not strike > 0:
+            continue
+        d1 = (math.log(stock_price / strike) + drift) / sigma_sqrt_t
+        d2 = d1 - sigma_sqrt_t
+        nd1_cdf = 0.5 * (1.0 + math.erf(d1 / _SQRT_2))
+        nd2_cdf = 0.5 * (1.0 + math.erf(d2 / _SQRT_2))
+        nd1_pdf = math.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI
+
+        out[0, i] = nd1_cdf
+        out[1, i] = nd1_pdf / (stock_price * sigma_sqrt_t)
+        out[2, i] = -stock_price * nd1_pdf * volatility / (2 * sqrt_t) - risk_free_rate * strike * discount * nd2_cdf
+        out[3, i] = stock_price * sqrt_t * nd1_pdf * 0.01
+        out[4, i] = strike * time_to_expiry * discount * nd2_cdf * 0.01
+        for g in range(5):
+            if not math.isfinite(out[g, i]):
+                out[g, i] = 0.0
+    return out
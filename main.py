@@ -1,28 +1,179 @@
 import streamlit as st
+import html
+import io
 import pandas as pd
+import queue
+import random
+import requests
+import sys
 import time
 import threading
+from collections import OrderedDict, deque
 from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from src.data_fetcher_cache import DAILY_TTL, INTRADAY_TTL, STATEMENT_TTL, ttl_for_interval
+from src.favorites import FAVORITES_PATH, FavoritesStore
 from src import data_fetcher, equity_analysis, technical_analysis, derivatives, news_feed, reports, portfolio_analysis, risk_analysis
 
+try:
+    # Optional: encodes the JSON export several times faster than DataFrame.to_json
+    import orjson
+except ImportError:
+    orjson = None
+
 # Caching and Performance Functions
-@st.cache_data(ttl=3600)  # Cache for 1 hour
+@st.cache_resource(show_spinner=False)
+def _fetch_stats():
+    """Return the process-wide lock and per-fetcher counters behind get_cached_data_status"""
+    return threading.Lock(), {}
+
+def _fetcher_stats(name):
+    """Return the counters for one cached fetcher, creating them on first use"""
+    _, stats = _fetch_stats()
+    return stats.setdefault(name, {'calls': 0, 'misses': 0, 'execution_time': 0.0, 'last_access': None})
+
+def _record_access(name):
+    """Count a call to a cached fetcher; calls that skip _record_miss were cache hits"""
+    lock, _ = _fetch_stats()
+    with lock:
+        entry = _fetcher_stats(name)
+        entry['calls'] += 1
+        entry['last_access'] = time.time()
+
+def _record_miss(name, started):
+    """Count a cache miss and the time the underlying fetch took"""
+    lock, _ = _fetch_stats()
+    with lock:
+        entry = _fetcher_stats(name)
+        entry['misses'] += 1
+        entry['execution_time'] += time.perf_counter() - started
+
+class _FetchFailed(Exception):
+    """Raised from a cached fetcher body so Streamlit does not store a failed or fallback result"""
+
+    def __init__(self, result):
+        super().__init__()
+        self.result = result
+
+def _keep_if_fetched(result):
+    """Return result for caching, or raise _FetchFailed when the fetch came back empty"""
+    if result is None or getattr(result, 'empty', False):
+        raise _FetchFailed(result)
+    return result
+
+# TTLs follow how often each source changes: statements quarterly, bars per their interval.
+# cache_resource hands back the cached object itself instead of unpickling a fresh copy on
+# every hit, so callers must treat the returned frames and dicts as read-only
+@st.cache_resource(ttl=DAILY_TTL, show_spinner=False)
+def _cached_fetch_historical_data(symbol, years):
+    started = time.perf_counter()
+    try:
+        # fetch_historical_data always loads daily bars
+        return _keep_if_fetched(data_fetcher.fetch_historical_data(symbol, years))
+    finally:
+        _record_miss('historical', started)
+
+@st.cache_resource(ttl=STATEMENT_TTL, show_spinner=False)
+def _cached_fetch_financial_statements(symbol):
+    started = time.perf_counter()
+    try:
+        statements = data_fetcher.fetch_financial_statements(symbol)
+        # On errors the fetcher falls back to sample statements, which must not be kept for a week
+        if statements == data_fetcher.get_sample_financial_statements():
+            raise _FetchFailed(statements)
+        return statements
+    finally:
+        _record_miss('financial', started)
+
+@st.cache_resource(ttl=INTRADAY_TTL, show_spinner=False)
+def _cached_fetch_intraday_asset_data(symbol, asset_class, period, interval):
+    started = time.perf_counter()
+    try:
+        return _keep_if_fetched(data_fetcher.fetch_asset_data(symbol, asset_class, period, interval))
+    finally:
+        _record_miss('asset', started)
+
+@st.cache_resource(ttl=DAILY_TTL, show_spinner=False)
+def _cached_fetch_daily_asset_data(symbol, asset_class, period, interval):
+    started = time.perf_counter()
+    try:
+        return _keep_if_fetched(data_fetcher.fetch_asset_data(symbol, asset_class, period, interval))
+    finally:
+        _record_miss('asset', started)
+
+def _normalize_symbol(symbol):
+    """Canonical cache key for a symbol, so ' aapl' and 'AAPL' share one cache entry"""
+    return symbol.strip().upper()
+
 def cached_fetch_historical_data(symbol, years=5):
     """Cached version of historical data fetching"""
-    return data_fetcher.fetch_historical_data(symbol, years)
+    _record_access('historical')
+    try:
+        return _cached_fetch_historical_data(_normalize_symbol(symbol), years)
+    except _FetchFailed as failed:
+        return failed.result
 
-@st.cache_data(ttl=1800)  # Cache for 30 minutes
 def cached_fetch_financial_statements(symbol):
     """Cached version of financial statements fetching"""
-    return data_fetcher.fetch_financial_statements(symbol)
+    _record_access('financial')
+    try:
+        return _cached_fetch_financial_statements(_normalize_symbol(symbol))
+    except _FetchFailed as failed:
+        return failed.result
 
-@st.cache_data(ttl=900)  # Cache for 15 minutes
 def cached_fetch_asset_data(symbol, asset_class=None, period="1y", interval="1d"):
     """Cached version of asset data fetching"""
-    return data_fetcher.fetch_asset_data(symbol, asset_class, period, interval)
+    _record_access('asset')
+    cached = _cached_fetch_intraday_asset_data if ttl_for_interval(interval) == INTRADAY_TTL else _cached_fetch_daily_asset_data
+    try:
+        return cached(_normalize_symbol(symbol), asset_class, period, interval)
+    except _FetchFailed as failed:
+        return failed.result
+
+# Download formats offered for a searched asset: label, file extension and MIME type
+EXPORT_FORMATS = {
+    'csv': ("📊 CSV", "csv", "text/csv"),
+    'xlsx': ("📈 Excel", "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    'json': ("📋 JSON", "json", "application/json"),
+}
+
+def _serialize(data, fmt):
+    """Encode a price frame as csv, xlsx or json bytes for st.download_button"""
+    if fmt == 'csv':
+        return data.to_csv(index=True).encode('utf-8')
+    if fmt == 'json':
+        if orjson is None:
+            return data.to_json(orient='records', date_format='iso').encode('utf-8')
+        # NaN becomes null as with to_json; any Timestamp columns are written as ISO strings
+        return orjson.dumps(data.to_dict(orient='records'), default=lambda value: value.isoformat())
+    buffer = io.BytesIO()
+    # Excel cannot store timezone-aware timestamps
+    if getattr(data.index, 'tz', None) is not None:
+        data = data.tz_localize(None)
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        data.to_excel(writer, index=True, sheet_name='Data')
+    return buffer.getvalue()
+
+@st.cache_data(ttl=DAILY_TTL, max_entries=48, show_spinner=False)
+def _export_bytes(symbol, period, fmt):
+    """Serialized daily prices for symbol, keyed on (symbol, period) so the frame is never hashed"""
+    return _serialize(cached_fetch_asset_data(symbol, period=period), fmt)
+
+FAVORITES_PRICE_TTL = 60  # seconds
+
+@st.cache_data(ttl=FAVORITES_PRICE_TTL, max_entries=16, show_spinner=False)
+def _favorite_prices(symbols):
+    """Latest close per favorite symbol (None when unavailable), from one batched fetch"""
+    favorites_data = data_fetcher.fetch_asset_data_many(symbols, period='1d')
+    prices = {}
+    for symbol in symbols:
+        data = favorites_data.get(symbol)
+        prices[symbol] = float(data['Close'].iloc[-1]) if data is not None and not data.empty and 'Close' in data.columns else None
+    return prices
 
 def loading_spinner(text="Loading..."):
-    """Decorator for functions that need loading indicators"""
+    """Decorator for public entry points that need loading indicators; opens a spinner per call"""
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -31,59 +182,125 @@ def loading_spinner(text="Loading..."):
         return wrapper
     return decorator
 
+def with_spinner(text="Loading..."):
+    """Return a spinner context for wrapping a whole batch, e.g. once around a per-ticker loop"""
+    return st.spinner(text)
+
+@st.cache_resource(show_spinner=False)
+def _background_pool():
+    """Return the worker pool shared by every session; cached so reruns of this script reuse it"""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="cosmic-bg")
+
+def _run_with_ctx(ctx, func, *args, **kwargs):
+    """Run func on a pool worker attached to the submitting script run, so it can reach session state"""
+    add_script_run_ctx(threading.current_thread(), ctx)
+    return func(*args, **kwargs)
+
 def background_task(func):
-    """Decorator to run functions in background threads"""
+    """Decorator to run functions on the shared background pool, returning a Future"""
+    @wraps(func)
     def wrapper(*args, **kwargs):
-        thread = threading.Thread(target=func, args=args, kwargs=kwargs)
-        thread.daemon = True
-        thread.start()
-        return thread
+        return _background_pool().submit(_run_with_ctx, get_script_run_ctx(), func, *args, **kwargs)
     return wrapper
 
 # Background Processing Functions
-@st.cache_data(ttl=3600)  # Cache for 1 hour
 def get_cached_data_status():
     """Get status of cached data availability"""
-    try:
-        # Check if we have any cached data
-        cache_info = st.session_state.get('cache_info', {})
-        return {
-            'has_historical_data': bool(cache_info.get('historical_data_last_update')),
-            'has_financial_statements': bool(cache_info.get('financial_statements_last_update')),
-            'last_update': cache_info.get('last_update'),
-            'cache_size': len(cache_info)
+    # A few dict reads are cheaper than a cache_data lookup; caching also froze the status for an hour
+    cache_info = st.session_state.get('cache_info') or {}
+    return {
+        'has_historical_data': bool(cache_info.get('historical_data_last_update')),
+        'has_financial_statements': bool(cache_info.get('financial_statements_last_update')),
+        'last_update': cache_info.get('last_update'),
+        'cache_size': len(cache_info),
+        'fetchers': get_fetch_stats()
+    }
+
+def get_fetch_stats():
+    """Return hit/miss counts, hit ratio, mean miss time and last access for each cached fetcher"""
+    lock, stats = _fetch_stats()
+    with lock:
+        snapshot = {name: dict(entry) for name, entry in stats.items()}
+    return {
+        name: {
+            'hit_count': entry['calls'] - entry['misses'],
+            'miss_count': entry['misses'],
+            'hit_ratio': (entry['calls'] - entry['misses']) / entry['calls'] if entry['calls'] else 0.0,
+            'avg_exec_ms': entry['execution_time'] / entry['misses'] * 1000 if entry['misses'] else 0.0,
+            'last_access': entry['last_access']
         }
-    except:
-        return {'has_historical_data': False, 'has_financial_statements': False, 'last_update': None, 'cache_size': 0}
+        for name, entry in snapshot.items()
+    }
+
+# Bounds on st.session_state.lazy_loaded_data, evicting least recently used entries first
+LAZY_DATA_MAX_ENTRIES = 32
+LAZY_DATA_MAX_BYTES = 256 * 1024 * 1024
+
+def _data_nbytes(data):
+    """Approximate in-memory size of a loaded frame; other payloads count as small"""
+    if isinstance(data, pd.DataFrame):
+        return int(data.memory_usage(index=True).sum())
+    return sys.getsizeof(data)
+
+def _store_lazy_data(key, entry):
+    """Store entry as the most recently used, evicting the oldest past the entry or byte limit"""
+    # Only the script thread writes here; workers hand their results over through _lazy_results
+    store = st.session_state.get('lazy_loaded_data')
+    if not isinstance(store, OrderedDict):
+        store = st.session_state.lazy_loaded_data = OrderedDict(store or {})
+    store[key] = entry
+    store.move_to_end(key)
+
+    total = sum(_data_nbytes(item['data']) for item in store.values())
+    while len(store) > 1 and (len(store) > LAZY_DATA_MAX_ENTRIES or total > LAZY_DATA_MAX_BYTES):
+        _, evicted = store.popitem(last=False)
+        total -= _data_nbytes(evicted['data'])
+
+def _lazy_results():
+    """Return this session's queue of (key, entry) results finished by background workers"""
+    if 'lazy_results' not in st.session_state:
+        st.session_state.lazy_results = queue.Queue()
+    return st.session_state.lazy_results
 
 def lazy_load_data(symbol, data_type='historical', period='1y'):
-    """Lazy loading function for data with background processing"""
+    """Lazy loading function for data with background processing; returns the load's Future"""
+    key = f"{symbol}_{data_type}"
+    # Spinners only render from the script thread, so the worker reports progress through status
+    _store_lazy_data(key, {'data': None, 'timestamp': time.time(), 'status': 'loading'})
+    # Session state written from a worker never refreshes the page, so results go through a queue
+    # that sync_lazy_loads drains on the script thread
+    results = _lazy_results()
+
     @background_task
     def load_in_background():
         try:
-            with st.spinner(f"Loading {data_type} data for {symbol}..."):
-                if data_type == 'historical':
-                    data = cached_fetch_historical_data(symbol, years=5)
-                elif data_type == 'financial':
-                    data = cached_fetch_financial_statements(symbol)
-                else:
-                    data = cached_fetch_asset_data(symbol, period=period)
-
-                # Store in session state for immediate access
-                if 'lazy_loaded_data' not in st.session_state:
-                    st.session_state.lazy_loaded_data = {}
-                st.session_state.lazy_loaded_data[f"{symbol}_{data_type}"] = {
-                    'data': data,
-                    'timestamp': time.time(),
-                    'status': 'loaded'
-                }
-                return data
+            if data_type == 'historical':
+                data = cached_fetch_historical_data(symbol, years=5)
+            elif data_type == 'financial':
+                data = cached_fetch_financial_statements(symbol)
+            else:
+                data = cached_fetch_asset_data(symbol, period=period)
+
+            results.put((key, {
+                'data': data,
+                'timestamp': time.time(),
+                'status': 'loaded'
+            }))
+            return data
         except Exception as e:
+            results.put((key, {'data': None, 'timestamp': time.time(), 'status': 'error'}))
             handle_api_error(e, f"lazy loading {data_type} data for {symbol}")
             return None
 
     return load_in_background()
 
+LAZY_DATA_TYPES = ('historical', 'financial', 'asset')
+
+def prefetch_all(symbol, period='1y'):
+    """Start the historical, financial and asset loads for symbol at once; returns {data_type: Future}"""
+    # Three independent fetches finish in the time of the slowest instead of one after another
+    return {data_type: lazy_load_data(symbol, data_type, period) for data_type in LAZY_DATA_TYPES}
+
 def get_lazy_loaded_data(symbol, data_type='historical'):
     """Retrieve lazy loaded data if available"""
     key = f"{symbol}_{data_type}"
@@ -91,15 +308,45 @@ def get_lazy_loaded_data(symbol, data_type='historical'):
         data_info = st.session_state.lazy_loaded_data[key]
         # Check if data is still fresh (within 30 minutes)
         if time.time() - data_info['timestamp'] < 1800:
+            if isinstance(st.session_state.lazy_loaded_data, OrderedDict):
+                st.session_state.lazy_loaded_data.move_to_end(key)
             return data_info['data']
     return None
 
+def get_lazy_load_status(symbol, data_type='historical'):
+    """Return 'loading', 'loaded' or 'error' for a lazy load, or None if it was never started"""
+    data_info = (st.session_state.get('lazy_loaded_data') or {}).get(f"{symbol}_{data_type}")
+    return data_info['status'] if data_info else None
+
+@st.fragment(run_every=2)
+def sync_lazy_loads():
+    """Move finished background loads into session state, rerunning the app once any arrive"""
+    results = _lazy_results()
+    arrived = False
+    while True:
+        try:
+            key, entry = results.get_nowait()
+        except queue.Empty:
+            break
+        _store_lazy_data(key, entry)
+        arrived = True
+
+    if arrived:
+        st.rerun()
+    loading = [key for key, entry in (st.session_state.get('lazy_loaded_data') or {}).items() if entry['status'] == 'loading']
+    if loading:
+        st.caption(f"⏳ Loading {', '.join(loading)}...")
+
+def show_lazy_load_status(symbol, data_types=LAZY_DATA_TYPES):
+    """Render progress for symbol's lazy loads from the script thread"""
+    loading = [data_type for data_type in data_types if get_lazy_load_status(symbol, data_type) == 'loading']
+    if loading:
+        st.info(f"⏳ Loading {', '.join(loading)} data for {symbol}...")
+    return not loading
+
 # Offline Mode Functions
 def enable_offline_mode():
     """Enable offline mode with cached data"""
-    if 'offline_mode' not in st.session_state:
-        st.session_state.offline_mode = False
-
     cache_status = get_cached_data_status()
     if cache_status['cache_size'] > 0:
         st.session_state.offline_mode = True
@@ -125,7 +372,7 @@ def handle_api_error(error, context=""):
     st.error(f"⚠️ {error_msg}")
 
     # Log error for debugging
-    st.session_state.setdefault('error_log', []).append({
+    st.session_state.error_log.append({
         'timestamp': time.time(),
         'error': error_msg,
         'context': context
@@ -133,15 +380,35 @@ def handle_api_error(error, context=""):
 
     return None
 
-def retry_api_call(func, max_retries=3, delay=1):
+def _is_retryable(error):
+    """Return True for transient failures: timeouts, dropped connections, HTTP 429 and 5xx"""
+    if isinstance(error, requests.HTTPError):
+        status = getattr(error.response, 'status_code', None)
+        return status is not None and (status == 429 or status >= 500)
+    return isinstance(error, (requests.Timeout, requests.ConnectionError, TimeoutError, ConnectionError))
+
+def _retry_after(error):
+    """Return the server's Retry-After delay in seconds, or None when absent or not numeric"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+def retry_api_call(func, max_retries=3, delay=0.1, max_delay=5.0):
     """Retry mechanism for API calls"""
     for attempt in range(max_retries):
         try:
             return func()
         except Exception as e:
-            if attempt == max_retries - 1:
-                raise e
-            time.sleep(delay * (2 ** attempt))  # Exponential backoff
+            # Deterministic failures (bad symbol, parse errors) fail the same way on every attempt
+            if attempt == max_retries - 1 or not _is_retryable(e):
+                raise
+            # Capped exponential backoff with jitter, so concurrent sessions don't retry in lockstep
+            wait = _retry_after(e)
+            if wait is None:
+                wait = min(max_delay, delay * (2 ** attempt)) * (0.5 + random.random())
+            time.sleep(min(wait, max_delay))
     return None
 
 # Cosmic Theme Configuration with Enhanced UI
@@ -152,12 +419,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Apply theme based on session state
-current_theme = st.session_state.get('theme', 'dark')
-
-# Define CSS variables based on current theme
-if current_theme == 'light':
-    css_variables = """
+# CSS variables for each theme
+_CSS_VARIABLES = {
+    'light': """
     :root {
         --bg-primary: linear-gradient(180deg, #f8f9fa 0%, #e9ecef 50%, #dee2e6 100%);
         --bg-secondary: rgba(248, 249, 250, 0.95);
@@ -173,9 +437,8 @@ if current_theme == 'light':
         --gradient-primary: linear-gradient(45deg, #20c997, #007bff);
         --gradient-hover: linear-gradient(45deg, #17a2b8, #0056b3);
     }
-    """
-else:
-    css_variables = """
+    """,
+    'dark': """
     :root {
         --bg-primary: linear-gradient(180deg, #0a0a0a 0%, #1a1a2e 50%, #16213e 100%);
         --bg-secondary: rgba(26, 26, 46, 0.95);
@@ -192,12 +455,18 @@ else:
         --gradient-hover: linear-gradient(45deg, #ff5252, #45b7aa);
     }
     """
+}
 
 # Enhanced Custom CSS for Cosmic Space Theme with Modern UI Elements and Theme Variables
-st.markdown(f"""
+# Streamlit re-executes this script on every rerun, so the stylesheet is cached with
+# cache_resource (an lru_cache here would be rebuilt with the script each time)
+@st.cache_resource(show_spinner=False)
+def _build_css(theme):
+    """Return the full <style> block for theme"""
+    return f"""
 <style>
     /* CSS Variables for Theme Support */
-    {css_variables}
+    {_CSS_VARIABLES.get(theme, _CSS_VARIABLES['dark'])}
 
     /* Space background with animated stars */
     .main {{
@@ -250,8 +519,8 @@ st.markdown(f"""
         border-right: 1px solid rgba(255, 255, 255, 0.1) !important;
     }}
 
-    /* Sidebar navigation buttons */
-    .sidebar-nav-btn {{
+    /* Sidebar navigation menu: radio options styled as buttons */
+    section[data-testid="stSidebar"] div[role="radiogroup"] > label {{
         background: rgba(255, 255, 255, 0.05) !important;
         border: 1px solid rgba(255, 255, 255, 0.1) !important;
         border-radius: 10px !important;
@@ -264,13 +533,17 @@ st.markdown(f"""
         font-weight: 500 !important;
     }}
 
-    .sidebar-nav-btn:hover {{
+    section[data-testid="stSidebar"] div[role="radiogroup"] > label > div:first-child {{
+        display: none !important;
+    }}
+
+    section[data-testid="stSidebar"] div[role="radiogroup"] > label:hover {{
         background: rgba(255, 107, 107, 0.2) !important;
         border-color: rgba(255, 107, 107, 0.3) !important;
         transform: translateX(5px) !important;
     }}
 
-    .sidebar-nav-btn.active {{
+    section[data-testid="stSidebar"] div[role="radiogroup"] > label:has(input:checked) {{
         background: linear-gradient(45deg, #ff6b6b, #4ecdc4) !important;
         border-color: rgba(255, 107, 107, 0.5) !important;
         box-shadow: 0 4px 15px rgba(255, 107, 107, 0.3) !important;
@@ -342,6 +615,18 @@ st.markdown(f"""
         transition: all 0.3s ease;
     }}
 
+    .dashboard-metrics {{
+        display: grid;
+        grid-template-columns: repeat(4, 1fr);
+        gap: 15px;
+    }}
+
+    .feature-overview {{
+        display: grid;
+        grid-template-columns: repeat(3, 1fr);
+        gap: 20px;
+    }}
+
     .metric-card:hover {{
         transform: translateY(-3px);
         box-shadow: 0 12px 40px rgba(0, 0, 0, 0.3);
@@ -458,7 +743,7 @@ st.markdown(f"""
             font-size: 2em;
         }}
 
-        .sidebar-nav-btn {{
+        section[data-testid="stSidebar"] div[role="radiogroup"] > label {{
             padding: 10px 15px !important;
             font-size: 14px !important;
         }}
@@ -627,10 +912,90 @@ st.markdown(f"""
         }}
     }}
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Apply theme based on session state
+st.markdown(_build_css(st.session_state.get('theme', 'dark')), unsafe_allow_html=True)
+
+# Home dashboard headline cards: (value, label)
+_DASHBOARD_METRICS = (("8", "Analysis Modules"), ("6", "Asset Classes"), ("∞", "Data Sources"), ("₹", "INR Focused"))
+_DASHBOARD_METRICS_HTML = '<div class="dashboard-metrics">' + "".join(
+    f'<div class="metric-card"><div class="metric-value">{value}</div><div class="metric-label">{label}</div></div>'
+    for value, label in _DASHBOARD_METRICS
+) + '</div>'
+
+# Most recent API errors kept per session; older entries drop off the ring buffer
+ERROR_LOG_SIZE = 200
+
+# Per-session state, each value built by its factory on first use so sessions never share objects
+_SESSION_DEFAULTS = {
+    'favorites': lambda: FavoritesStore(path=FAVORITES_PATH),
+    'lazy_loaded_data': OrderedDict,
+    'error_log': lambda: deque(maxlen=ERROR_LOG_SIZE),
+    'offline_mode': lambda: False,
+    'selected_module': lambda: 'Home',
+    'theme': lambda: 'dark',
+    'cache_info': dict
+}
+
+# Home feature cards: (title, description)
+_FEATURES = (
+    ("📊 Multi-Source Data", "Fetch and analyze financial data from Yahoo Finance, Alpha Vantage, and other reliable sources with automatic INR conversion."),
+    ("📈 Advanced Analytics", "Technical indicators, risk metrics, portfolio optimization, and comprehensive financial statement analysis."),
+    ("💼 Portfolio Management", "Multi-asset portfolio tracking, rebalancing, performance analysis, and risk management tools.")
+)
+_FEATURE_OVERVIEW_HTML = '<div class="feature-overview">' + "".join(
+    f'<div class="module-card"><h4>{title}</h4><p>{description}</p></div>'
+    for title, description in _FEATURES
+) + '</div>'
+
+_SEARCH_CARD_HTML = """
+<div class="metric-card">
+    <h4>{symbol}</h4>
+    <p style="color: #4ecdc4; font-size: 18px;">{asset_class}</p>
+</div>
+"""
+
+# Sidebar navigation: module -> label, in menu order
+_NAV_OPTIONS = {
+    "Home": "🏠 Dashboard",
+    "Data Fetching": "📈 Data Fetching",
+    "Equity Analysis": "📊 Equity Analysis",
+    "Derivatives/Forex/Crypto": "💹 Derivatives/Forex/Crypto",
+    "News Feed": "📰 News Feed",
+    "Portfolio Analysis": "📊 Portfolio Analysis",
+    "Risk Analysis": "⚠️ Risk Analysis",
+    "Reports": "📋 Reports",
+    "Search": "🔍 Search Assets",
+    "Favorites": "⭐ Favorites"
+}
+
+def _on_nav_change():
+    """Open the module picked in the sidebar menu"""
+    st.session_state.selected_module = st.session_state.nav_radio
+
+_POPULAR_SEARCHES = (
+    "AAPL", "BTC", "GOLD", "RELIANCE.NS", "USDINR=X",
+    "MSFT", "ETH", "SILVER", "TCS.NS", "SPY"
+)
+
+# Related assets offered under a search result, per detected asset class
+_ASSET_SUGGESTIONS = {
+    "Equity": ("AAPL", "MSFT", "GOOGL", "TSLA", "RELIANCE.NS", "TCS.NS"),
+    "Cryptocurrency": ("BTC", "ETH", "BNB", "ADA", "SOL", "DOT"),
+    "Commodities": ("GOLD", "SILVER", "OIL", "COPPER", "NATURAL_GAS", "PLATINUM"),
+    "Bonds": ("US10Y", "US30Y", "US5Y", "US2Y", "US3M", "DE10Y"),
+    "ETF": ("SPY", "QQQ", "VTI", "VEA", "VWO", "BND"),
+    "Forex": ("USDINR=X", "EURUSD=X", "GBPUSD=X", "USDJPY=X", "AUDUSD=X", "USDCAD=X")
+}
 
 # Main App with Enhanced Sidebar Navigation
 def main():
+    # Session defaults are set once here instead of membership checks scattered across branches
+    for key, factory in _SESSION_DEFAULTS.items():
+        if key not in st.session_state:
+            st.session_state[key] = factory()
+
     # Sidebar Navigation
     with st.sidebar:
         st.markdown("""
@@ -643,38 +1008,23 @@ def main():
         # Navigation Menu
         st.markdown("### 📱 Navigation")
 
-        # Home/Dashboard
-        if st.button("🏠 Dashboard", key="nav_home", help="Main dashboard and overview"):
-            st.session_state.selected_module = "Home"
-
-        # Data & Analysis Modules
-        st.markdown("### 📊 Analysis Modules")
-
-        nav_buttons = [
-            ("📈 Data Fetching", "Data Fetching", "Fetch and analyze financial data"),
-            ("📊 Equity Analysis", "Equity Analysis", "Analyze equity markets and stocks"),
-            ("💹 Derivatives/Forex/Crypto", "Derivatives/Forex/Crypto", "Analyze derivatives, forex, and crypto"),
-            ("📰 News Feed", "News Feed", "Latest financial news and updates"),
-            ("📊 Portfolio Analysis", "Portfolio Analysis", "Multi-asset portfolio analysis"),
-            ("⚠️ Risk Analysis", "Risk Analysis", "Risk assessment and management"),
-            ("📋 Reports", "Reports", "Generate financial reports")
-        ]
-
-        for label, module, help_text in nav_buttons:
-            if st.button(label, key=f"nav_{module.lower().replace(' ', '_')}", help=help_text):
-                st.session_state.selected_module = module
-
-        # Settings & Tools
-        st.markdown("### ⚙️ Tools")
-        if st.button("🔍 Search Assets", key="nav_search", help="Search for financial assets"):
-            st.session_state.selected_module = "Search"
-
-        if st.button("⭐ Favorites", key="nav_favorites", help="View favorite assets"):
-            st.session_state.selected_module = "Favorites"
+        # One radio widget instead of a button per module; buttons elsewhere (quick actions,
+        # Analyze) change selected_module, so the menu is synced before it is drawn
+        selected_module = st.session_state.selected_module
+        if selected_module in _NAV_OPTIONS and st.session_state.get('nav_radio') != selected_module:
+            st.session_state.nav_radio = selected_module
+        st.radio(
+            "Navigation",
+            tuple(_NAV_OPTIONS),
+            format_func=_NAV_OPTIONS.get,
+            key="nav_radio",
+            on_change=_on_nav_change,
+            label_visibility="collapsed"
+        )
 
         # Theme Toggle
         st.markdown("### 🎨 Theme")
-        current_theme = st.session_state.get('theme', 'dark')
+        current_theme = st.session_state.theme
         theme_icon = "🌙" if current_theme == "dark" else "☀️"
         theme_text = "Dark Mode" if current_theme == "dark" else "Light Mode"
         toggle_text = f"{theme_icon} Switch to {'Light' if current_theme == 'dark' else 'Dark'} Mode"
@@ -684,6 +1034,14 @@ def main():
             st.session_state.theme = new_theme
             st.rerun()
 
+        # Cache observability
+        fetch_stats = get_fetch_stats()
+        if fetch_stats:
+            with st.expander("📦 Cache Statistics"):
+                stats_df = pd.DataFrame.from_dict(fetch_stats, orient='index')
+                stats_df['last_access'] = pd.to_datetime(stats_df['last_access'], unit='s')
+                st.dataframe(stats_df.style.format({'hit_ratio': '{:.0%}', 'avg_exec_ms': '{:.0f}'}))
+
         # Footer
         st.markdown("---")
         st.markdown("""
@@ -692,6 +1050,10 @@ def main():
         </div>
         """, unsafe_allow_html=True)
 
+    # Poll for background loads only while some are pending, so idle pages don't rerun every 2s
+    if any(entry['status'] == 'loading' for entry in st.session_state.lazy_loaded_data.values()):
+        sync_lazy_loads()
+
     # Main Content Area
     st.title("🌌 Cosmic Financial Analysis")
     st.markdown("### Advanced Financial Modeling & Analysis for Indian Markets")
@@ -700,46 +1062,14 @@ def main():
     st.warning("⚠️ **IMPORTANT NOTICE:** This software is patented and copyrighted. Any unauthorized copying, distribution, or modification of this software will result in severe legal consequences. This software is protected under intellectual property laws.")
 
     # Module Content Display
-    selected_module = st.session_state.get('selected_module', 'Home')
+    selected_module = st.session_state.selected_module
 
     if selected_module == "Home":
         # Enhanced Home Dashboard
         st.markdown("## 🏠 Dashboard Overview")
 
-        # Key Metrics Row
-        col1, col2, col3, col4 = st.columns(4)
-
-        with col1:
-            st.markdown("""
-            <div class="metric-card">
-                <div class="metric-value">8</div>
-                <div class="metric-label">Analysis Modules</div>
-            </div>
-            """, unsafe_allow_html=True)
-
-        with col2:
-            st.markdown("""
-            <div class="metric-card">
-                <div class="metric-value">6</div>
-                <div class="metric-label">Asset Classes</div>
-            </div>
-            """, unsafe_allow_html=True)
-
-        with col3:
-            st.markdown("""
-            <div class="metric-card">
-                <div class="metric-value">∞</div>
-                <div class="metric-label">Data Sources</div>
-            </div>
-            """, unsafe_allow_html=True)
-
-        with col4:
-            st.markdown("""
-            <div class="metric-card">
-                <div class="metric-value">₹</div>
-                <div class="metric-label">INR Focused</div>
-            </div>
-            """, unsafe_allow_html=True)
+        # Key Metrics Row, sent as one element instead of four columns of markdown
+        st.markdown(_DASHBOARD_METRICS_HTML, unsafe_allow_html=True)
 
         # Welcome Section
         st.markdown("""
@@ -769,39 +1099,11 @@ def main():
 
         # Feature Overview
         st.markdown("## ✨ Key Features")
-        col1, col2, col3 = st.columns(3)
-
-        with col1:
-            st.markdown("""
-            <div class="module-card">
-                <h4>📊 Multi-Source Data</h4>
-                <p>Fetch and analyze financial data from Yahoo Finance, Alpha Vantage, and other reliable sources with automatic INR conversion.</p>
-            </div>
-            """, unsafe_allow_html=True)
-
-        with col2:
-            st.markdown("""
-            <div class="module-card">
-                <h4>📈 Advanced Analytics</h4>
-                <p>Technical indicators, risk metrics, portfolio optimization, and comprehensive financial statement analysis.</p>
-            </div>
-            """, unsafe_allow_html=True)
-
-        with col3:
-            st.markdown("""
-            <div class="module-card">
-                <h4>💼 Portfolio Management</h4>
-                <p>Multi-asset portfolio tracking, rebalancing, performance analysis, and risk management tools.</p>
-            </div>
-            """, unsafe_allow_html=True)
+        st.markdown(_FEATURE_OVERVIEW_HTML, unsafe_allow_html=True)
 
     elif selected_module == "Search":
         st.markdown("## 🔍 Asset Search")
 
-        # Initialize favorites in session state if not exists
-        if 'favorites' not in st.session_state:
-            st.session_state.favorites = set()
-
         # Search interface
         col1, col2 = st.columns([3, 1])
 
@@ -821,13 +1123,8 @@ def main():
 
         # Popular searches
         st.markdown("### 🔥 Popular Searches")
-        popular_searches = [
-            "AAPL", "BTC", "GOLD", "RELIANCE.NS", "USDINR=X",
-            "MSFT", "ETH", "SILVER", "TCS.NS", "SPY"
-        ]
-
         cols = st.columns(5)
-        for i, symbol in enumerate(popular_searches):
+        for i, symbol in enumerate(_POPULAR_SEARCHES):
             with cols[i % 5]:
                 if st.button(symbol, key=f"popular_{symbol}", use_container_width=True):
                     st.session_state.search_query = symbol
@@ -850,12 +1147,9 @@ def main():
             col1, col2, col3 = st.columns([2, 1, 1])
 
             with col1:
-                st.markdown(f"""
-                <div class="metric-card">
-                    <h4>{search_query.upper()}</h4>
-                    <p style="color: #4ecdc4; font-size: 18px;">{detected_class}</p>
-                </div>
-                """, unsafe_allow_html=True)
+                # The query is user input, so it is escaped before going into raw HTML
+                st.markdown(_SEARCH_CARD_HTML.format(symbol=html.escape(search_query.upper()), asset_class=detected_class),
+                            unsafe_allow_html=True)
 
             with col2:
                 is_favorite = search_query.upper() in st.session_state.favorites
@@ -880,23 +1174,26 @@ def main():
 
             # Try to fetch basic data with caching and error handling
             try:
-                data = retry_api_call(lambda: cached_fetch_asset_data(search_query.upper(), period='1mo'))
+                search_period = '1mo'
+                data = retry_api_call(lambda: cached_fetch_asset_data(search_query.upper(), period=search_period))
 
                 if data is not None and not data.empty:
-                    # Current price
-                    current_price = data['Close'].iloc[-1] if 'Close' in data.columns else "N/A"
+                    # Current price, previous close and volume, read out as scalars once
+                    close = data['Close'].to_numpy()
+                    current_price = float(close[-1])
+                    previous_close = float(close[-2]) if len(close) > 1 else current_price
+                    volume = float(data['Volume'].to_numpy()[-1]) if 'Volume' in data.columns else "N/A"
 
                     col1, col2, col3 = st.columns(3)
                     with col1:
-                        st.metric("Current Price", f"₹{current_price:,.2f}" if isinstance(current_price, (int, float)) else current_price)
+                        st.metric("Current Price", f"₹{current_price:,.2f}")
 
                     with col2:
-                        change = data['Close'].iloc[-1] - data['Close'].iloc[-2] if len(data) > 1 else 0
-                        change_pct = (change / data['Close'].iloc[-2]) * 100 if len(data) > 1 and data['Close'].iloc[-2] != 0 else 0
+                        change = current_price - previous_close
+                        change_pct = (change / previous_close) * 100 if previous_close != 0 else 0
                         st.metric("Change", f"₹{change:+,.2f}", f"{change_pct:+.2f}%")
 
                     with col3:
-                        volume = data['Volume'].iloc[-1] if 'Volume' in data.columns else "N/A"
                         st.metric("Volume", f"{volume:,.0f}" if isinstance(volume, (int, float)) else volume)
 
                     # Quick chart
@@ -905,39 +1202,15 @@ def main():
 
                     # Export options
                     st.markdown("### 💾 Export Data")
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        if st.button("📊 CSV", key=f"export_csv_{search_query}", use_container_width=True):
-                            csv_data = data.to_csv(index=True)
+                    for col, (fmt, (label, extension, mime)) in zip(st.columns(3), EXPORT_FORMATS.items()):
+                        with col:
                             st.download_button(
-                                label="Download CSV",
-                                data=csv_data,
-                                file_name=f"{search_query.upper()}_data.csv",
-                                mime="text/csv",
-                                key=f"download_csv_{search_query}"
-                            )
-
-                    with col2:
-                        if st.button("📈 Excel", key=f"export_excel_{search_query}", use_container_width=True):
-                            # Convert to Excel format (simplified)
-                            excel_data = data.to_csv(index=True)
-                            st.download_button(
-                                label="Download Excel",
-                                data=excel_data,
-                                file_name=f"{search_query.upper()}_data.xlsx",
-                                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                                key=f"download_excel_{search_query}"
-                            )
-
-                    with col3:
-                        if st.button("📋 JSON", key=f"export_json_{search_query}", use_container_width=True):
-                            json_data = data.to_json(orient='records', date_format='iso')
-                            st.download_button(
-                                label="Download JSON",
-                                data=json_data,
-                                file_name=f"{search_query.upper()}_data.json",
-                                mime="application/json",
-                                key=f"download_json_{search_query}"
+                                label=label,
+                                data=_export_bytes(search_query.upper(), search_period, fmt),
+                                file_name=f"{search_query.upper()}_data.{extension}",
+                                mime=mime,
+                                key=f"download_{fmt}_{search_query}",
+                                use_container_width=True
                             )
 
                 else:
@@ -948,17 +1221,9 @@ def main():
 
             # Related assets suggestions
             st.markdown("### 💡 Related Assets")
-            asset_suggestions = {
-                "Equity": ["AAPL", "MSFT", "GOOGL", "TSLA", "RELIANCE.NS", "TCS.NS"],
-                "Cryptocurrency": ["BTC", "ETH", "BNB", "ADA", "SOL", "DOT"],
-                "Commodities": ["GOLD", "SILVER", "OIL", "COPPER", "NATURAL_GAS", "PLATINUM"],
-                "Bonds": ["US10Y", "US30Y", "US5Y", "US2Y", "US3M", "DE10Y"],
-                "ETF": ["SPY", "QQQ", "VTI", "VEA", "VWO", "BND"],
-                "Forex": ["USDINR=X", "EURUSD=X", "GBPUSD=X", "USDJPY=X", "AUDUSD=X", "USDCAD=X"]
-            }
-
-            if detected_class in asset_suggestions:
-                suggestions = [s for s in asset_suggestions[detected_class] if s != search_query.upper()][:4]
+            if detected_class in _ASSET_SUGGESTIONS:
+                query = search_query.upper()
+                suggestions = tuple(s for s in _ASSET_SUGGESTIONS[detected_class] if s != query)[:4]
                 if suggestions:
                     cols = st.columns(4)
                     for i, suggestion in enumerate(suggestions):
@@ -992,20 +1257,22 @@ def main():
             st.success(f"You have {len(st.session_state.favorites)} favorite assets")
 
             # Favorites grid
-            favorites_list = list(st.session_state.favorites)
+            favorites_list = st.session_state.favorites.sorted_list
             cols = st.columns(3)
 
+            # Quick price fetch for display, batched across all favorites and reused for a minute
+            favorite_prices = _favorite_prices(favorites_list)
+
             for i, symbol in enumerate(favorites_list):
                 with cols[i % 3]:
                     try:
-                        # Quick data fetch for display
-                        data = data_fetcher.fetch_asset_data(symbol, period='1d')
-                        current_price = data['Close'].iloc[-1] if data is not None and not data.empty and 'Close' in data.columns else "N/A"
+                        current_price = favorite_prices.get(symbol)
+                        price_text = f"₹{current_price:,.2f}" if current_price is not None else "N/A"
 
                         st.markdown(f"""
                         <div class="metric-card">
                             <h4>{symbol}</h4>
-                            <p style="color: #4ecdc4; font-size: 18px;">₹{current_price:,.2f}</p>
+                            <p style="color: #4ecdc4; font-size: 18px;">{price_text}</p>
                             <small style="color: #cccccc;">{data_fetcher.detect_asset_class(symbol)}</small>
                         </div>
                         """, unsafe_allow_html=True)
@@ -1,122 +1,263 @@
+import asyncio
+import html
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
+import re
+import threading
+import time
 from datetime import datetime, timedelta
+import aiohttp
 import feedparser
 import json
 
+try:
+    # Optional: parses NewsAPI responses several times faster than the json module
+    import orjson
+except ImportError:
+    orjson = None
+
+# Yahoo Finance RSS feeds
+YAHOO_RSS_URLS = (
+    'https://feeds.finance.yahoo.com/rss/2.0/headline?s=%5ENSEI&region=IN&lang=en-IN',  # Nifty 50
+    'https://feeds.finance.yahoo.com/rss/2.0/headline?s=%5EBSESN&region=IN&lang=en-IN',  # BSE Sensex
+    'https://feeds.finance.yahoo.com/rss/2.0/headline?region=IN&lang=en-IN'  # General India
+)
+
+# Google News RSS feeds for India
+GOOGLE_RSS_URLS = (
+    'https://news.google.com/rss?hl=en-IN&gl=IN&ceid=IN:en',  # General India
+    'https://news.google.com/rss/topics/CAAqJggKIiBDQkFTRWdvSUwyMHZNRGx6TVdZU0FtVnVHZ0pWVXlnQVAB?hl=en-IN&gl=IN&ceid=IN:en',  # Business
+    'https://news.google.com/rss/topics/CAAqJggKIiBDQkFTRWdvSUwyMHZNRGRqTVhZU0FtVnVHZ0pWVXlnQVAB?hl=en-IN&gl=IN&ceid=IN:en'   # Technology
+)
+
+CRYPTO_GOOGLE_RSS_URL = 'https://news.google.com/rss/topics/CAAqLAgKIiZDQkFTRmdvSUwyMHZNRGRqTVhZU0FtVnVHZ0pWVXlnQVAB?hl=en-IN&gl=IN&ceid=IN:en'
+CRYPTO_YAHOO_RSS_URL = 'https://feeds.finance.yahoo.com/rss/2.0/headline?s=BTC-INR&region=IN&lang=en-IN'
+
+FOREX_RSS_URLS = (
+    'https://feeds.finance.yahoo.com/rss/2.0/headline?region=US&lang=en-US',  # US markets (includes forex)
+    'https://news.google.com/rss/topics/CAAqJggKIiBDQkFTRWdvSUwyMHZNRGx6TVdZU0FtVnVHZ0pWVXlnQVAB?hl=en-IN&gl=IN&ceid=IN:en'  # Business news
+)
+
+FEED_TIMEOUT = 5  # seconds per download
+
+# Titles treated as forex news; substring matches, like the keyword list it replaced
+_FOREX_RE = re.compile(r'forex|currency|usd|eur|gbp|exchange rate', re.IGNORECASE)
+NEWS_TTL = 300  # seconds a refresh reuses the previous download
+NEWSAPI_TTL = 900  # NewsAPI's free tier is rate limited, so keep its headlines longer
+NEWS_CACHE_ENTRIES = 16  # cap per cached fetcher, so a long-running server keeps few article lists
+
+# NewsAPI is only used when NEWS_API_KEY is set when the app starts
+_NEWS_API_KEY = os.getenv('NEWS_API_KEY')
+_NEWSAPI_URL = (f"https://newsapi.org/v2/top-headlines?country=in&category=business&apiKey={_NEWS_API_KEY}"
+                if _NEWS_API_KEY else None)
+
+# After NEWSAPI_MAX_FAILURES failures in a row NewsAPI is skipped for NEWSAPI_COOLDOWN seconds
+NEWSAPI_MAX_FAILURES = 3
+NEWSAPI_COOLDOWN = 300
+_newsapi_failures = 0
+_newsapi_cooldown_until = 0.0
+
+def _create_session():
+    """Create the keep-alive HTTP session shared by the news API calls"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10,
+                          max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+_SESSION = _create_session()
+
+async def _afetch(session, url):
+    """Download one URL, raising on HTTP errors"""
+    async with session.get(url) as response:
+        response.raise_for_status()
+        return await response.read()
+
+async def _afetch_all(urls):
+    """Download every URL concurrently; failed downloads come back as their exceptions"""
+    connector = aiohttp.TCPConnector(limit=10)
+    timeout = aiohttp.ClientTimeout(total=FEED_TIMEOUT)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                     headers={'User-Agent': feedparser.USER_AGENT}) as session:
+        return await asyncio.gather(*[_afetch(session, url) for url in urls], return_exceptions=True)
+
+def _fetch_all(urls):
+    """Download urls on one event loop, so the total wait is the slowest feed rather than the sum"""
+    return asyncio.run(_afetch_all(urls))
+
+# Parsed feeds by URL, shared by every fetch_news_* so a URL used by several tabs is downloaded once
+_FEEDS = {}
+_FEEDS_LOCK = threading.Lock()
+
+def _parse_feeds(urls):
+    """Return (url, feed) pairs for urls, downloading together only those not parsed in the last NEWS_TTL
+
+    Feeds that fail to download are skipped and not cached.
+    """
+    now = time.monotonic()
+    with _FEEDS_LOCK:
+        feeds = {url: _FEEDS[url][1] for url in urls if url in _FEEDS and now - _FEEDS[url][0] < NEWS_TTL}
+    missing = [url for url in dict.fromkeys(urls) if url not in feeds]
+    if missing:
+        for url, body in zip(missing, _fetch_all(missing)):
+            if not isinstance(body, BaseException):
+                feeds[url] = feedparser.parse(body)
+        with _FEEDS_LOCK:
+            _FEEDS.update((url, (now, feeds[url])) for url in missing if url in feeds)
+    return [(url, feeds[url]) for url in urls if url in feeds]
+
+def _feed_entries(url):
+    """Return the entries of one feed, or none if it could not be downloaded"""
+    feeds = _parse_feeds([url])
+    return feeds[0][1].entries if feeds else []
+
+def _entry_to_article(entry, source_name):
+    """Build an article dict from one RSS entry"""
+    return {
+        'title': entry.get('title', 'No Title'),
+        'description': entry.get('summary', 'No description'),
+        'url': entry.get('link', ''),
+        'publishedAt': entry.get('published') or datetime.now().isoformat(),
+        'source': {'name': source_name}
+    }
+
+def _yahoo_articles(feeds):
+    """Build articles from parsed Yahoo Finance feeds"""
+    all_articles = []
+
+    for rss_url, feed in feeds:
+        try:
+            all_articles.extend(_entry_to_article(entry, 'Yahoo Finance') for entry in feed.entries[:10])  # Limit to 10 per feed
+        except:
+            continue
+
+    return all_articles[:30]  # Return top 30 articles
+
+@st.cache_data(ttl=NEWS_TTL, max_entries=NEWS_CACHE_ENTRIES, show_spinner=False)
 def fetch_news_yahoo_finance():
     """Fetch news from Yahoo Finance RSS feeds"""
     try:
-        # Yahoo Finance RSS feeds
-        rss_urls = [
-            'https://feeds.finance.yahoo.com/rss/2.0/headline?s=%5ENSEI&region=IN&lang=en-IN',  # Nifty 50
-            'https://feeds.finance.yahoo.com/rss/2.0/headline?s=%5EBSESN&region=IN&lang=en-IN',  # BSE Sensex
-            'https://feeds.finance.yahoo.com/rss/2.0/headline?region=IN&lang=en-IN'  # General India
-        ]
-
-        all_articles = []
-
-        for rss_url in rss_urls:
-            try:
-                feed = feedparser.parse(rss_url)
-                for entry in feed.entries[:10]:  # Limit to 10 per feed
-                    article = {
-                        'title': entry.title if hasattr(entry, 'title') else 'No Title',
-                        'description': entry.summary if hasattr(entry, 'summary') else 'No description',
-                        'url': entry.link if hasattr(entry, 'link') else '',
-                        'publishedAt': entry.published if hasattr(entry, 'published') else datetime.now().isoformat(),
-                        'source': {'name': 'Yahoo Finance'}
-                    }
-                    all_articles.append(article)
-            except:
-                continue
-
-        return all_articles[:30]  # Return top 30 articles
+        return _yahoo_articles(_parse_feeds(YAHOO_RSS_URLS))
 
     except Exception as e:
         st.error(f"Error fetching Yahoo Finance news: {e}")
         return []
 
-def fetch_news_google_news():
-    """Fetch news from Google News RSS feeds"""
-    try:
-        # Google News RSS feeds for India
-        rss_urls = [
-            'https://news.google.com/rss?hl=en-IN&gl=IN&ceid=IN:en',  # General India
-            'https://news.google.com/rss/topics/CAAqJggKIiBDQkFTRWdvSUwyMHZNRGx6TVdZU0FtVnVHZ0pWVXlnQVAB?hl=en-IN&gl=IN&ceid=IN:en',  # Business
-            'https://news.google.com/rss/topics/CAAqJggKIiBDQkFTRWdvSUwyMHZNRGRqTVhZU0FtVnVHZ0pWVXlnQVAB?hl=en-IN&gl=IN&ceid=IN:en'   # Technology
-        ]
+def _google_articles(feeds):
+    """Build articles from parsed Google News feeds"""
+    all_articles = []
 
-        all_articles = []
+    for rss_url, feed in feeds:
+        try:
+            all_articles.extend(_entry_to_article(entry, 'Google News') for entry in feed.entries[:8])  # Limit to 8 per feed
+        except:
+            continue
 
-        for rss_url in rss_urls:
-            try:
-                feed = feedparser.parse(rss_url)
-                for entry in feed.entries[:8]:  # Limit to 8 per feed
-                    article = {
-                        'title': entry.title if hasattr(entry, 'title') else 'No Title',
-                        'description': entry.summary if hasattr(entry, 'summary') else 'No description',
-                        'url': entry.link if hasattr(entry, 'link') else '',
-                        'publishedAt': entry.published if hasattr(entry, 'published') else datetime.now().isoformat(),
-                        'source': {'name': 'Google News'}
-                    }
-                    all_articles.append(article)
-            except:
-                continue
+    return all_articles[:24]  # Return top 24 articles
 
-        return all_articles[:24]  # Return top 24 articles
+@st.cache_data(ttl=NEWS_TTL, max_entries=NEWS_CACHE_ENTRIES, show_spinner=False)
+def fetch_news_google_news():
+    """Fetch news from Google News RSS feeds"""
+    try:
+        return _google_articles(_parse_feeds(GOOGLE_RSS_URLS))
 
     except Exception as e:
         st.error(f"Error fetching Google News: {e}")
         return []
 
+def _newsapi_articles(body):
+    """Build articles from a NewsAPI top-headlines response body"""
+    articles = []
+    for item in (orjson.loads if orjson else json.loads)(body).get('articles', []):
+        article = {
+            'title': item.get('title', 'No Title'),
+            'description': item.get('description', 'No description'),
+            'url': item.get('url', ''),
+            'publishedAt': item.get('publishedAt', datetime.now().isoformat()),
+            'source': {'name': item.get('source', {}).get('name', 'NewsAPI')},
+            'urlToImage': item.get('urlToImage', '')
+        }
+        articles.append(article)
+    return articles
+
+@st.cache_data(ttl=NEWSAPI_TTL, max_entries=NEWS_CACHE_ENTRIES, show_spinner=False)
+def _fetch_newsapi():
+    """Fetch NewsAPI business headlines for India, raising if the download fails"""
+    body = _fetch_all([_NEWSAPI_URL])[0]
+    if isinstance(body, BaseException):
+        raise body
+    return _newsapi_articles(body)
+
+def _newsapi_available():
+    """Return True if NewsAPI is configured and not cooling down after repeated failures"""
+    return _NEWSAPI_URL is not None and time.monotonic() >= _newsapi_cooldown_until
+
+def _record_newsapi_result(succeeded):
+    """Reset the failure count on success, or start the cooldown once failures reach the limit"""
+    global _newsapi_failures, _newsapi_cooldown_until
+    if succeeded:
+        _newsapi_failures = 0
+        return
+    _newsapi_failures += 1
+    if _newsapi_failures >= NEWSAPI_MAX_FAILURES:
+        _newsapi_failures = 0
+        _newsapi_cooldown_until = time.monotonic() + NEWSAPI_COOLDOWN
+
+def clear_news_cache():
+    """Drop every cached news download so the next fetch goes to the network"""
+    for fetcher in (fetch_news_yahoo_finance, fetch_news_google_news,
+                    fetch_news_crypto, fetch_news_forex, _fetch_newsapi):
+        fetcher.clear()
+    with _FEEDS_LOCK:
+        _FEEDS.clear()
+
+# Not cached itself: the circuit breaker must see every NewsAPI failure, and its sources are already
+# memoised (_fetch_newsapi caches successes only, _parse_feeds keeps each feed for NEWS_TTL)
 def fetch_news_financial():
     """Fetch financial and economic news from multiple sources with improved error handling"""
     articles = []
 
+    # Try NewsAPI if configured and it has not been failing
+    if _newsapi_available():
+        try:
+            articles.extend(_fetch_newsapi())
+            _record_newsapi_result(True)
+        except Exception as e:
+            _record_newsapi_result(False)
+            st.warning(f"NewsAPI failed: {e}")
+
+    # Yahoo and Google are downloaded together; the fallbacks below still only use
+    # them when the sources before them came up short
     try:
-        # Try NewsAPI if configured
-        news_api_key = os.getenv('NEWS_API_KEY')
-        if news_api_key:
-            url = f"https://newsapi.org/v2/top-headlines?country=in&category=business&apiKey={news_api_key}"
-            response = requests.get(url)
-            if response.status_code == 200:
-                data = response.json()
-                for item in data.get('articles', []):
-                    article = {
-                        'title': item.get('title', 'No Title'),
-                        'description': item.get('description', 'No description'),
-                        'url': item.get('url', ''),
-                        'publishedAt': item.get('publishedAt', datetime.now().isoformat()),
-                        'source': {'name': item.get('source', {}).get('name', 'NewsAPI')},
-                        'urlToImage': item.get('urlToImage', '')
-                    }
-                    articles.append(article)
+        feeds = _parse_feeds(YAHOO_RSS_URLS + GOOGLE_RSS_URLS)
     except Exception as e:
-        st.warning(f"NewsAPI failed: {e}")
+        st.error(f"Error fetching financial news: {e}")
+        return articles[:20]
 
     # Try Yahoo Finance first
     if len(articles) < 10:
-        yahoo_articles = fetch_news_yahoo_finance()
+        yahoo_articles = _yahoo_articles([(url, feed) for url, feed in feeds if url in YAHOO_RSS_URLS])
         articles.extend(yahoo_articles)
 
     # Try Google News as backup
     if len(articles) < 10:
-        google_articles = fetch_news_google_news()
+        google_articles = _google_articles([(url, feed) for url, feed in feeds if url in GOOGLE_RSS_URLS])
         articles.extend(google_articles)
 
-    # Remove duplicates based on title
-    seen_titles = set()
-    unique_articles = []
+    # Remove duplicates based on title; the dict keeps the first article per title, in order
+    unique_articles = {}
     for article in articles:
         title = article.get('title', '').lower().strip()
-        if title and title not in seen_titles:
-            seen_titles.add(title)
-            unique_articles.append(article)
+        if title:
+            unique_articles.setdefault(title, article)
 
-    return unique_articles[:20]  # Return top 20 unique articles
+    return list(unique_articles.values())[:20]  # Return top 20 unique articles
 
+@st.cache_data(ttl=NEWS_TTL, max_entries=NEWS_CACHE_ENTRIES, show_spinner=False)
 def fetch_news_crypto():
     """Fetch cryptocurrency news from multiple sources with improved error handling"""
     try:
@@ -127,7 +268,7 @@ def fetch_news_crypto():
             'tags': 'bitcoin,ethereum,cryptocurrency'
         }
 
-        response = requests.get(url, params=params)
+        response = _SESSION.get(url, params=params, timeout=FEED_TIMEOUT)
         if response.status_code == 200:
             data = response.json()
             articles = []
@@ -143,65 +284,29 @@ def fetch_news_crypto():
             return articles[:15]
 
         # Fallback to Google News for crypto
-        rss_url = 'https://news.google.com/rss/topics/CAAqLAgKIiZDQkFTRmdvSUwyMHZNRGRqTVhZU0FtVnVHZ0pWVXlnQVAB?hl=en-IN&gl=IN&ceid=IN:en'
-        feed = feedparser.parse(rss_url)
-        articles = []
-        for entry in feed.entries[:15]:
-            article = {
-                'title': entry.title if hasattr(entry, 'title') else 'No Title',
-                'description': entry.summary if hasattr(entry, 'summary') else 'No description',
-                'url': entry.link if hasattr(entry, 'link') else '',
-                'publishedAt': entry.published if hasattr(entry, 'published') else datetime.now().isoformat(),
-                'source': {'name': 'Google News'}
-            }
-            articles.append(article)
-        return articles
+        return [_entry_to_article(entry, 'Google News') for entry in _feed_entries(CRYPTO_GOOGLE_RSS_URL)[:15]]
 
     except Exception as e:
         st.warning(f"Error fetching crypto news: {e}")
         # Additional fallback to Yahoo Finance crypto news
         try:
-            rss_url = 'https://feeds.finance.yahoo.com/rss/2.0/headline?s=BTC-INR&region=IN&lang=en-IN'
-            feed = feedparser.parse(rss_url)
-            articles = []
-            for entry in feed.entries[:10]:
-                article = {
-                    'title': entry.title if hasattr(entry, 'title') else 'No Title',
-                    'description': entry.summary if hasattr(entry, 'summary') else 'No description',
-                    'url': entry.link if hasattr(entry, 'link') else '',
-                    'publishedAt': entry.published if hasattr(entry, 'published') else datetime.now().isoformat(),
-                    'source': {'name': 'Yahoo Finance'}
-                }
-                articles.append(article)
-            return articles
+            return [_entry_to_article(entry, 'Yahoo Finance') for entry in _feed_entries(CRYPTO_YAHOO_RSS_URL)[:10]]
         except:
             return []
 
+@st.cache_data(ttl=NEWS_TTL, max_entries=NEWS_CACHE_ENTRIES, show_spinner=False)
 def fetch_news_forex():
     """Fetch forex and currency news from multiple sources"""
     try:
         # Try Yahoo Finance forex news
-        rss_urls = [
-            'https://feeds.finance.yahoo.com/rss/2.0/headline?region=US&lang=en-US',  # US markets (includes forex)
-            'https://news.google.com/rss/topics/CAAqJggKIiBDQkFTRWdvSUwyMHZNRGx6TVdZU0FtVnVHZ0pWVXlnQVAB?hl=en-IN&gl=IN&ceid=IN:en'  # Business news
-        ]
-
         all_articles = []
-        for rss_url in rss_urls:
+        for rss_url, feed in _parse_feeds(FOREX_RSS_URLS):
+            source_name = 'Yahoo Finance' if 'yahoo' in rss_url else 'Google News'
             try:
-                feed = feedparser.parse(rss_url)
                 for entry in feed.entries[:10]:
                     # Filter for forex-related content
-                    title_lower = entry.title.lower() if hasattr(entry, 'title') else ''
-                    if any(keyword in title_lower for keyword in ['forex', 'currency', 'usd', 'eur', 'gbp', 'exchange rate']):
-                        article = {
-                            'title': entry.title if hasattr(entry, 'title') else 'No Title',
-                            'description': entry.summary if hasattr(entry, 'summary') else 'No description',
-                            'url': entry.link if hasattr(entry, 'link') else '',
-                            'publishedAt': entry.published if hasattr(entry, 'published') else datetime.now().isoformat(),
-                            'source': {'name': 'Yahoo Finance' if 'yahoo' in rss_url else 'Google News'}
-                        }
-                        all_articles.append(article)
+                    if _FOREX_RE.search(entry.get('title', '')):
+                        all_articles.append(_entry_to_article(entry, source_name))
             except:
                 continue
 
@@ -211,9 +316,38 @@ def fetch_news_forex():
         st.error(f"Error fetching forex news: {e}")
         return []
 
+_ARTICLE_HTML = (
+    '<details><summary>{number}. {title}</summary>'
+    '<div style="display: flex; gap: 1rem;">'
+    '<div style="flex: 3;"><b>Source:</b> {source}<br/><b>Published:</b> {published}<p>{description}</p></div>'
+    '<div style="flex: 1;">{image}</div>'
+    '</div>{link}</details>'
+)
+
+def _article_html(number, article):
+    """Render one article as a collapsible <details> block, with every field escaped; NewsAPI sends nulls"""
+    image = article.get('urlToImage')
+    url = article.get('url')
+    return _ARTICLE_HTML.format(
+        number=number,
+        title=html.escape(article.get('title') or 'No Title'),
+        source=html.escape(article.get('source', {}).get('name') or 'Unknown'),
+        published=html.escape((article.get('publishedAt') or 'Unknown')[:10]),
+        description=html.escape(article.get('description') or 'No description available'),
+        image=f'<img src="{html.escape(image)}" width="100"/>' if image else '',
+        link=f'<a href="{html.escape(url)}" target="_blank">Read full article</a>' if url else ''
+    )
+
+def show_articles(articles):
+    """Show articles as one markdown element instead of an expander and columns per article"""
+    st.markdown(''.join(_article_html(i + 1, article) for i, article in enumerate(articles)), unsafe_allow_html=True)
+
 def display():
     st.header("📰 Live Global News Feed")
 
+    if st.button("Force Refresh", help=f"News is reused for {NEWS_TTL // 60} minutes; this fetches it again"):
+        clear_news_cache()
+
     tab1, tab2, tab3 = st.tabs(["📈 Financial Markets", "₿ Cryptocurrency", "💱 Forex & Currency"])
 
     with tab1:
@@ -223,18 +357,7 @@ def display():
                 articles = fetch_news_financial()
 
                 if articles:
-                    for i, article in enumerate(articles[:15]):  # Show top 15 articles
-                        with st.expander(f"{i+1}. {article.get('title', 'No Title')}"):
-                            col1, col2 = st.columns([3, 1])
-                            with col1:
-                                st.write(f"**Source:** {article.get('source', {}).get('name', 'Unknown')}")
-                                st.write(f"**Published:** {article.get('publishedAt', 'Unknown')[:10]}")
-                                st.write(article.get('description', 'No description available'))
-                            with col2:
-                                if article.get('urlToImage'):
-                                    st.image(article['urlToImage'], width=100)
-                            if article.get('url'):
-                                st.markdown(f"[Read full article]({article['url']})")
+                    show_articles(articles[:15])  # Show top 15 articles
                 else:
                     st.warning("Unable to fetch financial news. Please check API key configuration.")
 
@@ -245,18 +368,7 @@ def display():
                 articles = fetch_news_crypto()
 
                 if articles:
-                    for i, article in enumerate(articles[:15]):
-                        with st.expander(f"{i+1}. {article.get('title', 'No Title')}"):
-                            col1, col2 = st.columns([3, 1])
-                            with col1:
-                                st.write(f"**Source:** {article.get('source', {}).get('name', 'Unknown')}")
-                                st.write(f"**Published:** {article.get('publishedAt', 'Unknown')[:10]}")
-                                st.write(article.get('description', 'No description available'))
-                            with col2:
-                                if article.get('urlToImage'):
-                                    st.image(article['urlToImage'], width=100)
-                            if article.get('url'):
-                                st.markdown(f"[Read full article]({article['url']})")
+                    show_articles(articles[:15])
                 else:
                     st.warning("Unable to fetch cryptocurrency news. Please check API key configuration.")
 
@@ -267,18 +379,7 @@ def display():
                 articles = fetch_news_forex()
 
                 if articles:
-                    for i, article in enumerate(articles[:15]):
-                        with st.expander(f"{i+1}. {article.get('title', 'No Title')}"):
-                            col1, col2 = st.columns([3, 1])
-                            with col1:
-                                st.write(f"**Source:** {article.get('source', {}).get('name', 'Unknown')}")
-                                st.write(f"**Published:** {article.get('publishedAt', 'Unknown')[:10]}")
-                                st.write(article.get('description', 'No description available'))
-                            with col2:
-                                if article.get('urlToImage'):
-                                    st.image(article['urlToImage'], width=100)
-                            if article.get('url'):
-                                st.markdown(f"[Read full article]({article['url']})")
+                    show_articles(articles[:15])
                 else:
                     st.warning("Unable to fetch forex news. Please check API key configuration.")
 
@@ -1,37 +1,203 @@
 import streamlit as st
 import pandas as pd
+import io
 import numpy as np
+import time
 import yfinance as yf
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from scipy.linalg.blas import dsymv
 import plotly.graph_objects as go
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
-
+from src.data_fetcher import YF_BATCH_SIZE, NoDataError
+from src.data_fetcher_cache import DAILY_TTL, FileCache
+
+try:
+    # Optional JIT kernel for risk-budget weights; numba is not a hard dependency
+    from src.portfolio_nb import erc_ccd as _erc_ccd_nb
+except ImportError:
+    _erc_ccd_nb = None
+
+# On-disk cache of daily closes, one Parquet file per (symbol, years, day)
+_CACHE = FileCache()
+
+PORTFOLIO_TTL = 3600  # seconds an analysed symbol set is reused in memory
+
+# Report styles are built once and shared by every PDF
+_STYLES = getSampleStyleSheet()
+
+_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_STYLES['Heading1'],
+    fontSize=18,
+    spaceAfter=30,
+    alignment=1
+)
+
+_HEADING_STYLE = ParagraphStyle(
+    'CustomHeading',
+    parent=_STYLES['Heading2'],
+    fontSize=14,
+    spaceAfter=20,
+)
+
+_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+def _download_close(symbol, start_date, end_date):
+    """Download the daily closes for one symbol"""
+    data = yf.download(symbol, start=start_date, end=end_date, auto_adjust=False, progress=False)
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = data.columns.droplevel(1)
+    return data['Close']
+
+def _download_closes_each(symbols, start_date, end_date):
+    """Download closes with one request per symbol, run concurrently since each mostly waits on the network"""
+    closes = {}
+    with ThreadPoolExecutor(max_workers=min(16, len(symbols))) as executor:
+        futures = {executor.submit(_download_close, symbol, start_date, end_date): symbol for symbol in symbols}
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                closes[symbol] = future.result()
+            except Exception as e:
+                st.error(f"Error fetching data for {symbol}: {e}")
+    return closes
+
+def _download_closes(symbols, start_date, end_date):
+    """Download daily closes for symbols, returning {symbol: Series} for those that came back"""
+    # One request per YF_BATCH_SIZE symbols instead of one per symbol
+    portfolio_data = {}
+    for offset in range(0, len(symbols), YF_BATCH_SIZE):
+        chunk = symbols[offset:offset + YF_BATCH_SIZE]
+        try:
+            data = yf.download(" ".join(chunk), start=start_date, end=end_date, auto_adjust=False,
+                               group_by='ticker', threads=True, progress=False)
+        except Exception:
+            # Fall back to one request per symbol
+            portfolio_data.update(_download_closes_each(chunk, start_date, end_date))
+            continue
+
+        if isinstance(data.columns, pd.MultiIndex):
+            # group_by='ticker' puts the symbol on the first column level
+            for symbol in chunk:
+                if (symbol, 'Close') in data.columns:
+                    portfolio_data[symbol] = data[(symbol, 'Close')]
+        elif len(chunk) == 1:
+            if 'Close' in data.columns:
+                portfolio_data[chunk[0]] = data['Close']
+        else:
+            # Flat columns name no symbol (yfinance drops the level when only one resolved), so
+            # ask for each symbol separately rather than give every one the same closes
+            portfolio_data.update(_download_closes_each(chunk, start_date, end_date))
+
+    return portfolio_data
+
+@st.cache_data(ttl=PORTFOLIO_TTL, show_spinner=False)
 def fetch_portfolio_data(symbols, years=3):
     """Fetch historical data for multiple symbols"""
     end_date = datetime.now()
     start_date = end_date - timedelta(days=years*365)
+    symbols = list(dict.fromkeys(symbols))
 
+    # Serve fresh closes from the on-disk cache; the key changes daily along with the window
+    keys = {symbol: ('fetch_portfolio_data', symbol, years, end_date.date().isoformat()) for symbol in symbols}
     portfolio_data = {}
-    for symbol in symbols:
-        try:
-            data = yf.download(symbol, start=start_date, end=end_date, auto_adjust=False)
-            if isinstance(data.columns, pd.MultiIndex):
-                data.columns = data.columns.droplevel(1)
-            portfolio_data[symbol] = data['Close']
-        except Exception as e:
-            st.error(f"Error fetching data for {symbol}: {e}")
-            portfolio_data[symbol] = None
-
+    for symbol, key in keys.items():
+        cached = _CACHE.get(key, columns=['Close'])
+        if cached is not None:
+            portfolio_data[symbol] = cached['Close']
+
+    missing = [symbol for symbol in symbols if symbol not in portfolio_data]
+    if missing:
+        downloaded = _download_closes(missing, start_date, end_date)
+        for symbol, closes in downloaded.items():
+            if closes.notna().any():
+                _CACHE.set(keys[symbol], closes.to_frame('Close'), DAILY_TTL)
+        portfolio_data.update(downloaded)
+
+    # Columns keep the requested order; symbols Yahoo had no bars for come back empty or all-NaN and are dropped
+    portfolio_data = {symbol: portfolio_data[symbol] for symbol in symbols
+                      if symbol in portfolio_data and portfolio_data[symbol].notna().any()}
+    # yf.download reports failed symbols with empty columns rather than an exception, so raise
+    # here to keep st.cache_data from replaying an empty portfolio for the whole TTL
+    if not portfolio_data:
+        raise NoDataError(f"No data returned for {', '.join(symbols)}")
     return pd.DataFrame(portfolio_data)
 
-def calculate_portfolio_metrics(returns, weights):
-    """Calculate portfolio metrics"""
-    portfolio_return = np.sum(returns.mean() * weights) * 252  # Annualized
-    portfolio_volatility = np.sqrt(np.dot(weights.T, np.dot(returns.cov() * 252, weights)))
+def ledoit_wolf_cov(R):
+    """Ledoit-Wolf shrunk covariance of the rows of R, pulled toward a scaled identity
+
+    Same estimator as sklearn.covariance.LedoitWolf, without the scikit-learn dependency.
+    """
+    n, p = R.shape
+    X = R - R.mean(axis=0)
+    emp_cov = X.T @ X / n
+    mu = np.trace(emp_cov) / p
+
+    # Optimal shrinkage intensity from the spread of the per-sample outer products
+    X2 = X ** 2
+    beta = ((X2.T @ X2).sum() / n - (emp_cov ** 2).sum()) / (p * n)
+    delta = ((emp_cov - mu * np.eye(p)) ** 2).sum() / p
+    shrinkage = min(beta, delta) / delta if delta > 0 else 0.0
+    return (1 - shrinkage) * emp_cov + shrinkage * mu * np.eye(p)
+
+def _erc_ccd_numpy(cov, budgets, tol, max_iter):
+    """Python version of the risk-budget kernel, used when numba is unavailable"""
+    n = budgets.size
+    w = 1.0 / np.sqrt(np.diag(cov))
+    cw = cov @ w
+    for _ in range(max_iter):
+        max_change = 0.0
+        for i in range(n):
+            a = cov[i, i]
+            b = cw[i] - a * w[i]
+            new = (-b + np.sqrt(b * b + 4.0 * a * budgets[i])) / (2.0 * a)
+            delta = new - w[i]
+            cw += cov[:, i] * delta
+            w[i] = new
+            max_change = max(max_change, abs(delta) / new)
+        if max_change < tol:
+            break
+    return w / w.sum()
+
+def risk_parity_weights(returns, budgets=None, shrink_cov=False, tol=1e-10, max_iter=500):
+    """Weights whose shares of portfolio risk match budgets (equal risk contribution by default)"""
+    # The covariance stays in NumPy; only the scalar coordinate-descent loop is compiled
+    R = np.ascontiguousarray(returns.to_numpy(dtype=np.float64))
+    cov = ledoit_wolf_cov(R) if shrink_cov else np.atleast_2d(np.cov(R, rowvar=False))
+    n = cov.shape[0]
+    budgets = np.full(n, 1.0 / n) if budgets is None else np.asarray(budgets, dtype=np.float64)
+    kernel = _erc_ccd_nb or _erc_ccd_numpy
+    return kernel(np.ascontiguousarray(cov), budgets / budgets.sum(), tol, max_iter)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def calculate_portfolio_metrics(returns, weights, shrink_cov=False):
+    """Calculate portfolio metrics, optionally with Ledoit-Wolf shrinkage of the covariance"""
+    # returns has no gaps here (rows with NaN were dropped), so plain NumPy matches DataFrame.mean/cov.
+    # The float32 returns are read as is; the reductions accumulate in float64.
+    R = np.ascontiguousarray(returns.to_numpy())
+    if shrink_cov:
+        cov = ledoit_wolf_cov(R.astype(np.float64))
+    else:
+        cov = np.atleast_2d(np.cov(R, rowvar=False, dtype=np.float64))
+    weights = np.asarray(weights, dtype=np.float64)
+    portfolio_return = (R.mean(axis=0, dtype=np.float64) @ weights) * 252  # Annualized
+
+    # cov is symmetric, so its Fortran-order copy goes straight to BLAS dsymv for cov @ weights
+    annual_cov = np.asfortranarray(cov * 252)
+    portfolio_volatility = np.sqrt(float(weights @ dsymv(1.0, annual_cov, weights)))
 
     # Sharpe Ratio (assuming risk-free rate of 6.5% for India)
     risk_free_rate = 0.065
@@ -45,100 +211,133 @@ def calculate_portfolio_metrics(returns, weights):
 
 def calculate_individual_metrics(returns):
     """Calculate individual stock metrics"""
-    metrics = {}
-    for column in returns.columns:
-        stock_returns = returns[column].dropna()
-        if len(stock_returns) > 0:
-            ann_return = stock_returns.mean() * 252
-            ann_vol = stock_returns.std() * np.sqrt(252)
-            metrics[column] = {
-                'return': ann_return,
-                'volatility': ann_vol,
-                'sharpe_ratio': (ann_return - 0.065) / ann_vol if ann_vol > 0 else 0
-            }
-    return metrics
+    # Reductions skip NaN per column, like the per-column dropna they replace
+    returns = returns.loc[:, returns.count() > 0]
+    ann_return = returns.mean() * 252
+    ann_vol = returns.std() * np.sqrt(252)
+    sharpe_ratio = ((ann_return - 0.065) / ann_vol).where(ann_vol > 0, 0)
+    return pd.DataFrame({
+        'return': ann_return,
+        'volatility': ann_vol,
+        'sharpe_ratio': sharpe_ratio
+    }).to_dict(orient='index')
+
+CHART_POINTS = 500  # rows sent to the browser for a price chart
+
+def _downsample(df, n=CHART_POINTS):
+    """Return every k-th row of df so that at most n rows are charted, keeping the last row"""
+    stride = -(-len(df) // n)
+    if stride <= 1:
+        return df
+    rows = np.arange(len(df) - 1, -1, -stride)[::-1]
+    return df.iloc[rows]
+
+class _Unprepared(Exception):
+    """Raised from _prepare_portfolio so neither st.cache_data nor session_state keeps a portfolio with no returns"""
+
+    def __init__(self, frames):
+        super().__init__()
+        self.frames = frames
+
+@st.cache_data(ttl=PORTFOLIO_TTL, max_entries=16, show_spinner=False)
+def _prepare_portfolio(symbols, years):
+    """Fetch closes for symbols and derive every frame display() needs that does not depend on the weights"""
+    portfolio_data = fetch_portfolio_data(symbols, years)
+    # float32 halves the memory every frame below moves; displays round far coarser than its precision
+    portfolio_data = portfolio_data.astype(np.float32)
+
+    # Filter out companies with no data
+    valid_companies = [col for col in portfolio_data.columns if portfolio_data[col].notna().any()]
+    # Daily returns in one divide; rows with a gap in any series are dropped, as dropna did
+    P = portfolio_data[valid_companies].to_numpy()
+    R = P[1:] / P[:-1] - 1.0
+    complete = np.isfinite(R).all(axis=1)
+    R = R[complete]
+    returns = pd.DataFrame(R, index=portfolio_data.index[1:][complete], columns=valid_companies)
+    if returns.empty:
+        # No date has a return for every company, so every metric would be NaN; retry on the next click
+        raise _Unprepared({'prices': portfolio_data, 'valid_companies': valid_companies, 'returns': returns})
+
+    # R has no gaps left, so np.corrcoef on the raw buffer matches DataFrame.corr
+    correlation = pd.DataFrame(np.atleast_2d(np.corrcoef(R, rowvar=False, dtype=np.float64)), index=returns.columns, columns=returns.columns)
+
+    # Rebase every price series to 100 at the first bar in one broadcast divide
+    prices = portfolio_data.to_numpy()
+    normalized = pd.DataFrame(prices / prices[0] * 100.0, index=portfolio_data.index, columns=portfolio_data.columns)
+    return {
+        'prices': portfolio_data,
+        'valid_companies': valid_companies,
+        'returns': returns,
+        'normalized': normalized,
+        'correlation': correlation,
+        'individual_metrics': calculate_individual_metrics(returns),
+    }
+
+def _session_portfolio(symbols, years):
+    """Return _prepare_portfolio's frames, kept in session_state so weight-only reruns skip the cache lookup"""
+    key = (symbols, years)
+    memo = st.session_state.get('portfolio_prepared')
+    if memo is None or memo['key'] != key or time.time() - memo['at'] > PORTFOLIO_TTL:
+        try:
+            frames = _prepare_portfolio(symbols, years)
+        except _Unprepared as failed:
+            return failed.frames
+        memo = {'key': key, 'at': time.time(), 'frames': frames}
+        st.session_state.portfolio_prepared = memo
+    return memo['frames']
 
 def generate_portfolio_report(company_names, weights, equity_weight, debt_weight, wacc, metrics, individual_metrics):
-    """Generate comprehensive portfolio analysis PDF report"""
+    """Generate comprehensive portfolio analysis PDF report, returning (filename, pdf_bytes)"""
     filename = f"portfolio_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-    doc = SimpleDocTemplate(filename, pagesize=letter)
-    styles = getSampleStyleSheet()
-
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        spaceAfter=30,
-        alignment=1
-    )
-
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=14,
-        spaceAfter=20,
-    )
-
+    # Built in memory: the bytes go straight to st.download_button and no file is left on the server
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
     story = []
 
     # Title
-    story.append(Paragraph("Portfolio Analysis Report", title_style))
-    story.append(Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Italic']))
+    story.append(Paragraph("Portfolio Analysis Report", _TITLE_STYLE))
+    story.append(Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", _STYLES['Italic']))
     story.append(Spacer(1, 20))
 
     # Executive Summary
-    story.append(Paragraph("Executive Summary", heading_style))
-    story.append(Paragraph("Comprehensive portfolio analysis including risk-return metrics, asset allocation, and performance evaluation.", styles['Normal']))
+    story.append(Paragraph("Executive Summary", _HEADING_STYLE))
+    story.append(Paragraph("Comprehensive portfolio analysis including risk-return metrics, asset allocation, and performance evaluation.", _STYLES['Normal']))
     story.append(Spacer(1, 12))
 
     # Portfolio Composition
-    story.append(Paragraph("Portfolio Composition", heading_style))
+    story.append(Paragraph("Portfolio Composition", _HEADING_STYLE))
     composition_data = [
         ["Asset Class", "Weight"],
         ["Equity", f"{equity_weight:.1%}"],
         ["Debt", f"{debt_weight:.1%}"],
     ]
     table = Table(composition_data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    table.setStyle(_TABLE_STYLE)
     story.append(table)
     story.append(Spacer(1, 12))
 
     # Individual Stock Holdings
-    story.append(Paragraph("Individual Stock Holdings", heading_style))
+    story.append(Paragraph("Individual Stock Holdings", _HEADING_STYLE))
+    # Align metrics and weights by company, then format each column in one vectorized pass
+    holdings = pd.DataFrame.from_dict(individual_metrics, orient='index').reindex(company_names)
+    holdings['weight'] = weights
+    holdings = holdings[holdings.index.isin(list(individual_metrics))]
     holdings_data = [["Company", "Weight", "Expected Return", "Volatility", "Sharpe Ratio"]]
-    for i, company in enumerate(company_names):
-        if company in individual_metrics:
-            metrics_data = individual_metrics[company]
-            holdings_data.append([
-                company,
-                f"{weights[i]:.1%}",
-                f"{metrics_data['return']:.1%}",
-                f"{metrics_data['volatility']:.1%}",
-                f"{metrics_data['sharpe_ratio']:.2f}"
-            ])
+    if not holdings.empty:
+        holdings_data += np.column_stack([
+            holdings.index.to_numpy(dtype=str),
+            np.char.mod('%.1f%%', holdings['weight'].to_numpy() * 100),
+            np.char.mod('%.1f%%', holdings['return'].to_numpy() * 100),
+            np.char.mod('%.1f%%', holdings['volatility'].to_numpy() * 100),
+            np.char.mod('%.2f', holdings['sharpe_ratio'].to_numpy())
+        ]).tolist()
     table = Table(holdings_data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    table.setStyle(_TABLE_STYLE)
     story.append(table)
     story.append(Spacer(1, 12))
 
     # Portfolio Metrics
-    story.append(Paragraph("Portfolio Performance Metrics", heading_style))
+    story.append(Paragraph("Portfolio Performance Metrics", _HEADING_STYLE))
     portfolio_data = [
         ["Metric", "Value"],
         ["Expected Annual Return", f"{metrics['expected_return']:.1%}"],
@@ -147,20 +346,12 @@ def generate_portfolio_report(company_names, weights, equity_weight, debt_weight
         ["WACC", f"{wacc:.1%}"],
     ]
     table = Table(portfolio_data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    table.setStyle(_TABLE_STYLE)
     story.append(table)
     story.append(Spacer(1, 12))
 
     # Assumptions and Methodology
-    story.append(Paragraph("Assumptions and Methodology", heading_style))
+    story.append(Paragraph("Assumptions and Methodology", _HEADING_STYLE))
     assumptions = [
         f"• Risk-free rate assumed at 6.5% (typical Indian government bond yield)",
         f"• Historical data used for return calculations (past {3} years)",
@@ -169,11 +360,11 @@ def generate_portfolio_report(company_names, weights, equity_weight, debt_weight
         f"• Portfolio weights: Equity {equity_weight:.1%}, Debt {debt_weight:.1%}",
     ]
     for assumption in assumptions:
-        story.append(Paragraph(assumption, styles['Normal']))
+        story.append(Paragraph(assumption, _STYLES['Normal']))
         story.append(Spacer(1, 4))
 
     # Recommendations
-    story.append(Paragraph("Investment Recommendations", heading_style))
+    story.append(Paragraph("Investment Recommendations", _HEADING_STYLE))
     recommendations = [
         "• Diversify across different sectors to reduce concentration risk",
         "• Regularly rebalance portfolio to maintain target allocations",
@@ -182,11 +373,11 @@ def generate_portfolio_report(company_names, weights, equity_weight, debt_weight
         "• Review portfolio risk metrics quarterly"
     ]
     for rec in recommendations:
-        story.append(Paragraph(rec, styles['Normal']))
+        story.append(Paragraph(rec, _STYLES['Normal']))
         story.append(Spacer(1, 4))
 
     doc.build(story)
-    return filename
+    return filename, buffer.getvalue()
 
 def display():
     st.header("📊 Portfolio Analysis")
@@ -198,6 +389,10 @@ def display():
         num_companies = st.slider("Number of Companies", 2, 10, 5)
         years = st.slider("Historical Data Years", 1, 5, 3)
 
+    with col2:
+        shrink_cov = st.checkbox("Ledoit-Wolf covariance",
+                                 help="Shrink the sample covariance toward a scaled identity; steadier for short histories")
+
     companies = []
     for i in range(num_companies):
         company = st.text_input(f"Company {i+1} Symbol (e.g., RELIANCE.NS)", f"RELIANCE.NS" if i == 0 else "", key=f"company_{i}")
@@ -238,13 +433,17 @@ def display():
 
         if st.button("Analyze Portfolio"):
             with st.spinner("Analyzing portfolio..."):
-                # Fetch data
-                portfolio_data = fetch_portfolio_data(companies, years)
+                # Fetch data and the weight-independent frames, cached per (symbols, years)
+                try:
+                    prepared = _session_portfolio(tuple(companies), years)
+                except NoDataError:
+                    prepared = {'prices': pd.DataFrame()}
+                portfolio_data = prepared['prices']
 
                 if not portfolio_data.empty:
-                    # Filter out companies with no data
-                    valid_companies = [col for col in portfolio_data.columns if portfolio_data[col].notna().any()]
-                    valid_weights = [weights[i] for i in range(len(companies)) if companies[i] in valid_companies]
+                    valid_companies = prepared['valid_companies']
+                    valid_set = set(valid_companies)
+                    valid_weights = [w for company, w in zip(companies, weights) if company in valid_set]
 
                     # Normalize valid weights
                     if valid_weights:
@@ -256,20 +455,20 @@ def display():
                         st.error("No valid data found for any selected companies. Please check symbols and try again.")
                         return
 
-                    # Calculate returns
-                    returns = portfolio_data[valid_companies].pct_change(fill_method=None).dropna()
+                    returns = prepared['returns']
 
                     # Filter weights to match returns columns (some stocks might have all NaN after pct_change)
                     final_companies = returns.columns.tolist()
-                    final_weights = [valid_weights[valid_companies.index(company)] for company in final_companies]
+                    weight_by_company = dict(zip(valid_companies, valid_weights))
+                    final_weights = [weight_by_company[company] for company in final_companies]
 
-                    if not final_companies:
+                    if returns.empty:
                         st.error("No valid return data found for any selected companies. Please check symbols and try again.")
                         return
 
                     # Portfolio metrics
-                    portfolio_metrics = calculate_portfolio_metrics(returns, np.array(final_weights))
-                    individual_metrics = calculate_individual_metrics(returns)
+                    portfolio_metrics = calculate_portfolio_metrics(returns, np.array(final_weights), shrink_cov)
+                    individual_metrics = prepared['individual_metrics']
 
                     # Display results
                     st.subheader("📈 Portfolio Performance")
@@ -293,28 +492,26 @@ def display():
 
                     # Portfolio chart
                     st.subheader("Portfolio Value Over Time")
-                    normalized_portfolio = (portfolio_data / portfolio_data.iloc[0]) * 100
-                    st.line_chart(normalized_portfolio)
+                    st.line_chart(_downsample(prepared['normalized']))
 
                     # Correlation matrix
                     st.subheader("Correlation Matrix")
-                    corr_matrix = returns.corr()
+                    corr_matrix = prepared['correlation']
                     st.dataframe(corr_matrix.style.background_gradient(cmap='RdYlGn', axis=None))
 
                     # Generate PDF Report
                     if st.button("Generate Portfolio Analysis PDF Report"):
                         with st.spinner("Generating PDF report..."):
-                            filename = generate_portfolio_report(
+                            filename, pdf_bytes = generate_portfolio_report(
                                 companies, weights, equity_weight, debt_weight,
                                 wacc, portfolio_metrics, individual_metrics
                             )
-                            with open(filename, "rb") as f:
-                                st.download_button(
-                                    label="📥 Download Portfolio Analysis Report",
-                                    data=f,
-                                    file_name=filename,
-                                    mime="application/pdf"
-                                )
+                            st.download_button(
+                                label="📥 Download Portfolio Analysis Report",
+                                data=pdf_bytes,
+                                file_name=filename,
+                                mime="application/pdf"
+                            )
                             st.success(f"Portfolio analysis report generated: {filename}")
 
                     # Insights and Observations
@@ -335,7 +532,9 @@ def display():
                         st.warning("⚠️ Consider optimizing for better risk-adjusted returns.")
 
                     # Correlation insights
-                    high_corr = (corr_matrix > 0.7).sum().sum() - len(corr_matrix)
+                    # Each pair once, from the strict upper triangle
+                    corr_values = corr_matrix.to_numpy()
+                    high_corr = int((corr_values[np.triu_indices_from(corr_values, k=1)] > 0.7).sum())
                     if high_corr > 0:
                         st.info(f"ℹ️ {high_corr} pairs of stocks show high correlation. Consider sector diversification.")
 
@@ -0,0 +1,34 @@
+import numpy as np
+from numba import njit
+
+@njit(cache=True, fastmath=True)
+def erc_ccd(cov, budgets, tol, max_iter):
+    """Return long-only weights whose risk contributions are proportional to budgets
+
+    Cyclical coordinate descent on 1/2 w'Cw - sum(b_i log w_i): each weight in turn is set to the
+    positive root of C_ii w_i^2 + ((Cw)_i - C_ii w_i) w_i - b_i = 0, keeping Cw up to date as it goes.
+    The weights are normalised to sum to 1.
+    """
+    n = budgets.size
+    w = np.empty(n)
+    for i in range(n):
+        w[i] = 1.0 / np.sqrt(cov[i, i])
+    cw = cov @ w
+
+    for _ in range(max_iter):
+        max_change = 0.0
+        for i in range(n):
+            a = cov[i, i]
+            b = cw[i] - a * w[i]
+            new = (-b + np.sqrt(b * b + 4.0 * a * budgets[i])) / (2.0 * a)
+            delta = new - w[i]
+            if delta != 0.0:
+                for j in range(n):
+                    cw[j] += cov[j, i] * delta
+                w[i] = new
+            change = abs(delta) / new
+            if change > max_change:
+                max_change = change
+        if max_change < tol:
+            break
+    return w / w.sum()
@@ -0,0 +1,46 @@
+import numpy as np
+from numba import njit, prange
+
+@njit(cache=True)
+def _numerator(value):
+    """Missing (nan) numerators count as 0, like statement.get(key, 0)"""
+    return 0.0 if np.isnan(value) else value
+
+@njit(cache=True)
+def _denominator(value):
+    """Missing (nan) denominators count as 1, like statement.get(key, 1)"""
+    return 1.0 if np.isnan(value) else value
+
+@njit(cache=True, parallel=True)
+def ratios_batch(net_income, equity, total_assets, revenue, cogs, current_assets, current_liabilities, inventory, total_debt):
+    """Return a 7xN array of ROE, ROA, Gross Margin, Current, Quick, Debt/Equity and Debt/Assets
+
+    Mirrors equity_analysis.calculate_ratios: a zero denominator zeroes its whole ratio group.
+    """
+    n = net_income.size
+    out = np.zeros((7, n))
+    for i in prange(n):
+        eq = _denominator(equity[i])
+        ta = _denominator(total_assets[i])
+        rev = _denominator(revenue[i])
+        cl = _denominator(current_liabilities[i])
+
+        # Profitability
+        if eq != 0 and ta != 0 and rev != 0:
+            ni = _numerator(net_income[i])
+            out[0, i] = ni / eq
+            out[1, i] = ni / ta
+            out[2, i] = (_numerator(revenue[i]) - _numerator(cogs[i])) / rev
+
+        # Liquidity
+        if cl != 0:
+            ca = _numerator(current_assets[i])
+            out[3, i] = ca / cl
+            out[4, i] = (ca - _numerator(inventory[i])) / cl
+
+        # Solvency
+        if eq != 0 and ta != 0:
+            td = _numerator(total_debt[i])
+            out[5, i] = td / eq
+            out[6, i] = td / ta
+    return out
@@ -5,46 +5,73 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib import colors
 import pandas as pd
 from datetime import datetime
+import io
 import os
 
-def generate_comprehensive_report(company_data, technical_data, fundamental_data, news_data):
-    """Generate comprehensive PDF report using ReportLab"""
-    filename = f"cosmic_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-    doc = SimpleDocTemplate(filename, pagesize=letter)
-    styles = getSampleStyleSheet()
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+# Report styles are built once and shared by every PDF
+_STYLES = getSampleStyleSheet()
+
+_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_STYLES['Heading1'],
+    fontSize=18,
+    spaceAfter=30,
+    alignment=1  # Center alignment
+)
 
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        spaceAfter=30,
-        alignment=1  # Center alignment
-    )
+_HEADING_STYLE = ParagraphStyle(
+    'CustomHeading',
+    parent=_STYLES['Heading2'],
+    fontSize=14,
+    spaceAfter=20,
+)
 
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=14,
-        spaceAfter=20,
-    )
+_FUNDAMENTALS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 14),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
 
-    normal_style = styles['Normal']
+_TECHNICALS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.lightblue),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
 
+def generate_comprehensive_report(company_data, technical_data, fundamental_data, news_data):
+    """Generate comprehensive PDF report using ReportLab, returning (filename, pdf_bytes)"""
+    filename = f"cosmic_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    # Built in memory: the bytes go straight to st.download_button and no file is left on the server
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
     story = []
 
     # Title
-    story.append(Paragraph("Cosmic Financial Analysis Report", title_style))
-    story.append(Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Italic']))
+    story.append(Paragraph("Cosmic Financial Analysis Report", _TITLE_STYLE))
+    story.append(Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", _STYLES['Italic']))
     story.append(Spacer(1, 20))
 
     # Executive Summary
-    story.append(Paragraph("Executive Summary", heading_style))
-    story.append(Paragraph(f"Financial analysis report for {company_data.get('symbol', 'N/A')} generated on {datetime.now().strftime('%Y-%m-%d')}.", normal_style))
+    story.append(Paragraph("Executive Summary", _HEADING_STYLE))
+    story.append(Paragraph(f"Financial analysis report for {company_data.get('symbol', 'N/A')} generated on {datetime.now().strftime('%Y-%m-%d')}.", _STYLES['Normal']))
     story.append(Spacer(1, 12))
 
     # Fundamental Analysis
-    story.append(Paragraph("Fundamental Analysis", heading_style))
+    story.append(Paragraph("Fundamental Analysis", _HEADING_STYLE))
     if fundamental_data:
         fundamentals = [
             ["Metric", "Value"],
@@ -54,23 +81,14 @@ def generate_comprehensive_report(company_data, technical_data, fundamental_data
             ["Dividend Yield", f"{fundamental_data.get('dividend_yield', 0):.2%}"],
         ]
         table = Table(fundamentals)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 14),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        table.setStyle(_FUNDAMENTALS_TABLE_STYLE)
         story.append(table)
     else:
-        story.append(Paragraph("Fundamental data not available.", normal_style))
+        story.append(Paragraph("Fundamental data not available.", _STYLES['Normal']))
     story.append(Spacer(1, 12))
 
     # Technical Analysis
-    story.append(Paragraph("Technical Analysis", heading_style))
+    story.append(Paragraph("Technical Analysis", _HEADING_STYLE))
     if technical_data:
         technicals = [
             ["Indicator", "Value"],
@@ -79,32 +97,24 @@ def generate_comprehensive_report(company_data, technical_data, fundamental_data
             ["Recommendation", f"{technical_data.get('recommendation', 'N/A')}"],
         ]
         table = Table(technicals)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.lightblue),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        table.setStyle(_TECHNICALS_TABLE_STYLE)
         story.append(table)
     else:
-        story.append(Paragraph("Technical data not available.", normal_style))
+        story.append(Paragraph("Technical data not available.", _STYLES['Normal']))
     story.append(Spacer(1, 12))
 
     # News Summary
-    story.append(Paragraph("Recent News Summary", heading_style))
+    story.append(Paragraph("Recent News Summary", _HEADING_STYLE))
     if news_data:
         for i, news in enumerate(news_data[:5]):
-            story.append(Paragraph(f"{i+1}. {news.get('title', 'N/A')}", normal_style))
+            story.append(Paragraph(f"{i+1}. {news.get('title', 'N/A')}", _STYLES['Normal']))
             story.append(Spacer(1, 6))
     else:
-        story.append(Paragraph("No recent news available.", normal_style))
+        story.append(Paragraph("No recent news available.", _STYLES['Normal']))
     story.append(Spacer(1, 12))
 
     # Recommendations
-    story.append(Paragraph("Investment Recommendations", heading_style))
+    story.append(Paragraph("Investment Recommendations", _HEADING_STYLE))
     recommendations = [
         "• Fundamental strength assessment",
         "• Technical indicators analysis",
@@ -112,17 +122,20 @@ def generate_comprehensive_report(company_data, technical_data, fundamental_data
         "• Risk assessment and position sizing"
     ]
     for rec in recommendations:
-        story.append(Paragraph(rec, normal_style))
+        story.append(Paragraph(rec, _STYLES['Normal']))
         story.append(Spacer(1, 4))
 
     doc.build(story)
-    return filename
+    return filename, buffer.getvalue()
 
 def generate_excel_report(data_dict, filename="report.xlsx"):
-    """Generate Excel report with multiple sheets"""
+    """Generate Excel report with multiple sheets and return (filename, xlsx bytes)"""
+    # xlsxwriter is the faster writer; constant_memory is left off because to_excel writes
+    # column by column, and that mode silently drops cells not written in row order
+    engine = 'xlsxwriter' if xlsxwriter is not None else 'openpyxl'
+    buffer = io.BytesIO()
     try:
-        import openpyxl
-        with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+        with pd.ExcelWriter(buffer, engine=engine) as writer:
             for sheet_name, data in data_dict.items():
                 if isinstance(data, dict):
                     df = pd.DataFrame(list(data.items()), columns=['Metric', 'Value'])
@@ -131,11 +144,16 @@ def generate_excel_report(data_dict, filename="report.xlsx"):
                 else:
                     df = pd.DataFrame([data])
                 df.to_excel(writer, sheet_name=sheet_name, index=False)
-        return filename
+        return filename, buffer.getvalue()
     except ImportError:
-        st.error("openpyxl not installed. Please install it to generate Excel reports.")
+        st.error("xlsxwriter or openpyxl not installed. Please install one to generate Excel reports.")
         return None
 
+@st.cache_data(max_entries=16, show_spinner=False)
+def _rows_to_csv(rows):
+    """Return CSV bytes for rows given as tuples of (column, value) pairs, cached across reruns"""
+    return pd.DataFrame([dict(row) for row in rows]).to_csv(index=False).encode()
+
 def display():
     st.header("📄 Report Generation")
 
@@ -170,14 +188,13 @@ def display():
         st.subheader("📊 Comprehensive PDF Report")
         if st.button("Generate PDF Report"):
             with st.spinner("Generating PDF report..."):
-                filename = generate_comprehensive_report(company_data, technical_data, fundamental_data, news_data)
-                with open(filename, "rb") as f:
-                    st.download_button(
-                        label="📥 Download PDF Report",
-                        data=f,
-                        file_name=filename,
-                        mime="application/pdf"
-                    )
+                filename, pdf_bytes = generate_comprehensive_report(company_data, technical_data, fundamental_data, news_data)
+                st.download_button(
+                    label="📥 Download PDF Report",
+                    data=pdf_bytes,
+                    file_name=filename,
+                    mime="application/pdf"
+                )
                 st.success(f"PDF report generated: {filename}")
 
     elif report_type == "Excel Report":
@@ -190,15 +207,15 @@ def display():
         }
         if st.button("Generate Excel Report"):
             with st.spinner("Generating Excel report..."):
-                filename = generate_excel_report(data_dict)
-                if filename:
-                    with open(filename, "rb") as f:
-                        st.download_button(
-                            label="📥 Download Excel Report",
-                            data=f,
-                            file_name=filename,
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                        )
+                report = generate_excel_report(data_dict)
+                if report:
+                    filename, xlsx_bytes = report
+                    st.download_button(
+                        label="📥 Download Excel Report",
+                        data=xlsx_bytes,
+                        file_name=filename,
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    )
                     st.success(f"Excel report generated: {filename}")
 
     elif report_type == "CSV Export":
@@ -210,43 +227,20 @@ def display():
 
         if st.button("Generate CSV"):
             if export_options:
+                csv_sources = {
+                    "Company Data": ("company_data.csv", [company_data]),
+                    "Fundamental Data": ("fundamental_data.csv", [fundamental_data]),
+                    "Technical Data": ("technical_data.csv", [technical_data]),
+                    "News Data": ("news_data.csv", news_data)
+                }
                 for option in export_options:
-                    if option == "Company Data":
-                        df = pd.DataFrame([company_data])
-                        csv = df.to_csv(index=False)
-                        st.download_button(
-                            label="📥 Download Company Data CSV",
-                            data=csv,
-                            file_name="company_data.csv",
-                            mime="text/csv"
-                        )
-                    elif option == "Fundamental Data":
-                        df = pd.DataFrame([fundamental_data])
-                        csv = df.to_csv(index=False)
-                        st.download_button(
-                            label="📥 Download Fundamental Data CSV",
-                            data=csv,
-                            file_name="fundamental_data.csv",
-                            mime="text/csv"
-                        )
-                    elif option == "Technical Data":
-                        df = pd.DataFrame([technical_data])
-                        csv = df.to_csv(index=False)
-                        st.download_button(
-                            label="📥 Download Technical Data CSV",
-                            data=csv,
-                            file_name="technical_data.csv",
-                            mime="text/csv"
-                        )
-                    elif option == "News Data":
-                        df = pd.DataFrame(news_data)
-                        csv = df.to_csv(index=False)
-                        st.download_button(
-                            label="📥 Download News Data CSV",
-                            data=csv,
-                            file_name="news_data.csv",
-                            mime="text/csv"
-                        )
+                    file_name, rows = csv_sources[option]
+                    st.download_button(
+                        label=f"📥 Download {option} CSV",
+                        data=_rows_to_csv(tuple(tuple(row.items()) for row in rows)),
+                        file_name=file_name,
+                        mime="text/csv"
+                    )
             else:
                 st.warning("Please select at least one data type to export.")
 
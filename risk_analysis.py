@@ -1,66 +1,160 @@
 import streamlit as st
+import functools
 import pandas as pd
 import numpy as np
-import yfinance as yf
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import scipy.stats as stats
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
-
-def calculate_historical_var(returns, confidence_level=0.95, time_horizon=1):
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfgen import canvas
+from src.data_fetcher import _download, NoDataError
+
+try:
+    # Optional C moving-window statistics for the risk heatmap
+    import bottleneck as bn
+except ImportError:
+    bn = None
+
+try:
+    # Optional JIT kernels for the one-pass risk statistics; numba is not a hard dependency
+    from src.risk_nb import moments as _moments_nb, tail_mean as _tail_mean_nb
+except ImportError:
+    _moments_nb = _tail_mean_nb = None
+
+def _moments_numpy(returns):
+    """NumPy version of the moments kernel, used when numba is unavailable"""
+    return np.mean(returns, dtype=np.float64), np.var(returns, dtype=np.float64), stats.skew(returns), stats.kurtosis(returns), np.min(returns)
+
+def _tail_mean_numpy(returns, threshold):
+    """NumPy version of the tail mean kernel, used when numba is unavailable"""
+    losses = returns[returns <= threshold]
+    return np.mean(losses, dtype=np.float64) if len(losses) > 0 else np.nan
+
+# Lower-tail standard normal quantiles, norm.ppf(1 - confidence_level), for the usual levels
+_Z_SCORES = {0.90: -1.2815515655446004, 0.95: -1.6448536269514722, 0.99: -2.3263478740408408}
+
+@functools.lru_cache(maxsize=32)
+def _z_score(confidence_level):
+    """Return norm.ppf(1 - confidence_level), from the table when the level is a usual one"""
+    z_score = _Z_SCORES.get(confidence_level)
+    return z_score if z_score is not None else float(stats.norm.ppf(1 - confidence_level))
+
+def _mean_std(returns):
+    """Return the mean and population standard deviation of returns, in one sweep when numba is available"""
+    if _moments_nb is not None:
+        mean, variance = _moments_nb(returns)[:2]
+        return mean, np.sqrt(variance)
+    return np.mean(returns, dtype=np.float64), np.std(returns, dtype=np.float64)
+
+def _as_array(returns):
+    """Return returns as a contiguous 1-D array for the kernels, float32 if it already is, else float64"""
+    returns = np.asarray(returns)
+    dtype = np.float32 if returns.dtype == np.float32 else np.float64
+    return np.ascontiguousarray(returns, dtype=dtype).ravel()
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_returns(symbol, period="2y"):
+    """Fetch daily returns for symbol as float32, reusing the shared price download cache"""
+    data = _download('risk_analysis.fetch_returns', symbol, period, '1d')
+    # _download keeps unadjusted prices; the adjusted close is what yf.download's default returned here
+    close = data['Adj Close'] if 'Adj Close' in data else data['Close']
+    # Daily changes need nowhere near float64's precision; the reductions still accumulate in float64
+    returns = close.pct_change().dropna().astype(np.float32)
+    # Raised rather than returned, so st.cache_data does not replay an empty series for the whole TTL
+    if returns.empty:
+        raise NoDataError(f"No price history returned for {symbol}")
+    return returns
+
+def calculate_historical_var(returns, confidence_level=0.95, time_horizon=1, presorted=False):
     """
     Calculate Value at Risk using historical simulation method.
+    With presorted=True, returns must already be sorted ascending and the quantile is a plain index.
     """
-    if isinstance(returns, pd.Series):
-        returns = returns.values
-    var = np.percentile(returns, (1 - confidence_level) * 100)
+    returns = _as_array(returns)
+    # Nearest-rank quantile: one introselect instead of np.percentile's sort and interpolation.
+    # The product is rounded first so that 0.05 * 100 does not ceil to 6.
+    k = max(int(np.ceil(round((1 - confidence_level) * len(returns), 9))) - 1, 0)
+    var = returns[k] if presorted else np.partition(returns, k)[k]
     return -var * np.sqrt(time_horizon)
 
 def calculate_parametric_var(returns, confidence_level=0.95, time_horizon=1):
     """
     Calculate Value at Risk using parametric method (normal distribution assumption).
     """
-    if isinstance(returns, pd.Series):
-        returns = returns.values
-    mean = np.mean(returns)
-    std = np.std(returns)
-    z_score = stats.norm.ppf(1 - confidence_level)
+    returns = _as_array(returns)
+    mean, std = _mean_std(returns)
+    z_score = _z_score(confidence_level)
     var = mean + z_score * std
     return -var * np.sqrt(time_horizon)
 
-def calculate_monte_carlo_var(returns, confidence_level=0.95, time_horizon=1, simulations=10000):
+def calculate_monte_carlo_var(returns, confidence_level=0.95, time_horizon=1, simulations=None):
     """
-    Calculate Value at Risk using Monte Carlo simulation.
+    Calculate Value at Risk for normally distributed returns, as the Monte Carlo simulation would.
+    The simulated paths are Gaussian, so without an explicit simulations count the VaR is read
+    straight from the normal quantile instead of sampled.
     """
-    if isinstance(returns, pd.Series):
-        returns = returns.values
-    mean = np.mean(returns)
-    std = np.std(returns)
-
-    # Generate random returns
-    simulated_returns = np.random.normal(mean, std, (simulations, time_horizon))
-    portfolio_returns = np.sum(simulated_returns, axis=1)
+    if simulations is not None:
+        return simulate_monte_carlo_var(returns, confidence_level, time_horizon, simulations)
+    returns = _as_array(returns)
+    mean, std = _mean_std(returns)
+    var = mean * time_horizon + std * np.sqrt(time_horizon) * _z_score(confidence_level)
+    return -var
 
-    var = np.percentile(portfolio_returns, (1 - confidence_level) * 100)
+def simulate_monte_carlo_var(returns, confidence_level=0.95, time_horizon=1, simulations=2000, sampling='antithetic'):
+    """
+    Calculate Value at Risk using Monte Carlo simulation.
+    sampling='antithetic' pairs every path with its mirror image; sampling='sobol' draws scrambled
+    Sobol points (rounded up to a power of two). Both need far fewer paths than i.i.d. draws.
+    """
+    returns = _as_array(returns)
+    mean, std = _mean_std(returns)
+
+    if sampling == 'sobol':
+        # One Sobol dimension per step of the horizon, mapped to normals through the inverse CDF
+        m = int(np.ceil(np.log2(simulations)))
+        points = stats.qmc.Sobol(d=time_horizon).random_base2(m)
+        portfolio_returns = stats.norm.ppf(points).sum(axis=1).astype(np.float32)
+    else:
+        # Sum the standard normal steps of half the paths in place; the other half are their negatives
+        rng = np.random.default_rng()
+        half = (simulations + 1) // 2
+        step = np.empty(half, dtype=np.float32)
+        paths = np.zeros(half, dtype=np.float32)
+        for _ in range(time_horizon):
+            rng.standard_normal(dtype=np.float32, out=step)
+            paths += step
+        portfolio_returns = np.concatenate([paths, -paths])
+    portfolio_returns *= std
+    portfolio_returns += mean * time_horizon
+
+    # The tail quantile is a single order statistic, so a partial sort is enough
+    k = int(len(portfolio_returns) * (1 - confidence_level))
+    var = np.partition(portfolio_returns, k)[k]
     return -var
 
-def calculate_cvar(returns, confidence_level=0.95, time_horizon=1):
+def calculate_cvar(returns, confidence_level=0.95, time_horizon=1, presorted=False):
     """
     Calculate Conditional Value at Risk (Expected Shortfall).
+    With presorted=True, returns must already be sorted ascending and the tail is a leading slice.
     """
-    if isinstance(returns, pd.Series):
-        returns = returns.values
-    var = calculate_historical_var(returns, confidence_level, time_horizon)
-    losses = returns[returns <= -var]
-    cvar = np.mean(losses) if len(losses) > 0 else var
+    returns = _as_array(returns)
+    var = calculate_historical_var(returns, confidence_level, time_horizon, presorted)
+    if presorted:
+        losses = returns[:np.searchsorted(returns, -var, side='right')]
+        cvar = np.mean(losses, dtype=np.float64) if len(losses) > 0 else np.nan
+    else:
+        # Mean of the tail in one sweep, without materialising the losses
+        tail_mean = _tail_mean_nb or _tail_mean_numpy
+        cvar = tail_mean(returns, -var)
+    if np.isnan(cvar):
+        cvar = var
     return -cvar
 
-def perform_stress_testing(returns, stress_scenarios=None):
+def perform_stress_testing(returns, stress_scenarios=None, presorted=False):
     """
     Perform stress testing with predefined scenarios.
     """
@@ -72,10 +166,12 @@ def perform_stress_testing(returns, stress_scenarios=None):
             'Bull Market (+15%)': 0.15
         }
 
+    # Shifting every return by the shock shifts the quantile by the same amount,
+    # so each scenario's VaR is the base VaR less its shock
+    base_var = calculate_historical_var(returns, presorted=presorted)
     results = {}
     for scenario, shock in stress_scenarios.items():
-        stressed_return = returns + shock
-        var_95 = calculate_historical_var(stressed_return)
+        var_95 = base_var - shock
         results[scenario] = {
             'Shock': f"{shock:.1%}",
             'VaR 95%': f"{var_95:.2%}"
@@ -83,115 +179,166 @@ def perform_stress_testing(returns, stress_scenarios=None):
 
     return results
 
-def calculate_risk_factors(returns):
+def calculate_risk_factors(returns, presorted=False):
     """
     Calculate key risk factors from returns data.
     """
-    if isinstance(returns, pd.Series):
-        returns = returns.values
+    returns = _as_array(returns)
+
+    # Mean, spread, shape and worst day all come from one sweep over the returns
+    moments = _moments_nb or _moments_numpy
+    mean, variance, skew, kurt, worst = moments(returns)
+    std = np.sqrt(variance)
 
     factors = {
-        'Annualized Volatility': f"{np.std(returns) * np.sqrt(252):.2%}",
-        'Sharpe Ratio': f"{np.mean(returns) / np.std(returns) * np.sqrt(252):.2f}",
-        'Maximum Drawdown': f"{np.min(returns):.2%}",
-        'Skewness': f"{stats.skew(returns):.2f}",
-        'Kurtosis': f"{stats.kurtosis(returns):.2f}",
-        'VaR 95%': f"{calculate_historical_var(returns):.2%}",
-        'CVaR 95%': f"{calculate_cvar(returns):.2%}"
+        'Annualized Volatility': f"{std * np.sqrt(252):.2%}",
+        'Sharpe Ratio': f"{mean / std * np.sqrt(252):.2f}",
+        'Maximum Drawdown': f"{worst:.2%}",
+        'Skewness': f"{skew:.2f}",
+        'Kurtosis': f"{kurt:.2f}",
+        'VaR 95%': f"{calculate_historical_var(returns, presorted=presorted):.2%}",
+        'CVaR 95%': f"{calculate_cvar(returns, presorted=presorted):.2%}"
     }
 
     return factors
 
+# Chart layouts are built once; each chart copies its template and fills in only the data
+_HEATMAP_TEMPLATE = go.Figure(go.Heatmap(y=['Volatility'], colorscale='RdYlGn_r')).update_layout(
+    title="Risk Heatmap - Rolling Volatility",
+    xaxis_title="Time",
+    yaxis_title="Risk Metric"
+)
+
+_VAR_COMPARISON_TEMPLATE = go.Figure(go.Bar(
+    x=['Historical', 'Parametric', 'Monte Carlo'],
+    marker_color=['blue', 'green', 'red']
+)).update_layout(
+    title="VaR Methods Comparison (95% Confidence)",
+    xaxis_title="Method",
+    yaxis_title="Value at Risk (%)",
+    yaxis_tickformat=".1%"
+)
+
 def create_risk_heatmap(returns, window=30):
     """
     Create a risk heatmap showing rolling volatility.
     """
-    if isinstance(returns, pd.Series):
-        rolling_vol = returns.rolling(window=window).std() * np.sqrt(252)
+    values = _as_array(returns)
+    # Sample (ddof=1) standard deviation of each trailing window, nan until the first full window,
+    # as Series.rolling(window).std() gives
+    if bn is not None:
+        rolling_std = bn.move_std(values, window=window, min_count=window, ddof=1)
     else:
-        rolling_vol = pd.Series(returns).rolling(window=window).std() * np.sqrt(252)
-
-    fig = go.Figure(data=go.Heatmap(
-        z=[rolling_vol.values],
-        x=rolling_vol.index if hasattr(rolling_vol, 'index') else list(range(len(rolling_vol))),
-        y=['Volatility'],
-        colorscale='RdYlGn_r'
-    ))
-
-    fig.update_layout(
-        title="Risk Heatmap - Rolling Volatility",
-        xaxis_title="Time",
-        yaxis_title="Risk Metric"
-    )
-
+        rolling_std = np.full(len(values), np.nan)
+        if len(values) >= window:
+            rolling_std[window - 1:] = np.lib.stride_tricks.sliding_window_view(values, window).std(axis=1, ddof=1)
+    rolling_vol = rolling_std * np.sqrt(252)
+
+    fig = go.Figure(_HEATMAP_TEMPLATE)
+    fig.data[0].z = [rolling_vol]
+    fig.data[0].x = returns.index if hasattr(returns, 'index') else list(range(len(rolling_vol)))
     return fig
 
-def create_var_comparison_chart(returns):
+def create_var_comparison_chart(returns, presorted=False, var_values=None):
     """
     Create a comparison chart of different VaR methods.
+    var_values, if given, are the historical, parametric and Monte Carlo VaRs already computed.
     """
-    methods = ['Historical', 'Parametric', 'Monte Carlo']
-    var_values = [
-        calculate_historical_var(returns),
-        calculate_parametric_var(returns),
-        calculate_monte_carlo_var(returns)
-    ]
-
-    fig = go.Figure(data=[
-        go.Bar(
-            x=methods,
-            y=var_values,
-            marker_color=['blue', 'green', 'red']
-        )
-    ])
-
-    fig.update_layout(
-        title="VaR Methods Comparison (95% Confidence)",
-        xaxis_title="Method",
-        yaxis_title="Value at Risk (%)",
-        yaxis_tickformat=".1%"
-    )
-
+    if var_values is None:
+        var_values = [
+            calculate_historical_var(returns, presorted=presorted),
+            calculate_parametric_var(returns),
+            calculate_monte_carlo_var(returns)
+        ]
+
+    fig = go.Figure(_VAR_COMPARISON_TEMPLATE)
+    fig.data[0].y = list(var_values)
     return fig
 
+# Fixed page geometry and fonts for the risk report, drawn straight onto the canvas
+_PAGE_WIDTH, _PAGE_HEIGHT = letter
+_MARGIN = inch
+_TITLE_FONT = ('Helvetica-Bold', 16)
+_HEADING_FONT = ('Helvetica-Bold', 14)
+_BODY_FONT = ('Helvetica', 10)
+_TABLE_HEADER_FONT = ('Helvetica-Bold', 12)
+_TABLE_ROW_HEIGHT = 20
+_TABLE_PADDING = 12
+
+def _draw_paragraph(c, text, y):
+    """Draw text wrapped to the page width from y and return the y below it"""
+    font, size = _BODY_FONT
+    c.setFont(font, size)
+    for line in simpleSplit(text, font, size, _PAGE_WIDTH - 2 * _MARGIN):
+        y -= size * 1.2
+        c.drawString(_MARGIN, y, line)
+    return y
+
+def _draw_table(c, rows, y):
+    """Draw rows as a centred grid with a grey header row and return the y below it"""
+    header_font, header_size = _TABLE_HEADER_FONT
+    body_font, body_size = _BODY_FONT
+    widths = [
+        max(max(c.stringWidth(str(row[i]), body_font, body_size) for row in rows[1:]),
+            c.stringWidth(str(rows[0][i]), header_font, header_size)) + 2 * _TABLE_PADDING
+        for i in range(len(rows[0]))
+    ]
+    left = (_PAGE_WIDTH - sum(widths)) / 2
+    xs = [left]
+    for width in widths:
+        xs.append(xs[-1] + width)
+    ys = [y - i * _TABLE_ROW_HEIGHT for i in range(len(rows) + 1)]
+
+    # Backgrounds first, then the grid and the text on top
+    c.setFillColor(colors.grey)
+    c.rect(xs[0], ys[1], xs[-1] - xs[0], _TABLE_ROW_HEIGHT, stroke=0, fill=1)
+    c.setFillColor(colors.beige)
+    c.rect(xs[0], ys[-1], xs[-1] - xs[0], ys[1] - ys[-1], stroke=0, fill=1)
+    c.setStrokeColor(colors.black)
+    c.grid(xs, ys)
+
+    for r, row in enumerate(rows):
+        if r == 0:
+            c.setFillColor(colors.whitesmoke)
+            c.setFont(header_font, header_size)
+        else:
+            c.setFillColor(colors.black)
+            c.setFont(body_font, body_size)
+        baseline = ys[r + 1] + (_TABLE_ROW_HEIGHT - (header_size if r == 0 else body_size)) / 2 + 2
+        for i, cell in enumerate(row):
+            c.drawCentredString((xs[i] + xs[i + 1]) / 2, baseline, str(cell))
+    c.setFillColor(colors.black)
+    return ys[-1]
+
 def generate_risk_analysis_report(symbol, hist_var, param_var, mc_var, cvar, risk_factors, filename=None):
     """
     Generate a PDF risk analysis report.
+    The layout is fixed, so it is drawn directly on a canvas rather than flowed by Platypus.
     """
     if filename is None:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"risk_analysis_{symbol}_{timestamp}.pdf"
 
-    doc = SimpleDocTemplate(filename, pagesize=letter)
-    styles = getSampleStyleSheet()
-
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=16,
-        spaceAfter=30,
-    )
-
-    content = []
+    c = canvas.Canvas(filename, pagesize=letter)
+    y = _PAGE_HEIGHT - _MARGIN
 
     # Title
-    content.append(Paragraph(f"Risk Analysis Report - {symbol}", title_style))
-    content.append(Spacer(1, 12))
+    c.setFont(*_TITLE_FONT)
+    y -= _TITLE_FONT[1]
+    c.drawString(_MARGIN, y, f"Risk Analysis Report - {symbol}")
+    y -= 30
 
     # Executive Summary
-    content.append(Paragraph("Executive Summary", styles['Heading2']))
-    content.append(Spacer(1, 12))
-    content.append(Paragraph(
-        f"This report provides a comprehensive risk analysis for {symbol} using multiple Value at Risk (VaR) methodologies.",
-        styles['Normal']
-    ))
-    content.append(Spacer(1, 12))
+    c.setFont(*_HEADING_FONT)
+    y -= _HEADING_FONT[1]
+    c.drawString(_MARGIN, y, "Executive Summary")
+    y = _draw_paragraph(c, f"This report provides a comprehensive risk analysis for {symbol} using multiple Value at Risk (VaR) methodologies.", y - 12)
+    y -= 24
 
     # VaR Results
-    content.append(Paragraph("Value at Risk Results", styles['Heading2']))
-    content.append(Spacer(1, 12))
-
+    c.setFont(*_HEADING_FONT)
+    y -= _HEADING_FONT[1]
+    c.drawString(_MARGIN, y, "Value at Risk Results")
     var_data = [
         ['Method', 'VaR (95%)'],
         ['Historical Simulation', f"{hist_var:.2%}"],
@@ -199,55 +346,37 @@ def generate_risk_analysis_report(symbol, hist_var, param_var, mc_var, cvar, ris
         ['Monte Carlo', f"{mc_var:.2%}"],
         ['Conditional VaR', f"{cvar:.2%}"]
     ]
-
-    var_table = Table(var_data)
-    var_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 14),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-
-    content.append(var_table)
-    content.append(Spacer(1, 20))
+    y = _draw_table(c, var_data, y - 12)
+    y -= 32
 
     # Risk Factors
-    content.append(Paragraph("Key Risk Factors", styles['Heading2']))
-    content.append(Spacer(1, 12))
-
     risk_data = [['Factor', 'Value']]
     for factor, value in risk_factors.items():
         risk_data.append([factor, value])
-
-    risk_table = Table(risk_data)
-    risk_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-
-    content.append(risk_table)
-    content.append(Spacer(1, 20))
+    if y - _HEADING_FONT[1] - 12 - len(risk_data) * _TABLE_ROW_HEIGHT < _MARGIN:
+        c.showPage()
+        y = _PAGE_HEIGHT - _MARGIN
+    c.setFont(*_HEADING_FONT)
+    y -= _HEADING_FONT[1]
+    c.drawString(_MARGIN, y, "Key Risk Factors")
+    y = _draw_table(c, risk_data, y - 12)
+    y -= 32
 
     # Methodology
-    content.append(Paragraph("Methodology", styles['Heading2']))
-    content.append(Spacer(1, 12))
-    content.append(Paragraph(
+    if y - 80 < _MARGIN:
+        c.showPage()
+        y = _PAGE_HEIGHT - _MARGIN
+    c.setFont(*_HEADING_FONT)
+    y -= _HEADING_FONT[1]
+    c.drawString(_MARGIN, y, "Methodology")
+    _draw_paragraph(c,
         "This analysis uses historical price data to calculate risk metrics using multiple methodologies. "
         "VaR represents the maximum potential loss over a specific time period with a given confidence level.",
-        styles['Normal']
-    ))
+        y - 12
+    )
 
     # Build PDF
-    doc.build(content)
+    c.save()
     return filename
 
 def display():
@@ -272,16 +401,17 @@ def display():
     if st.button("Analyze Risk"):
         with st.spinner("Performing risk analysis..."):
             try:
-                # Fetch data
-                data = yf.download(symbol, period="2y")
-                returns = data['Close'].pct_change().dropna()
+                # Fetch data; cached per symbol, so reruns skip the download and the returns
+                returns = fetch_returns(symbol)
+                # Sorted once; every quantile below is then an index into it
+                sorted_returns = np.sort(_as_array(returns))
 
                 # Calculate VaR methods
                 col1, col2, col3 = st.columns(3)
 
                 with col1:
                     st.subheader("Historical VaR")
-                    hist_var = calculate_historical_var(returns)
+                    hist_var = calculate_historical_var(sorted_returns, presorted=True)
                     st.metric("95% VaR", f"{hist_var:.2%}")
 
                 with col2:
@@ -296,19 +426,19 @@ def display():
 
                 # CVaR
                 st.subheader("Conditional VaR (CVaR)")
-                cvar = calculate_cvar(returns)
+                cvar = calculate_cvar(sorted_returns, presorted=True)
                 st.metric("95% CVaR", f"{cvar:.2%}")
 
                 # Risk Factors
                 st.subheader("Risk Factors")
-                risk_factors = calculate_risk_factors(returns)
+                risk_factors = calculate_risk_factors(sorted_returns, presorted=True)
                 # Display risk factors in a table format
                 risk_df = pd.DataFrame(list(risk_factors.items()), columns=['Factor', 'Value'])
                 st.dataframe(risk_df.style.format({'Value': lambda x: x}))
 
                 # Stress Testing
                 st.subheader("Stress Testing")
-                stress_results = perform_stress_testing(returns)
+                stress_results = perform_stress_testing(sorted_returns, presorted=True)
                 st.write(stress_results)
 
                 # Risk Heatmap
@@ -318,7 +448,7 @@ def display():
 
                 # VaR Comparison Chart
                 st.subheader("VaR Methods Comparison")
-                fig = create_var_comparison_chart(returns)
+                fig = create_var_comparison_chart(sorted_returns, presorted=True, var_values=(hist_var, param_var, mc_var))
                 st.plotly_chart(fig)
 
                 # Generate Report
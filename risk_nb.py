@@ -0,0 +1,50 @@
+import numpy as np
+from numba import njit
+
+@njit(cache=True)
+def moments(returns):
+    """Return mean, variance, skewness, excess kurtosis and minimum of returns in one pass
+
+    Matches np.mean, np.var, scipy.stats.skew and scipy.stats.kurtosis with their defaults
+    (population moments); skewness and kurtosis are nan for a constant series.
+    """
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+    m3 = 0.0
+    m4 = 0.0
+    low = np.inf
+    for x in returns:
+        # Online update of the central moment sums (Welford, extended to the third and fourth)
+        n1 = n
+        n += 1
+        delta = x - mean
+        delta_n = delta / n
+        delta_n2 = delta_n * delta_n
+        term = delta * delta_n * n1
+        mean += delta_n
+        m4 += term * delta_n2 * (n * n - 3 * n + 3) + 6.0 * delta_n2 * m2 - 4.0 * delta_n * m3
+        m3 += term * delta_n * (n - 2) - 3.0 * delta_n * m2
+        m2 += term
+        if x < low:
+            low = x
+
+    if n == 0:
+        return np.nan, np.nan, np.nan, np.nan, np.nan
+    variance = m2 / n
+    if m2 == 0:
+        return mean, variance, np.nan, np.nan, low
+    skew = np.sqrt(n) * m3 / m2 ** 1.5
+    kurt = n * m4 / (m2 * m2) - 3.0
+    return mean, variance, skew, kurt, low
+
+@njit(cache=True)
+def tail_mean(returns, threshold):
+    """Return the mean of the returns at or below threshold, or nan if there are none"""
+    total = 0.0
+    count = 0
+    for x in returns:
+        if x <= threshold:
+            total += x
+            count += 1
+    return total / count if count > 0 else np.nan
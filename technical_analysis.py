@@ -5,55 +5,95 @@ import matplotlib.pyplot as plt
 import plotly.graph_objects as go
 from src.data_fetcher import fetch_historical_data
 
+try:
+    # Optional JIT kernels for the indicator recurrences; numba is not a hard dependency
+    from src.technical_nb import macd as _macd_nb, rsi as _rsi_nb, indicators as _indicators_nb
+except ImportError:
+    _macd_nb = _rsi_nb = _indicators_nb = None
+
+def _wilder_mean(values, period):
+    """Wilder's smoothing: a plain mean of the first period values after the first, then avg = (avg * (period - 1) + x) / period"""
+    seeded = values.copy()
+    seeded.iloc[:period] = np.nan
+    seeded.iloc[period] = values.iloc[1:period + 1].mean()
+    return seeded.ewm(alpha=1 / period, adjust=False).mean()
+
 def calculate_rsi(data, period=14):
-    """Calculate RSI"""
-    delta = data['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    """Calculate RSI with Wilder's smoothing of the average gain and loss"""
+    close = data['Close']
+    if _rsi_nb is not None:
+        return pd.Series(_rsi_nb(close.to_numpy(dtype=np.float64), period), index=close.index)
+    if len(close) <= period:
+        return pd.Series(np.nan, index=close.index)
+    delta = close.diff()
+    gain = _wilder_mean(delta.where(delta > 0, 0), period)
+    loss = _wilder_mean(-delta.where(delta < 0, 0), period)
     rs = gain / loss
     rsi = 100 - (100 / (1 + rs))
     return rsi
 
 def calculate_macd(data):
     """Calculate MACD"""
+    if _macd_nb is not None:
+        # All three exponential averages in one loop; alpha = 2 / (span + 1)
+        close = data['Close']
+        macd, signal = _macd_nb(close.to_numpy(dtype=np.float64), 2 / 13, 2 / 27, 2 / 10)
+        return pd.Series(macd, index=close.index), pd.Series(signal, index=close.index)
     exp1 = data['Close'].ewm(span=12, adjust=False).mean()
     exp2 = data['Close'].ewm(span=26, adjust=False).mean()
     macd = exp1 - exp2
     signal = macd.ewm(span=9, adjust=False).mean()
     return macd, signal
 
-def plot_technical_chart(data, symbol):
-    """Plot interactive technical chart"""
-    fig = go.Figure()
+def compute_indicators(data):
+    """Calculate RSI, MACD and its signal line once for sharing between display blocks"""
+    macd, signal = calculate_macd(data)
+    return {'rsi': calculate_rsi(data), 'macd': macd, 'signal': signal}
 
-    # Candlestick
-    fig.add_trace(go.Candlestick(x=data.index,
-                open=data['Open'], high=data['High'],
-                low=data['Low'], close=data['Close']))
+# The chart layout and traces are built once; each chart copies the template and fills in the data
+_CHART_TEMPLATE = go.Figure([
+    go.Candlestick(),
+    go.Scatter(name='50 MA'),
+    go.Scatter(name='200 MA'),
+    go.Scatter(name='RSI', yaxis='y2')
+]).update_layout(
+    yaxis_title='Price',
+    yaxis2=dict(title='RSI', overlaying='y', side='right'),
+    xaxis_rangeslider_visible=False
+)
 
-    # Moving Averages
-    fig.add_trace(go.Scatter(x=data.index, y=data['Close'].rolling(50).mean(), name='50 MA'))
-    fig.add_trace(go.Scatter(x=data.index, y=data['Close'].rolling(200).mean(), name='200 MA'))
+def plot_technical_chart(data, symbol, rsi=None):
+    """Plot interactive technical chart"""
+    # Moving Averages, and the RSI too when it was not passed in
+    if _indicators_nb is not None:
+        ma50, ma200, chart_rsi = _indicators_nb(data['Close'].to_numpy(dtype=np.float64), 50, 200, 14)
+        if rsi is None:
+            rsi = chart_rsi
+    else:
+        ma50 = data['Close'].rolling(50).mean()
+        ma200 = data['Close'].rolling(200).mean()
 
     # RSI
-    rsi = calculate_rsi(data)
-    fig.add_trace(go.Scatter(x=data.index, y=rsi, name='RSI', yaxis='y2'))
+    if rsi is None:
+        rsi = calculate_rsi(data)
 
-    fig.update_layout(
-        title=f'{symbol} Technical Analysis',
-        yaxis_title='Price',
-        yaxis2=dict(title='RSI', overlaying='y', side='right'),
-        xaxis_rangeslider_visible=False
-    )
+    fig = go.Figure(_CHART_TEMPLATE)
+    candles, ma50_line, ma200_line, rsi_line = fig.data
+    candles.update(x=data.index, open=data['Open'], high=data['High'], low=data['Low'], close=data['Close'])
+    ma50_line.update(x=data.index, y=ma50)
+    ma200_line.update(x=data.index, y=ma200)
+    rsi_line.update(x=data.index, y=rsi)
+    fig.update_layout(title=f'{symbol} Technical Analysis')
 
     return fig
 
-def generate_recommendation(data):
+def generate_recommendation(data, indicators=None):
     """Generate buy/sell recommendations based on technical indicators"""
-    rsi = calculate_rsi(data).iloc[-1]
-    macd, signal = calculate_macd(data)
-    macd_current = macd.iloc[-1]
-    signal_current = signal.iloc[-1]
+    if indicators is None:
+        indicators = compute_indicators(data)
+    rsi = indicators['rsi'].iloc[-1]
+    macd_current = indicators['macd'].iloc[-1]
+    signal_current = indicators['signal'].iloc[-1]
 
     if rsi < 30 and macd_current > signal_current:
         return "BUY"
@@ -62,23 +102,28 @@ def generate_recommendation(data):
     else:
         return "HOLD"
 
-def display_technical_analysis(symbol):
-    data = fetch_historical_data(symbol)
+def display_technical_analysis(symbol, data=None, indicators=None):
+    """Show the technical chart and indicator metrics, reusing data and indicators a caller already has"""
+    if data is None:
+        data = fetch_historical_data(symbol)
+        if data is None:
+            return
+    if indicators is None:
+        indicators = compute_indicators(data)
 
     st.subheader("Technical Analysis")
 
     # Interactive Chart
-    fig = plot_technical_chart(data, symbol)
+    fig = plot_technical_chart(data, symbol, rsi=indicators['rsi'])
     st.plotly_chart(fig)
 
     # Indicators
     col1, col2, col3 = st.columns(3)
     with col1:
-        rsi = calculate_rsi(data).iloc[-1]
+        rsi = indicators['rsi'].iloc[-1]
         st.metric("RSI", f"{rsi:.2f}")
     with col2:
-        macd, signal = calculate_macd(data)
-        st.metric("MACD", f"{macd.iloc[-1]:.2f}")
+        st.metric("MACD", f"{indicators['macd'].iloc[-1]:.2f}")
     with col3:
-        recommendation = generate_recommendation(data)
+        recommendation = generate_recommendation(data, indicators)
         st.metric("Recommendation", recommendation)
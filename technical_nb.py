@@ -0,0 +1,104 @@
+import numpy as np
+from numba import njit
+
+@njit(cache=True, inline='always')
+def _ewm_step(weighted, old_wt, value, alpha):
+    """Advance an adjust=False exponential mean by one value, as pandas' ewm does
+
+    A nan value leaves the mean as it is but still decays its weight, so the next value counts more.
+    """
+    if np.isnan(weighted):
+        return value, 1.0
+    old_wt *= 1.0 - alpha
+    if not np.isnan(value):
+        if weighted != value:
+            weighted = (old_wt * weighted + alpha * value) / (old_wt + alpha)
+        old_wt = 1.0
+    return weighted, old_wt
+
+@njit(cache=True)
+def macd(close, alpha_fast, alpha_slow, alpha_signal):
+    """Return the MACD line and its signal line from one pass over close
+
+    Same values as Series.ewm(alpha=..., adjust=False).mean() for the fast and slow
+    averages of close and for the signal average of their difference.
+    """
+    n = close.size
+    macd_line = np.empty(n)
+    signal = np.empty(n)
+    fast = slow = sig = np.nan
+    fast_wt = slow_wt = sig_wt = 1.0
+    for i in range(n):
+        fast, fast_wt = _ewm_step(fast, fast_wt, close[i], alpha_fast)
+        slow, slow_wt = _ewm_step(slow, slow_wt, close[i], alpha_slow)
+        macd_line[i] = fast - slow
+        sig, sig_wt = _ewm_step(sig, sig_wt, macd_line[i], alpha_signal)
+        signal[i] = sig
+    return macd_line, signal
+
+@njit(cache=True, inline='always', error_model='numpy')
+def _rsi_step(i, delta, avg_gain, avg_loss, period):
+    """Fold the change into close[i] into the Wilder averages and return them with RSI at i (nan while seeding)"""
+    gain = delta if delta > 0 else 0.0
+    loss = -delta if delta < 0 else 0.0
+    if i <= period:
+        avg_gain += gain / period
+        avg_loss += loss / period
+        if i < period:
+            return avg_gain, avg_loss, np.nan
+    else:
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+    return avg_gain, avg_loss, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+@njit(cache=True, error_model='numpy')
+def rsi(close, period):
+    """Return Wilder's RSI of close: the first average is a plain mean of period changes,
+    later ones are smoothed as avg = (avg * (period - 1) + change) / period
+
+    Missing changes count as neither gain nor loss; the first period values are nan.
+    """
+    n = close.size
+    out = np.full(n, np.nan)
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, n):
+        avg_gain, avg_loss, out[i] = _rsi_step(i, close[i] - close[i - 1], avg_gain, avg_loss, period)
+    return out
+
+@njit(cache=True, error_model='numpy')
+def indicators(close, fast, slow, period):
+    """Return the fast and slow moving averages and the RSI of close from one pass
+
+    The averages are nan until their window holds that many non-nan closes, like Series.rolling(window).mean().
+    """
+    n = close.size
+    fast_ma = np.full(n, np.nan)
+    slow_ma = np.full(n, np.nan)
+    out_rsi = np.full(n, np.nan)
+    fast_sum = slow_sum = 0.0
+    fast_count = slow_count = 0
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(n):
+        # Running window sums over the non-nan closes: add the newest, drop the one leaving the window
+        x = close[i]
+        if not np.isnan(x):
+            fast_sum += x
+            fast_count += 1
+            slow_sum += x
+            slow_count += 1
+        if i >= fast and not np.isnan(close[i - fast]):
+            fast_sum -= close[i - fast]
+            fast_count -= 1
+        if i >= slow and not np.isnan(close[i - slow]):
+            slow_sum -= close[i - slow]
+            slow_count -= 1
+        if fast_count == fast:
+            fast_ma[i] = fast_sum / fast
+        if slow_count == slow:
+            slow_ma[i] = slow_sum / slow
+
+        if i > 0:
+            avg_gain, avg_loss, out_rsi[i] = _rsi_step(i, x - close[i - 1], avg_gain, avg_loss, period)
+    return fast_ma, slow_ma, out_rsi